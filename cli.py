@@ -5,28 +5,38 @@ Uso:
     python cli.py --help
     python cli.py --interactive
     python cli.py --from-json datos.json
+    python cli.py --batch lote.csv
+
+Los módulos pesados (reportlab, pydantic, catálogos) se importan dentro de
+cada comando, de modo que --help, --version, --stats y --audit-query
+arrancan sin cargarlos.
 """
 import sys
 import argparse
 import json
+import time
 from pathlib import Path
 from datetime import date
 from decimal import Decimal
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 
-from models.documento import Documento, MontosCobro
-from models.asegurado import Asegurado
-from models.poliza import Poliza
-from generators.carta_cobro_generator import CartaCobroGenerator
 from utils.config import config
 from utils.logger import get_logger
-from utils.versioning import version_manager
-from utils.payee_manager import payee_manager
+
+if TYPE_CHECKING:
+    from generators.carta_cobro_generator import CartaCobroGenerator
+    from generators.parallel import ParallelRenderer
 
 logger = get_logger(__name__)
 
+# Números de carta reservados por cada acceso al archivo de consecutivos en lotes
+BATCH_BLOCK_SIZE = 100
+
 
 def manage_payees_menu():
     """Menú para gestionar aseguradoras beneficiarias."""
+    from utils.payee_manager import payee_manager
+    
     while True:
         print("\n" + "=" * 60)
         print("GESTIÓN DE ASEGURADORAS BENEFICIARIAS")
@@ -82,7 +92,11 @@ def manage_payees_menu():
                     new_name = new_name or old_payee['name']
                     new_nit = new_nit or old_payee['nit']
                     
-                    result = payee_manager.update_payee(old_payee['name'], new_name, new_nit)
+                    try:
+                        result = payee_manager.update_payee(old_payee['name'], new_name, new_nit)
+                    except ValueError as e:
+                        print(f"⚠ {str(e)}")
+                        continue
                     if result:
                         print(f"✓ Aseguradora actualizada exitosamente")
                     else:
@@ -138,6 +152,14 @@ def manage_payees_menu():
 
 def interactive_mode():
     """Modo interactivo para captura de datos."""
+    from models.documento import Documento, MontosCobro
+    from models.asegurado import Asegurado
+    from models.poliza import Poliza
+    from generators.carta_cobro_generator import CartaCobroGenerator
+    from generators.carta_data import build_output_filename
+    from utils.versioning import version_manager
+    from utils.payee_manager import payee_manager
+    
     print("\n" + "=" * 60)
     print("GENERADOR DE CARTAS DE COBRO - Modo Interactivo")
     print("=" * 60 + "\n")
@@ -325,7 +347,7 @@ def interactive_mode():
         # Generar PDF
         print("\n⏳ Generando PDF...")
         generator = CartaCobroGenerator(output_dir=config.OUTPUT_DIR / 'cartas')
-        output_filename = f"CARTA_{documento.numero_carta_normalized}_{asegurado.nit.replace('-', '')}"
+        output_filename = build_output_filename(documento)
         
         pdf_path = generator.generate(documento.to_pdf_data(), output_filename)
         
@@ -341,39 +363,44 @@ def interactive_mode():
         sys.exit(1)
 
 
+def _is_json_array(json_path: Path) -> bool:
+    """True si el archivo JSON contiene un arreglo (lote) y no una sola carta."""
+    with open(json_path, 'r', encoding='utf-8-sig') as f:
+        for chunk in iter(lambda: f.read(1024), ''):
+            stripped = chunk.lstrip()
+            if stripped:
+                return stripped[0] == '['
+    return False
+
+
 def from_json_file(json_path: Path):
-    """Genera carta desde archivo JSON."""
+    """
+    Genera carta desde archivo JSON.
+    
+    Si el archivo contiene un arreglo de cartas se procesa como lote, leyendo
+    un registro a la vez (ver ``batch_mode``). Una carta puede traer una sola
+    ``poliza`` o un arreglo ``polizas`` (tabla multi-póliza); en ese caso la
+    póliza principal y los montos totales se derivan de las pólizas.
+    """
+    from generators.carta_cobro_generator import CartaCobroGenerator
+    from generators.carta_data import build_documento, build_output_filename, build_pdf_data
+    
     try:
+        if _is_json_array(json_path):
+            batch_mode(json_path)
+            return
+        
         with open(json_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
-        # Construir modelo desde JSON
-        asegurado = Asegurado(**data['asegurado'])
-        poliza = Poliza(**data['poliza'])
-        montos = MontosCobro(**data['montos'])
-        
-        documento = Documento(
-            ciudad_emision=data.get('ciudad_emision', 'Medellín'),
-            fecha_emision=date.fromisoformat(data['fecha_emision']) if isinstance(data['fecha_emision'], str) else data['fecha_emision'],
-            numero_carta=data['numero_carta'],
-            mes_cobro=data['mes_cobro'],
-            fecha_limite_pago=date.fromisoformat(data['fecha_limite_pago']) if isinstance(data['fecha_limite_pago'], str) else data['fecha_limite_pago'],
-            asegurado=asegurado,
-            poliza=poliza,
-            montos=montos,
-            payee_company_name=data.get('payee_company_name', 'SEGUROS DE VIDA SURAMERICANA S.A.'),
-            payee_company_nit=data.get('payee_company_nit', '890903790-5'),
-            firmante_nombre=data['firmante_nombre'],
-            firmante_cargo=data['firmante_cargo'],
-            firmante_iniciales=data.get('firmante_iniciales'),
-            es_borrador=data.get('es_borrador', False)
-        )
+        # Mismo modelo que los lotes: póliza única o arreglo de pólizas
+        documento = build_documento(data)
         
         # Generar PDF
         generator = CartaCobroGenerator(output_dir=config.OUTPUT_DIR / 'cartas')
-        output_filename = f"CARTA_{documento.numero_carta_normalized}_{asegurado.nit.replace('-', '')}"
+        output_filename = build_output_filename(documento)
         
-        pdf_path = generator.generate(documento.to_pdf_data(), output_filename)
+        pdf_path = generator.generate(build_pdf_data(documento, data), output_filename)
         
         print(f"✅ PDF generado exitosamente: {pdf_path}")
         logger.info(f"PDF generado desde JSON: {pdf_path}")
@@ -387,6 +414,369 @@ def from_json_file(json_path: Path):
         sys.exit(1)
 
 
+def _iter_job_blocks(batch_path: Path, after: int = 0,
+                     previous_numeros: Optional[Callable[[str], List[str]]] = None):
+    """
+    Valida un lote por bloques de ``BATCH_BLOCK_SIZE`` registros.
+    
+    Cada bloque se valida en una sola pasada
+    (``models.batch.validate_documentos``). Los números de carta faltantes se
+    asignan después de validar, solo a los registros válidos; se reservan
+    por bloques y los sobrantes se devuelven al terminar.
+    
+    Args:
+        batch_path: Archivo .csv, .jsonl o .json con un registro por carta
+        after: Omitir los registros con número menor o igual (ya procesados)
+        previous_numeros: Números asignados antes a un registro idéntico,
+            según su huella (``JobQueue.previous_numeros``). Un registro sin
+            número de carta que no cambió reutiliza su número en lugar de
+            consumir un consecutivo nuevo.
+    
+    Yields:
+        (trabajos [(registro, datos del PDF, nombre de archivo, huella del
+         registro)], fallidos [(registro, error)], registros leídos) de cada bloque
+    """
+    from itertools import islice
+    from generators.carta_data import build_output_filename, build_pdf_data, validate_cartas
+    from utils.versioning import version_manager
+    from utils.batch_reader import InvalidRecord, iter_batch_records
+    from utils.job_queue import record_hash
+    from utils.profiling import profiler
+    
+    records = (item for item in iter_batch_records(batch_path) if item[0] > after)
+    allocator = version_manager.block_allocator(BATCH_BLOCK_SIZE)
+    # Números reutilizables por huella de registro (se consumen en orden)
+    reusable: Dict[str, List[str]] = {}
+    
+    def next_numero(input_hash: str) -> str:
+        if previous_numeros is not None:
+            if input_hash not in reusable:
+                reusable[input_hash] = previous_numeros(input_hash)
+            if reusable[input_hash]:
+                return reusable[input_hash].pop(0)
+        return allocator.next_numero_carta()
+    
+    try:
+        while True:
+            chunk = list(islice(records, BATCH_BLOCK_SIZE))
+            if not chunk:
+                break
+            
+            jobs, failures = [], []
+            count = len(chunk)
+            for record_number, record in chunk:
+                if isinstance(record, InvalidRecord):
+                    failures.append((record_number, record.error))
+                    logger.error(f"Registro {record_number}: {record.error}")
+            chunk = [item for item in chunk if not isinstance(item[1], InvalidRecord)]
+            # Huella del registro tal como vino, antes de asignar número de carta
+            hashes = [record_hash(record) for _, record in chunk]
+            
+            with profiler.stage('documento'):
+                result = validate_cartas(
+                    [record for _, record in chunk],
+                    next_numero=lambda index: next_numero(hashes[index])
+                )
+            
+            for row_error in result.errors:
+                record_number = chunk[row_error.index][0]
+                failures.append((record_number, row_error.message))
+                logger.error(f"Registro {record_number}: datos inválidos: {row_error.message}")
+            
+            for index, documento in result.documentos:
+                record_number, record = chunk[index]
+                try:
+                    with profiler.stage('pdf_data'):
+                        pdf_data = build_pdf_data(documento, record)
+                    jobs.append((record_number, pdf_data, build_output_filename(documento), hashes[index]))
+                except Exception as e:
+                    failures.append((record_number, str(e)))
+                    logger.error(f"Registro {record_number}: datos inválidos: {str(e)}")
+            
+            yield jobs, failures, count
+    finally:
+        allocator.close()
+
+
+def _iter_render_jobs(batch_path: Path, summary: dict):
+    """
+    Construye los trabajos de renderizado de un lote.
+    
+    Los registros inválidos se agregan a ``summary['fallidos']`` y no se
+    envían al renderizador.
+    """
+    for jobs, failures, count in _iter_job_blocks(batch_path):
+        summary['total'] += count
+        summary['fallidos'].extend(failures)
+        for record_number, pdf_data, output_filename, _ in jobs:
+            yield record_number, pdf_data, output_filename
+
+
+def _enqueue_batch(queue, run_id: str, batch_path: Path):
+    """
+    Encola los registros de un lote (un bloque por transacción).
+    
+    Si la ejecución se interrumpió mientras se encolaba, continúa después del
+    último registro guardado. Los registros sin número de carta que no
+    cambiaron desde un lote anterior conservan su número.
+    """
+    blocks = _iter_job_blocks(
+        batch_path,
+        after=queue.last_record(run_id),
+        previous_numeros=lambda input_hash: queue.previous_numeros(run_id, input_hash)
+    )
+    for jobs, failures, _ in blocks:
+        duplicates = queue.add_block(run_id, jobs, failures)
+        if duplicates:
+            logger.warning(f"Ejecución {run_id}: {duplicates} carta(s) repetida(s) en el lote")
+    queue.mark_enqueued(run_id)
+
+
+def run_batch(batch_path: Optional[Path], renderer: 'ParallelRenderer', run_id: str = None,
+              force: bool = False) -> dict:
+    """
+    Genera todas las cartas de un archivo de lote.
+    
+    Los registros se guardan primero en la cola persistente
+    (``utils.job_queue``) como una ejecución nueva; luego se generan las
+    cartas pendientes y se registra el resultado de cada una. Con ``run_id``
+    se retoma una ejecución anterior: solo se generan las cartas que no
+    terminaron (pendientes, interrumpidas o fallidas al generarse).
+    
+    La regeneración es incremental: una carta cuyo PDF ya existe y se generó
+    con la misma huella (mismos datos, plantilla y versión del diseño) se
+    omite. ``force`` regenera todas.
+    
+    Un registro inválido no detiene el lote: se registra el error y se
+    continúa con el siguiente.
+    
+    Args:
+        batch_path: Archivo .csv, .jsonl o .json con un registro por carta
+            (se ignora al retomar: se usa el de la ejecución)
+        renderer: Renderizador (en proceso o con pool de procesos)
+        run_id: Ejecución a retomar (None = ejecución nueva)
+        force: Regenerar también las cartas sin cambios
+    
+    Returns:
+        dict: Resumen de la ejecución con 'run_id', 'source', 'total',
+        'generados', 'omitidos', 'pendientes', 'reintentables' y
+        'fallidos' [(registro, error)]
+    
+    Raises:
+        ValueError: Si ``run_id`` no existe o el formato del lote no es soportado
+        OSError: Si el archivo de lote no existe o no se puede leer
+    """
+    from utils.atomic_file import remove_stale_temp_files
+    from utils.batch_reader import check_batch_file
+    from utils.job_queue import JobQueue
+    
+    # Temporales de escrituras interrumpidas (proceso terminado a la fuerza)
+    remove_stale_temp_files(
+        renderer.output_dir, renderer.output_dir.parent / 'borradores', config.RENDER_CACHE_DIR
+    )
+    queue = JobQueue.open(config.JOB_QUEUE_DB)
+    if run_id is None:
+        # Un archivo faltante o ilegible no debe dejar una ejecución huérfana
+        run_id = queue.create_run(check_batch_file(batch_path))
+    else:
+        run = queue.get_run(run_id)
+        if run is None:
+            raise ValueError(f"Ejecución no encontrada: {run_id}")
+        batch_path = Path(run['source'])
+    print(f"🆔 Ejecución {run_id} (si se interrumpe: python cli.py --resume {run_id})")
+    
+    if not queue.get_run(run_id)['enqueued']:
+        _enqueue_batch(queue, run_id, batch_path)
+    
+    hashes = {}
+    skipped = []
+    
+    def changed_jobs():
+        """Trabajos pendientes cuyo PDF falta o está desactualizado."""
+        for key, data, output_filename in queue.iter_unfinished(run_id, BATCH_BLOCK_SIZE):
+            output_path, content_hash = renderer.expected_output(data, output_filename)
+            if (not force and output_path.exists()
+                    and queue.last_content_hash(str(output_path)) == content_hash):
+                skipped.append((key, str(output_path), content_hash))
+                if len(skipped) >= BATCH_BLOCK_SIZE:
+                    queue.skip(run_id, skipped)
+                    skipped.clear()
+                continue
+            hashes[key] = content_hash
+            yield key, data, output_filename
+    
+    processed = 0
+    finished = []
+    for result in renderer.render(changed_jobs()):
+        content_hash = hashes.pop(result.key, None)
+        if result.ok:
+            finished.append((result.key, str(result.output_path), None, content_hash))
+            logger.debug(f"Carta {result.key}: PDF generado {result.output_path}")
+        else:
+            finished.append((result.key, None, result.error, None))
+            logger.error(f"Carta {result.key}: error generando carta: {result.error}")
+        
+        processed += 1
+        if processed % BATCH_BLOCK_SIZE == 0:
+            queue.finish(run_id, finished)
+            finished = []
+            print(f"⏳ {processed} cartas procesadas...")
+    queue.finish(run_id, finished)
+    queue.skip(run_id, skipped)
+    
+    summary = queue.summary(run_id)
+    summary.update(run_id=run_id, source=batch_path)
+    return summary
+
+
+def run_batch_collated(batch_path: Path, generator: 'CartaCobroGenerator', output_filename: str) -> dict:
+    """
+    Genera todas las cartas válidas de un lote en un único PDF.
+    
+    Args:
+        batch_path: Archivo .csv, .jsonl o .json con un registro por carta
+        generator: Generador de cartas
+        output_filename: Nombre (o ruta) del PDF consolidado
+    
+    Returns:
+        dict: Resumen con 'total', 'generados', 'fallidos' y 'output_path'
+    """
+    from itertools import chain
+    
+    from utils.atomic_file import remove_stale_temp_files
+    
+    remove_stale_temp_files(generator.output_dir)
+    summary = {'total': 0, 'generados': 0, 'fallidos': [], 'output_path': None}
+    
+    # Las cartas se leen a medida que se diseñan, sin cargar todo el lote
+    jobs = (data for _, data, _ in _iter_render_jobs(batch_path, summary))
+    first = next(jobs, None)
+    if first is None:
+        return summary
+    
+    def counted():
+        for data in chain([first], jobs):
+            summary['generados'] += 1
+            yield data
+    
+    summary['output_path'] = generator.generate_collated(
+        counted(),
+        output_filename,
+        title=f"Lote de Cartas de Cobro - {Path(batch_path).stem}"
+    )
+    
+    return summary
+
+
+def batch_mode(batch_path: Optional[Path], workers: int = 1, collate: str = None, resume: str = None,
+               force: bool = False):
+    """
+    Genera cartas en lote desde un archivo CSV, JSONL o JSON (arreglo).
+    
+    Con ``resume`` retoma la ejecución indicada en lugar de leer un archivo;
+    con ``force`` regenera también las cartas que no cambiaron.
+    """
+    from generators.carta_cobro_generator import CartaCobroGenerator
+    from generators.parallel import ParallelRenderer
+    
+    workers_used = 1
+    try:
+        if collate:
+            generator = CartaCobroGenerator(output_dir=config.OUTPUT_DIR / 'cartas')
+            summary = run_batch_collated(batch_path, generator, collate)
+        else:
+            renderer = ParallelRenderer(
+                config.OUTPUT_DIR / 'cartas',
+                workers=workers,
+                use_cache=config.RENDER_CACHE
+            )
+            workers_used = renderer.workers
+            summary = run_batch(batch_path, renderer, run_id=resume, force=force)
+            batch_path = summary['source']
+    except FileNotFoundError:
+        print(f"❌ Error: Archivo no encontrado: {batch_path}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        logger.error(f"Error en modo lote: {str(e)}", exc_info=True)
+        sys.exit(1)
+    
+    print("\n📦 RESUMEN DEL LOTE")
+    print("=" * 50)
+    print(f"Registros procesados: {summary['total']}")
+    print(f"Cartas generadas:     {summary['generados']}")
+    if summary.get('omitidos'):
+        print(f"Cartas sin cambios:   {summary['omitidos']}")
+    print(f"Registros fallidos:   {len(summary['fallidos'])}")
+    for record_number, error in summary['fallidos']:
+        print(f"  - Registro {record_number}: {error}")
+    if summary.get('output_path'):
+        print(f"PDF consolidado:      {summary['output_path']}")
+    if summary.get('run_id'):
+        print(f"Ejecución:            {summary['run_id']}")
+        if summary['pendientes'] or summary['reintentables']:
+            print(f"Reintentar pendientes: python cli.py --resume {summary['run_id']}")
+    print("=" * 50 + "\n")
+    
+    logger.info(
+        f"Lote {batch_path}: {summary['generados']}/{summary['total']} cartas generadas "
+        f"({workers_used} procesos)"
+    )
+    
+    if summary['fallidos']:
+        sys.exit(1)
+
+
+def audit_query(nit: str = None, policy: str = None, document: str = None,
+                since: str = None, until: str = None, limit: int = None,
+                reindex: bool = False):
+    """Consulta el índice del log de auditoría."""
+    from utils.audit import audit_writer
+    from utils.audit_index import AuditIndex, index_path_for
+    
+    index = AuditIndex.open(index_path_for(audit_writer.log_file), audit_writer.log_file)
+    
+    if reindex:
+        audit_writer.flush()
+        total = index.rebuild(audit_writer.log_file)
+        print(f"✅ Índice reconstruido: {total} entradas")
+    
+    try:
+        start = time.perf_counter()
+        entries = index.query(nit=nit, policy=policy, document=document,
+                              since=since, until=until, limit=limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    except ValueError as e:
+        print(f"❌ Fecha inválida: {str(e)}")
+        sys.exit(1)
+    
+    print("\n🔎 CONSULTA DE AUDITORÍA")
+    print("=" * 100)
+    for entry in entries:
+        borrador = " [BORRADOR]" if entry['is_draft'] else ""
+        print(
+            f"{entry['timestamp'][:19]}  {entry['document_number']:<14} "
+            f"NIT {entry['client_nit']:<14} Póliza {entry['policy_number']:<12} "
+            f"{entry['status']}{borrador}  {entry['output_path']}"
+        )
+    print("=" * 100)
+    print(f"{len(entries)} resultado(s) en {elapsed_ms:.1f} ms\n")
+
+
+def print_profile(output: Path = None):
+    """Muestra el desglose de tiempos por etapa y, si se indica, lo exporta."""
+    from utils.profiling import profiler
+    
+    print("\n⏱️  TIEMPOS POR ETAPA")
+    print("=" * 70)
+    print(profiler.format_summary())
+    print("=" * 70 + "\n")
+    
+    if output is not None:
+        profiler.export(output)
+        print(f"📄 Tiempos exportados: {output}")
+
+
 def main():
     """Función principal del CLI."""
     parser = argparse.ArgumentParser(
@@ -396,7 +786,16 @@ def main():
 Ejemplos:
   python cli.py --interactive
   python cli.py --from-json datos_carta.json
+  python cli.py --batch lote.csv
+  python cli.py --batch lote.jsonl --workers 8
+  python cli.py --batch lote.csv --collate lote_octubre.pdf
+  python cli.py --resume 20261031-182204-3fa9c1 --workers 8
+  python cli.py --batch lote.csv --force
+  python cli.py --from-json datos_carta.json --no-cache
+  python cli.py --batch lote.csv --profile --profile-output tiempos.prom
   python cli.py --stats
+  python cli.py --audit-query --nit 900123456-6 --since 2026-01-01
+  python cli.py --audit-query --document "15434 - 2025"
         """
     )
     
@@ -413,12 +812,83 @@ Ejemplos:
         help='Generar carta desde archivo JSON'
     )
     
+    parser.add_argument(
+        '--batch', '-b',
+        type=Path,
+        metavar='FILE',
+        help='Generar cartas en lote desde archivo CSV, JSONL o JSON (arreglo)'
+    )
+    
+    parser.add_argument(
+        '--resume', '-r',
+        metavar='RUN_ID',
+        help='Retomar un lote interrumpido: generar solo las cartas que no terminaron'
+    )
+    
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Procesos para renderizar el lote en paralelo (0 = todos los núcleos)'
+    )
+    
+    parser.add_argument(
+        '--collate', '-c',
+        metavar='PDF',
+        help='Generar todas las cartas del lote en un único PDF (para impresión)'
+    )
+    
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Regenerar todas las cartas del lote, también las que no cambiaron'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Renderizar siempre, sin reutilizar PDFs de cartas idénticas'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Medir el tiempo de cada etapa y mostrar el desglose al terminar'
+    )
+    
+    parser.add_argument(
+        '--profile-output',
+        type=Path,
+        metavar='FILE',
+        help='Exportar los tiempos por etapa (.prom = Prometheus, otro = JSON lines)'
+    )
+    
     parser.add_argument(
         '--stats', '-s',
         action='store_true',
         help='Mostrar estadísticas de documentos generados'
     )
     
+    parser.add_argument(
+        '--audit-query', '-a',
+        action='store_true',
+        help='Consultar el log de auditoría (filtros: --nit, --policy, --document, --since, --until)'
+    )
+    
+    audit_group = parser.add_argument_group('filtros de --audit-query')
+    audit_group.add_argument('--nit', help='NIT del cliente')
+    audit_group.add_argument('--policy', metavar='NUMERO', help='Número de póliza')
+    audit_group.add_argument('--document', metavar='NUMERO', help='Número de carta (ej: "15434 - 2025")')
+    audit_group.add_argument('--since', metavar='FECHA', help='Desde fecha ISO (ej: 2026-01-01)')
+    audit_group.add_argument('--until', metavar='FECHA', help='Hasta fecha ISO (incluida)')
+    audit_group.add_argument('--limit', type=int, metavar='N', help='Máximo de resultados')
+    audit_group.add_argument(
+        '--reindex',
+        action='store_true',
+        help='Reconstruir el índice desde audit_trail.log antes de consultar'
+    )
+    
     parser.add_argument(
         '--manage-payees', '-m',
         action='store_true',
@@ -434,24 +904,48 @@ Ejemplos:
     args = parser.parse_args()
     
     # Si no se especifica ningún argumento, mostrar ayuda
-    if not any([args.interactive, args.from_json, args.stats, args.manage_payees]):
+    if not any([args.interactive, args.from_json, args.batch, args.resume, args.stats,
+                args.audit_query, args.manage_payees]):
         parser.print_help()
         sys.exit(0)
     
+    if args.no_cache:
+        config.RENDER_CACHE = False
+    
+    profile = args.profile or args.profile_output is not None
+    if profile:
+        from utils.profiling import profiler
+        profiler.enabled = True
+    
     # Ejecutar según modo
-    if args.interactive:
-        interactive_mode()
-    elif args.from_json:
-        from_json_file(args.from_json)
-    elif args.stats:
-        stats = version_manager.get_statistics()
-        print("\n📊 ESTADÍSTICAS DE DOCUMENTOS GENERADOS")
-        print("=" * 50)
-        for year, data in stats.items():
-            print(f"Año {data['year']}: {data['total_documents']} documentos")
-        print("=" * 50 + "\n")
-    elif args.manage_payees:
-        manage_payees_menu()
+    try:
+        if args.interactive:
+            interactive_mode()
+        elif args.from_json:
+            from_json_file(args.from_json)
+        elif args.batch:
+            batch_mode(args.batch, workers=args.workers or None, collate=args.collate, force=args.force)
+        elif args.resume:
+            if args.collate:
+                parser.error('--collate no se puede usar con --resume')
+            batch_mode(None, workers=args.workers or None, resume=args.resume, force=args.force)
+        elif args.stats:
+            from utils.versioning import version_manager
+            stats = version_manager.get_statistics()
+            print("\n📊 ESTADÍSTICAS DE DOCUMENTOS GENERADOS")
+            print("=" * 50)
+            for year, data in stats.items():
+                print(f"Año {data['year']}: {data['total_documents']} documentos")
+            print("=" * 50 + "\n")
+        elif args.audit_query:
+            audit_query(nit=args.nit, policy=args.policy, document=args.document,
+                        since=args.since, until=args.until, limit=args.limit,
+                        reindex=args.reindex)
+        elif args.manage_payees:
+            manage_payees_menu()
+    finally:
+        if profile:
+            print_profile(args.profile_output)
 
 
 if __name__ == '__main__':
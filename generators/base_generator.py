@@ -3,9 +3,11 @@ Clase base abstracta para generadores de PDF.
 """
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from datetime import datetime
-import json
+
+from utils.audit import audit_writer
+from utils.profiling import profiler
 
 
 class BaseGenerator(ABC):
@@ -24,15 +26,18 @@ class BaseGenerator(ABC):
         """
         self.output_dir = output_dir or Path("output/cartas")
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Destino de las entradas de auditoría (None = escritor global)
+        self.audit_sink: Optional[Callable[[Dict[str, Any]], None]] = None
     
     @abstractmethod
-    def generate(self, data: Dict[str, Any], output_filename: str) -> Path:
+    def generate(self, data: Dict[str, Any], output_filename: str, output_dir: Optional[Path] = None) -> Path:
         """
         Genera el documento PDF.
         
         Args:
             data: Diccionario con los datos del documento
             output_filename: Nombre del archivo de salida (sin extensión)
+            output_dir: Carpeta de destino (None = carpeta del generador)
         
         Returns:
             Path: Ruta completa al archivo PDF generado
@@ -55,18 +60,38 @@ class BaseGenerator(ABC):
         """
         pass
     
-    def _get_output_path(self, filename: str, is_draft: bool = False) -> Path:
+    def output_path_for(self, data: Dict[str, Any], output_filename: str,
+                        output_dir: Optional[Path] = None) -> Path:
+        """
+        Ruta donde ``generate`` escribe el PDF de ``data``.
+        
+        Args:
+            data: Datos del documento
+            output_filename: Nombre del archivo de salida
+            output_dir: Carpeta de destino (None = la del generador)
+        
+        Returns:
+            Path: Ruta completa al archivo
+        """
+        return self._get_output_path(output_filename, data.get('es_borrador', False), output_dir)
+    
+    def _get_output_path(self, filename: str, is_draft: bool = False,
+                         output_dir: Optional[Path] = None) -> Path:
         """
         Determina la ruta de salida según el estado del documento.
         
         Args:
             filename: Nombre base del archivo
             is_draft: Si es borrador, se guarda en carpeta diferente
+            output_dir: Carpeta elegida por el usuario (tiene prioridad)
         
         Returns:
             Path: Ruta completa al archivo
         """
-        if is_draft:
+        if output_dir is not None:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+        elif is_draft:
             output_dir = self.output_dir.parent / "borradores"
             output_dir.mkdir(parents=True, exist_ok=True)
         else:
@@ -105,20 +130,17 @@ class BaseGenerator(ABC):
             output_path: Ruta del archivo generado
             success: Si la generación fue exitosa
         """
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "document_type": self.__class__.__name__,
-            "document_number": data.get('numero_carta', 'N/A'),
-            "policy_number": data.get('poliza_numero', 'N/A'),
-            "client_nit": data.get('cliente_nit', 'N/A'),
-            "output_path": str(output_path),
-            "status": "success" if success else "failed",
-            "is_draft": data.get('es_borrador', False)
-        }
-        
-        # Guardar en log de auditoría
-        log_file = Path("logs") / "audit_trail.log"
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + '\n')
+        with profiler.stage('auditoria'):
+            log_entry = {
+                "timestamp": datetime.now().isoformat(),
+                "document_type": self.__class__.__name__,
+                "document_number": data.get('numero_carta', 'N/A'),
+                "policy_number": data.get('poliza_numero', 'N/A'),
+                "client_nit": data.get('cliente_nit', 'N/A'),
+                "output_path": str(output_path),
+                "status": "success" if success else "failed",
+                "is_draft": data.get('es_borrador', False)
+            }
+            
+            # Guardar en log de auditoría (escritura agrupada en segundo plano)
+            (self.audit_sink or audit_writer.write)(log_entry)
@@ -1,17 +1,170 @@
 """
 Generador PDF especializado para cartas de cobro de SEGUROS UNIÓN.
 """
+import copy
+import io
+from decimal import Decimal
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, BinaryIO, Iterable, Optional, Union
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import cm
 from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from reportlab.platypus.flowables import Flowable
 from reportlab.pdfgen import canvas
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
 
+from utils.atomic_file import atomic_open, write_bytes_atomic
+from utils.config import config
+from utils.profiling import profiler
 from .base_generator import BaseGenerator
+from .fast_renderer import draw_single_page, frame_width, layout_single_page
+from .render_cache import RenderCache, payload_hash, render_cache
+from .template_compiler import RenderPlan, load_render_plan
+
+# Plantilla por defecto de la carta
+DEFAULT_TEMPLATE_ID = 'carta_cobro_seguros_union'
+
+# Campos que BaseGenerator._log_generation lee de cada carta
+_AUDIT_FIELDS = ('numero_carta', 'poliza_numero', 'cliente_nit', 'es_borrador')
+
+
+def _build_style_sheet() -> StyleSheet1:
+    """Construye la hoja de estilos de párrafo de la carta."""
+    styles = getSampleStyleSheet()
+    
+    # Modificar el estilo Normal para usar justificación
+    styles['Normal'].alignment = TA_JUSTIFY
+    styles['Normal'].fontName = 'Helvetica'
+    styles['Normal'].fontSize = 10
+    
+    # Estilos personalizados
+    styles.add(ParagraphStyle(
+        name='CartaTitle',
+        parent=styles['Heading1'],
+        fontSize=14,
+        textColor=colors.black,
+        alignment=TA_LEFT,
+        spaceAfter=6,
+        fontName='Helvetica-Bold'
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='Small',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.black,
+        alignment=TA_JUSTIFY  # También justificado para textos pequeños
+    ))
+    
+    # Número de carta alineado a la derecha
+    styles.add(ParagraphStyle(
+        name='HeaderRight',
+        parent=styles['Normal'],
+        alignment=TA_RIGHT,
+        fontSize=12,
+        fontName='Helvetica-Bold'
+    ))
+    
+    # Footer centrado
+    styles.add(ParagraphStyle(
+        name='CenteredSmall',
+        parent=styles['Small'],
+        alignment=TA_CENTER
+    ))
+    
+    return styles
+
+
+class _LetterStart(Flowable):
+    """
+    Marcador invisible del inicio de una carta en un PDF con varias cartas.
+    
+    Registra el marcador/entrada de índice de la carta y, si es borrador,
+    dibuja la marca de agua de la página donde empieza.
+    """
+    
+    def __init__(self, key: str, title: str, is_draft: bool, state: Dict, watermark):
+        super().__init__()
+        self.key = key
+        self.title = title
+        self.is_draft = is_draft
+        self.state = state
+        self.watermark = watermark
+    
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+    
+    def drawOn(self, canvas_obj, x, y, _sW=0):
+        canvas_obj.bookmarkPage(self.key)
+        canvas_obj.addOutlineEntry(self.title, self.key, level=0)
+        self.state['draft'] = self.is_draft
+        if self.is_draft:
+            self.watermark(canvas_obj, None)
+    
+    def draw(self):
+        pass
+
+
+class _LetterEnd(Flowable):
+    """Marcador invisible del final de una carta (desactiva la marca de agua)."""
+    
+    def __init__(self, state: Dict):
+        super().__init__()
+        self.state = state
+    
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+    
+    def drawOn(self, canvas_obj, x, y, _sW=0):
+        self.state['draft'] = False
+    
+    def draw(self):
+        pass
+
+
+def _as_decimal(value: Any) -> Decimal:
+    """
+    Monto de una póliza como Decimal.
+    
+    Acepta Decimal (``Documento.to_pdf_data``), float (interfaz gráfica) o
+    texto (datos leídos de la cola de lotes).
+    """
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+@lru_cache(maxsize=None)
+def get_carta_styles() -> StyleSheet1:
+    """
+    Retorna la hoja de estilos compartida del proceso.
+    
+    Se construye una sola vez y se comparte entre todas las cartas; los
+    estilos son de solo lectura, no deben modificarse.
+    """
+    return _build_style_sheet()
+
+
+@lru_cache(maxsize=256)
+def _payment_link_prototype(link_pago: str, style: ParagraphStyle) -> Paragraph:
+    """
+    Párrafo de instrucción de pago para un link de aseguradora.
+    
+    Solo depende del link, así que se analiza una vez por link y cada carta
+    usa una copia (ver ``CartaCobroGenerator._build_payment_link``).
+    """
+    # Asegurar que el link tenga protocolo para ser clickeable
+    if not link_pago.startswith(('http://', 'https://')):
+        link_url = f'https://{link_pago}'
+    else:
+        link_url = link_pago
+    
+    # Párrafo con link azul clickeable
+    return Paragraph(
+        f'PUEDE REALIZAR SUS PAGOS POR PSE EN LA PAGINA WEB <a href="{link_url}" color="blue"><u>{link_pago}</u></a>',
+        style
+    )
 
 
 class CartaCobroGenerator(BaseGenerator):
@@ -19,10 +172,34 @@ class CartaCobroGenerator(BaseGenerator):
     Generador de PDF para cartas de cobro de pólizas de seguros.
     """
     
-    def __init__(self, output_dir: Path = None):
+    def __init__(self, output_dir: Path = None, use_cache: bool = None, template_path: Path = None,
+                 fast_path: bool = None):
+        """
+        Args:
+            output_dir: Directorio donde se guardarán los PDFs generados
+            use_cache: Reutilizar PDFs de cartas idénticas (None = config.RENDER_CACHE)
+            template_path: Plantilla JSON de la carta (None = carta_cobro_seguros_union)
+            fast_path: Dibujar directamente en el canvas las cartas de una página
+                (None = config.FAST_RENDER)
+        """
         super().__init__(output_dir)
         self.page_width, self.page_height = letter
         self.margin = 2.5 * cm
+        self.styles = self._create_styles()
+        self.plan: RenderPlan = load_render_plan(
+            template_path or config.get_template_path(DEFAULT_TEMPLATE_ID),
+            self.styles
+        )
+        # Bloques de la plantilla con lógica propia
+        self.blocks = {
+            'billing_table': lambda data: [self._build_billing_table(data)],
+            'retorno': self._build_retorno,
+            'payment_link': self._build_payment_link
+        }
+        if use_cache is None:
+            use_cache = config.RENDER_CACHE
+        self.render_cache: Optional[RenderCache] = render_cache if use_cache else None
+        self.fast_path = config.FAST_RENDER if fast_path is None else fast_path
     
     def validate_data(self, data: Dict[str, Any]) -> bool:
         """
@@ -44,202 +221,218 @@ class CartaCobroGenerator(BaseGenerator):
         
         return True
     
-    def generate(self, data: Dict[str, Any], output_filename: str) -> Path:
+    def generate(self, data: Dict[str, Any], output_filename: str, output_dir: Path = None) -> Path:
         """
         Genera el PDF de la carta de cobro.
         
+        El PDF se arma en memoria y se escribe de forma atómica en su destino
+        final: si la generación falla no queda un archivo a medias.
+        
         Args:
             data: Datos del documento (salida de Documento.to_pdf_data())
             output_filename: Nombre del archivo de salida
+            output_dir: Carpeta de destino (None = carpeta del generador,
+                o la de borradores si es borrador)
         
         Returns:
             Path: Ruta al archivo PDF generado
         """
-        # Validar datos
-        self.validate_data(data)
+        with profiler.letter(data.get('numero_carta', 'N/A')):
+            with profiler.stage('validacion'):
+                self.validate_data(data)
+            
+            output_path = self.output_path_for(data, output_filename, output_dir)
+            pdf = self._render_cached(data)
+            
+            with profiler.stage('escritura'):
+                write_bytes_atomic(output_path, pdf)
+            
+            # Log de auditoría
+            self._log_generation(data, output_path, success=True)
+            
+            return output_path
+    
+    def render_to_bytes(self, data: Dict[str, Any]) -> bytes:
+        """
+        Genera el PDF de la carta en memoria, sin escribir a disco.
+        
+        Pensado para servicios y lotes que entregan el PDF directamente (no
+        registra auditoría: la registra quien guarda o envía el PDF).
+        
+        Args:
+            data: Datos del documento (salida de Documento.to_pdf_data())
+        
+        Returns:
+            bytes: Contenido del PDF
+        
+        Raises:
+            ValueError: Si faltan campos requeridos
+        """
+        with profiler.letter(data.get('numero_carta', 'N/A')):
+            with profiler.stage('validacion'):
+                self.validate_data(data)
+            return self._render_cached(data)
+    
+    def content_hash(self, data: Dict[str, Any]) -> str:
+        """
+        Huella del PDF que generaría ``data``.
         
-        # Determinar ruta de salida
+        Cambia si cambian los datos, la plantilla o la versión del diseño
+        (``RENDER_CACHE_VERSION``); es también la clave de la caché.
+        
+        Returns:
+            str: Hash hexadecimal
+        """
+        return payload_hash(data, self.plan.fingerprint)
+    
+    def _render_cached(self, data: Dict[str, Any]) -> bytes:
+        """PDF de la carta, reutilizando la caché si la carta ya se generó."""
+        cache_key = None
+        if self.render_cache is not None:
+            with profiler.stage('cache'):
+                cache_key = self.content_hash(data)
+                pdf = self.render_cache.load(cache_key)
+            if pdf is not None:
+                return pdf
+        
+        pdf = self._render(data)
+        
+        if cache_key is not None:
+            with profiler.stage('cache'):
+                self.render_cache.store(cache_key, pdf)
+        return pdf
+    
+    def _render(self, data: Dict[str, Any]) -> bytes:
+        """Diseña y serializa la carta en un buffer en memoria."""
+        buffer = io.BytesIO()
         is_draft = data.get('es_borrador', False)
-        output_path = self._get_output_path(output_filename, is_draft)
         
         # Crear documento PDF
-        doc = SimpleDocTemplate(
-            str(output_path),
-            pagesize=letter,
-            topMargin=self.margin,
-            bottomMargin=2 * cm,
-            leftMargin=self.margin,
-            rightMargin=self.margin,
+        doc = self._create_doc_template(
+            buffer,
             title=f"Carta de Cobro {data['numero_carta']}",
             author=data.get('sender_company_name', 'SEGUROS UNIÓN')
         )
         
-        # Construir contenido
-        story = []
-        styles = self._create_styles()
-        
-        # Header (ciudad, fecha, número de carta)
-        story.extend(self._build_header(data, styles))
-        story.append(Spacer(1, 0.5 * cm))
-        
-        # Datos del cliente
-        story.extend(self._build_recipient_section(data, styles))
-        story.append(Spacer(1, 0.5 * cm))
-        
-        # Asunto
-        story.extend(self._build_subject_section(data, styles))
-        story.append(Spacer(1, 0.5 * cm))
-        
-        # Saludo
-        story.append(Paragraph("Cordial saludo", styles['Normal']))
-        story.append(Spacer(1, 0.3 * cm))
-        
-        # Contexto de cobro
-        story.append(Paragraph(
-            f"Cobro mensual correspondiente al mes de {data.get('mes_cobro', '')}",
-            styles['Normal']
-        ))
-        story.append(Spacer(1, 0.3 * cm))
-        
-        # Tabla de cobro
-        story.append(self._build_billing_table(data))
-        story.append(Spacer(1, 0.3 * cm))
-        
-        # Detalle de cuota
-        story.extend(self._build_installment_detail(data, styles))
-        story.append(Spacer(1, 0.3 * cm))
-        
-        # Definiciones
-        story.extend(self._build_definitions(styles))
-        story.append(Spacer(1, 0.3 * cm))
-        
-        # Instrucciones de pago
-        story.extend(self._build_payment_instructions(data, styles))
-        story.append(Spacer(1, 0.3 * cm))
-        
-        # Nota legal
-        story.extend(self._build_legal_notice(data, styles))
-        story.append(Spacer(1, 0.5 * cm))
-        
-        # Cierre
-        story.append(Paragraph("REITERAMOS NUESTRA DISPOSICIÓN DE SERVICIO.", styles['Normal']))
-        story.append(Spacer(1, 0.3 * cm))
-        story.append(Paragraph("Atentamente,", styles['Normal']))
-        story.append(Spacer(1, 1 * cm))
-        
-        # Firma
-        story.extend(self._build_signature(data, styles))
-        story.append(Spacer(1, 0.5 * cm))
-        
-        # Footer - Centrado
-        footer_style = ParagraphStyle(
-            name='CenteredSmall',
-            parent=styles['Small'],
-            alignment=TA_CENTER
-        )
-        story.append(Paragraph(
-            f"{data.get('sender_address', '')} E-mail: {data.get('sender_email', '')}",
-            footer_style
-        ))
-        
-        # Marca de agua si es borrador
-        if is_draft:
-            doc.build(story, onFirstPage=self._add_watermark, onLaterPages=self._add_watermark)
-        else:
-            doc.build(story)
-        
-        # Log de auditoría
-        self._log_generation(data, output_path, success=True)
-        
-        return output_path
+        if self.fast_path:
+            self.plan.prewrap(frame_width(doc))
+        
+        with profiler.stage('story'):
+            story = self._build_story(data)
+        
+        # Carta de una página: dibujar directamente, sin el motor de páginas
+        placements = None
+        if self.fast_path:
+            with profiler.stage('layout'):
+                placements = layout_single_page(story, doc)
+        
+        # Dibujo y serialización (con platypus incluye el diseño)
+        with profiler.stage('pdf'):
+            if placements is not None:
+                draw_single_page(placements, doc, on_page=self._add_watermark if is_draft else None)
+            elif is_draft:
+                # Marca de agua si es borrador
+                doc.build(story, onFirstPage=self._add_watermark, onLaterPages=self._add_watermark)
+            else:
+                doc.build(story)
+        
+        return buffer.getvalue()
     
-    def _create_styles(self) -> Dict[str, ParagraphStyle]:
-        """Crea los estilos de párrafo personalizados."""
-        styles = getSampleStyleSheet()
-        
-        # Modificar el estilo Normal para usar justificación
-        styles['Normal'].alignment = TA_JUSTIFY
-        styles['Normal'].fontName = 'Helvetica'
-        styles['Normal'].fontSize = 10
-        
-        # Crear o sobrescribir estilos personalizados
-        if 'CartaTitle' not in styles:
-            styles.add(ParagraphStyle(
-                name='CartaTitle',
-                parent=styles['Heading1'],
-                fontSize=14,
-                textColor=colors.black,
-                alignment=TA_LEFT,
-                spaceAfter=6,
-                fontName='Helvetica-Bold'
-            ))
+    def generate_collated(
+        self,
+        items: Iterable[Dict[str, Any]],
+        output: Union[str, BinaryIO],
+        title: str = "Lote de Cartas de Cobro"
+    ) -> Union[Path, BinaryIO]:
+        """
+        Genera varias cartas en un único PDF (una carta a continuación de otra).
         
-        if 'Small' not in styles:
-            styles.add(ParagraphStyle(
-                name='Small',
-                parent=styles['Normal'],
-                fontSize=8,
-                textColor=colors.black,
-                alignment=TA_JUSTIFY  # También justificado para textos pequeños
-            ))
+        Cada carta comienza en página nueva y tiene su propia entrada en el
+        índice (marcadores) del PDF. Las cartas en borrador llevan marca de
+        agua solo en sus páginas.
         
-        return styles
-    
-    def _build_header(self, data: Dict, styles) -> list:
-        """Construye la sección de encabezado."""
-        elements = []
+        Args:
+            items: Datos de cada carta (salida de Documento.to_pdf_data())
+            output: Nombre del archivo de salida, o un stream binario abierto
+                (por ejemplo la entrada de la cola de impresión)
+            title: Título del PDF
         
-        # Fecha alineada a la izquierda
-        elements.append(Paragraph(
-            f"{data['ciudad_emision']}, {data['fecha_emision']}",
-            styles['Normal']
-        ))
-        
-        # Número de carta alineado a la derecha
-        elements.append(Paragraph(
-            f"<b>CARTA COBRO N° {data['numero_carta']}</b>",
-            ParagraphStyle(
-                name='HeaderRight',
-                parent=styles['Normal'],
-                alignment=TA_RIGHT,
-                fontSize=12,
-                fontName='Helvetica-Bold'
-            )
-        ))
+        Returns:
+            Path del archivo generado, o el mismo stream si se pasó uno
         
-        return elements
-    
-    def _build_recipient_section(self, data: Dict, styles) -> list:
-        """Construye la sección de datos del destinatario (sin dirección)."""
-        elements = []
+        Raises:
+            ValueError: Si alguna carta no tiene los campos requeridos o no hay cartas
+        """
+        if isinstance(output, str):
+            output_path = self._get_output_path(output)
+        else:
+            output_path = output
         
-        elements.append(Paragraph("<b>Señores</b>", styles['Normal']))
-        elements.append(Paragraph(
-            f"{data['cliente_razon_social']}",
-            styles['Normal']
-        ))
-        elements.append(Paragraph(
-            f"{data['cliente_ciudad']}",
-            styles['Normal']
-        ))
-        elements.append(Paragraph(
-            f"NIT {data['cliente_nit']}",
-            styles['Normal']
-        ))
+        # Estado compartido con los marcadores: ¿la carta actual es borrador?
+        state = {'draft': False}
         
-        return elements
-    
-    def _build_subject_section(self, data: Dict, styles) -> list:
-        """Construye la sección de asunto."""
-        elements = []
+        def on_page(canvas_obj, doc):
+            if state['draft']:
+                self._add_watermark(canvas_obj, doc)
+        
+        story = []
+        letters = []
+        for idx, data in enumerate(items):
+            self.validate_data(data)
+            if story:
+                story.append(PageBreak())
+            story.append(_LetterStart(
+                key=f"carta_{idx}",
+                title=f"Carta {data['numero_carta']} - {data['cliente_razon_social']}",
+                is_draft=data.get('es_borrador', False),
+                state=state,
+                watermark=self._add_watermark
+            ))
+            story.extend(self._build_story(data))
+            story.append(_LetterEnd(state))
+            if not letters:
+                author = data.get('sender_company_name', 'SEGUROS UNIÓN')
+            # Solo los campos del log de auditoría: el lote puede ser grande
+            letters.append({key: data[key] for key in _AUDIT_FIELDS if key in data})
+        
+        if not letters:
+            raise ValueError("No hay cartas para generar")
+        
+        if isinstance(output, str):
+            # Archivo temporal que reemplaza al destino solo si todo el lote se generó
+            with atomic_open(output_path) as target:
+                doc = self._create_doc_template(target, title=title, author=author)
+                doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
+        else:
+            doc = self._create_doc_template(output, title=title, author=author)
+            doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
         
-        elements.append(Paragraph(f"<b>ASUNTO:</b>", styles['Normal']))
-        elements.append(Paragraph(
-            f"<b>{data['poliza_tipo']} N° {data['poliza_numero']}</b>",
-            styles['Normal']
-        ))
+        # Log de auditoría (una entrada por carta)
+        for data in letters:
+            self._log_generation(data, output_path, success=True)
         
-        return elements
+        return output_path
+    
+    def _create_doc_template(self, target: Union[str, BinaryIO], title: str, author: str) -> SimpleDocTemplate:
+        """Crea la plantilla de documento con la geometría de la carta."""
+        return SimpleDocTemplate(
+            target,
+            pagesize=letter,
+            topMargin=self.margin,
+            bottomMargin=2 * cm,
+            leftMargin=self.margin,
+            rightMargin=self.margin,
+            title=title,
+            author=author
+        )
+    
+    def _build_story(self, data: Dict[str, Any]) -> list:
+        """Construye la lista de flowables de una carta según la plantilla."""
+        return self.plan.build_story(data, self.blocks)
+    
+    def _create_styles(self) -> StyleSheet1:
+        """Retorna los estilos de párrafo (compartidos, de solo lectura)."""
+        return get_carta_styles()
     
     def _build_billing_table(self, data: Dict) -> Table:
         """Construye la tabla de detalles de cobro con soporte para múltiples pólizas."""
@@ -289,12 +482,12 @@ class CartaCobroGenerator(BaseGenerator):
                     poliza.get('numero', '')
                 ]
                 
-                # Calcular total de esta póliza
-                total_poliza = 0
+                # Calcular total de esta póliza (en Decimal: sin errores de redondeo)
+                total_poliza = Decimal('0.00')
                 
                 # Agregar montos según campos activos - USAR MONTOS DE CADA PÓLIZA
                 if campos_activos.get('prima', True):
-                    prima_val = poliza.get('prima', 0)
+                    prima_val = _as_decimal(poliza.get('prima', 0))
                     if poliza.get('check_prima', True):
                         row_data.append(f"${prima_val:,.2f}")
                         total_poliza += prima_val
@@ -302,7 +495,7 @@ class CartaCobroGenerator(BaseGenerator):
                         row_data.append("-")
                 
                 if campos_activos.get('otros_rubros', True):
-                    otros_val = poliza.get('otros', 0)
+                    otros_val = _as_decimal(poliza.get('otros', 0))
                     if poliza.get('check_otros', True):
                         row_data.append(f"${otros_val:,.2f}")
                         total_poliza += otros_val
@@ -310,7 +503,7 @@ class CartaCobroGenerator(BaseGenerator):
                         row_data.append("-")
                 
                 if campos_activos.get('impuesto', True):
-                    iva_val = poliza.get('iva', 0)
+                    iva_val = _as_decimal(poliza.get('iva', 0))
                     if poliza.get('check_iva', True):
                         row_data.append(f"${iva_val:,.2f}")
                         total_poliza += iva_val
@@ -362,40 +555,21 @@ class CartaCobroGenerator(BaseGenerator):
         
         return table
     
-    def _build_installment_detail(self, data: Dict, styles) -> list:
-        """Construye el detalle de la cuota (sin línea de cuota mensual y vigencia)."""
+    def _build_retorno(self, data: Dict) -> list:
+        """Construye el campo de retorno, si está habilitado."""
         elements = []
         
-        elements.append(Paragraph(
-            f"<b>VALOR A PAGAR A FAVOR DE {data.get('payee_company_name', '')} - NIT {data.get('payee_company_nit', '')}</b>",
-            styles['Normal']
-        ))
-        
-        elements.append(Paragraph(
-            f"<b>{data['amounts_raw']['total']}</b>",
-            styles['CartaTitle']
-        ))
-        
-        # Agregar campo de retorno si está habilitado
         if data.get('incluir_retorno', False) and data.get('retorno', '').strip():
             elements.append(Spacer(1, 0.2 * cm))
             elements.append(Paragraph(
                 f"<b>RETORNO:</b> {data.get('retorno', '')}",
-                styles['Normal']
+                self.styles['Normal']
             ))
         
         return elements
     
-    def _build_definitions(self, styles) -> list:
-        """Construye las definiciones de términos."""
-        elements = []
-        
-        # Sin definiciones por ahora
-        
-        return elements
-    
-    def _build_payment_instructions(self, data: Dict, styles) -> list:
-        """Construye las instrucciones de pago."""
+    def _build_payment_link(self, data: Dict) -> list:
+        """Construye la instrucción de pago con el link de la aseguradora."""
         elements = []
         
         # Obtener link de pago dinámico o usar uno por defecto
@@ -403,54 +577,7 @@ class CartaCobroGenerator(BaseGenerator):
         if not link_pago:
             link_pago = 'WWW.SURA.COM'
         
-        # Asegurar que el link tenga protocolo para ser clickeable
-        if not link_pago.startswith(('http://', 'https://')):
-            link_url = f'https://{link_pago}'
-        else:
-            link_url = link_pago
-        
-        # Crear párrafo con link azul clickeable
-        elements.append(Paragraph(
-            f'PUEDE REALIZAR SUS PAGOS POR PSE EN LA PAGINA WEB <a href="{link_url}" color="blue"><u>{link_pago}</u></a>',
-            styles['Normal']
-        ))
-        
-        elements.append(Paragraph(
-            "<b>RECUERDE ENVIARNOS EL SOPORTE DE PAGO…</b>",
-            styles['Normal']
-        ))
-        
-        return elements
-    
-    def _build_legal_notice(self, data: Dict, styles) -> list:
-        """Construye la nota legal."""
-        elements = []
-        
-        legal_text = (
-            "Nota: Las primas de seguros aquí relacionadas deben ser declaradas a nombre de la aseguradora "
-            "que los expide. ART 1068 C. De C. La mora en el pago de la prima de la póliza o de los "
-            "certificados o anexos que se expidan con fundamento en ella, producirá la terminación automática del contrato."
-        )
-        elements.append(Paragraph(legal_text, styles['Small']))
-        
-        elements.append(Paragraph(
-            f"<b>F. Límite de pago: {data.get('fecha_limite_pago', '')}</b>",
-            styles['Normal']
-        ))
-        
-        return elements
-    
-    def _build_signature(self, data: Dict, styles) -> list:
-        """Construye el bloque de firma."""
-        elements = []
-        
-        elements.append(Paragraph(data['firmante_nombre'], styles['Normal']))
-        
-        cargo_completo = data['firmante_cargo']
-        if data.get('firmante_iniciales'):
-            cargo_completo += f" {data['firmante_iniciales']}"
-        
-        elements.append(Paragraph(cargo_completo, styles['Normal']))
+        elements.append(copy.copy(_payment_link_prototype(link_pago, self.styles['Normal'])))
         
         return elements
     
@@ -0,0 +1,103 @@
+"""
+Preparación de los datos de una carta de cobro para el generador.
+
+Compartido por la CLI y el servicio HTTP: construye el ``Documento`` desde
+un diccionario (JSON o fila de lote), le asigna número de carta una vez
+validado y arma los datos del PDF. Los modelos y catálogos se importan al
+usarse, para no cargarlos al importar este módulo.
+"""
+from typing import TYPE_CHECKING, Any, Callable, Optional, Sequence
+
+if TYPE_CHECKING:
+    from models.batch import BatchValidationResult
+    from models.documento import Documento
+
+
+# Número provisional de los registros sin número de carta mientras se validan
+_NUMERO_PENDIENTE = 'PENDIENTE'
+
+
+def build_documento(data: dict, allocator=None) -> 'Documento':
+    """
+    Construye un Documento desde un diccionario (JSON o fila de lote).
+    
+    Si el registro no trae número de carta se asigna el siguiente consecutivo,
+    tomado de ``allocator`` (bloque reservado) si se indica. El número se
+    asigna después de validar: un registro inválido no consume consecutivo.
+    
+    Raises:
+        pydantic.ValidationError: Si el registro no es una carta válida
+    """
+    from models.documento import Documento
+    
+    if not _needs_numero(data):
+        return Documento.model_validate(data)
+    documento = Documento.model_validate({**data, 'numero_carta': _NUMERO_PENDIENTE})
+    return documento.model_copy(update={'numero_carta': _next_numero(allocator)})
+
+
+def validate_cartas(records: Sequence[Any],
+                    next_numero: Optional[Callable[[int], str]] = None) -> 'BatchValidationResult':
+    """
+    Valida varias cartas y numera solo las válidas que no traen número.
+    
+    Args:
+        records: Registros crudos (diccionarios con la forma de ``Documento``)
+        next_numero: Número de carta para el registro en la posición dada
+            (None = siguiente consecutivo de ``version_manager``). Se llama
+            solo para los registros válidos, en el orden de entrada.
+    
+    Returns:
+        BatchValidationResult: Documentos válidos (ya numerados) y errores por fila
+    """
+    from models.batch import validate_documentos
+    
+    pending = {index for index, record in enumerate(records) if _needs_numero(record)}
+    result = validate_documentos([
+        {**record, 'numero_carta': _NUMERO_PENDIENTE} if index in pending else record
+        for index, record in enumerate(records)
+    ])
+    if pending:
+        result.documentos = [
+            (index, documento.model_copy(update={
+                'numero_carta': next_numero(index) if next_numero else _next_numero()
+            }) if index in pending else documento)
+            for index, documento in result.documentos
+        ]
+    return result
+
+
+def _needs_numero(data: Any) -> bool:
+    return isinstance(data, dict) and not data.get('numero_carta')
+
+
+def _next_numero(allocator=None) -> str:
+    if allocator is not None:
+        return allocator.next_numero_carta()
+    
+    from utils.versioning import version_manager
+    return version_manager.get_next_numero_carta()
+
+
+def build_output_filename(documento: 'Documento') -> str:
+    """Nombre de archivo estándar de una carta (sin extensión)."""
+    return f"CARTA_{documento.numero_carta_normalized}_{documento.asegurado.nit.replace('-', '')}"
+
+
+def build_pdf_data(documento: 'Documento', data: dict) -> dict:
+    """
+    Genera los datos del PDF agregando el link de pago de la aseguradora.
+    
+    El link se toma del registro y, si no viene, del catálogo de aseguradoras.
+    """
+    pdf_data = documento.to_pdf_data()
+    
+    link_pago = data.get('payee_link_pago')
+    if link_pago is None:
+        from utils.payee_manager import payee_manager
+        payee = payee_manager.get_payee_by_name(documento.payee_company_name)
+        link_pago = payee.get('link_pago', '') if payee else ''
+    if link_pago:
+        pdf_data['payee_link_pago'] = link_pago
+    
+    return pdf_data
@@ -0,0 +1,119 @@
+"""
+Renderizado directo sobre el canvas para cartas de una sola página.
+
+Las cartas de cobro tienen geometría fija y casi siempre caben en una
+página. En ese caso no hace falta el motor de páginas de platypus
+(``SimpleDocTemplate``: plantillas de página, marcos, intentos de división
+de flowables): basta con medir cada flowable una vez, calcular su posición
+con las mismas reglas del marco de platypus y dibujarlo directamente en un
+``reportlab.pdfgen.canvas``.
+
+Si la carta no cabe en la página (por ejemplo una tabla con muchas pólizas)
+o contiene flowables que requieren el motor de páginas, ``layout_single_page``
+retorna None y el generador usa platypus.
+"""
+from typing import Callable, List, Optional, Tuple
+
+from reportlab.platypus import Flowable, SimpleDocTemplate
+
+
+# Relleno interno por defecto de los marcos de platypus (puntos)
+FRAME_PADDING = 6
+# Tolerancia de platypus al comparar la altura disponible
+_FUZZ = 1e-6
+
+# (flowable, x, y, espacio horizontal sobrante para la alineación)
+Placement = Tuple[Flowable, float, float, float]
+
+
+def frame_width(doc: SimpleDocTemplate) -> float:
+    """Ancho disponible para los flowables en el marco de la página."""
+    return doc.width - 2 * FRAME_PADDING
+
+
+def layout_single_page(story: List[Flowable], doc: SimpleDocTemplate) -> Optional[List[Placement]]:
+    """
+    Calcula la posición de cada flowable en una única página.
+
+    Reproduce el acomodo de ``platypus.Frame`` (relleno del marco,
+    ``spaceBefore``/``spaceAfter`` superpuestos, alineación horizontal), de
+    modo que el resultado es idéntico al de ``doc.build``.
+
+    Args:
+        story: Flowables de la carta
+        doc: Plantilla de documento con la geometría de la página
+
+    Returns:
+        Lista de posiciones, o None si la carta no cabe en una página
+    """
+    x = doc.leftMargin + FRAME_PADDING
+    y = doc.bottomMargin + doc.height - FRAME_PADDING
+    bottom = doc.bottomMargin + FRAME_PADDING
+    available_width = frame_width(doc)
+
+    placements = []
+    at_top = True
+    prev_space_after = 0
+    for flowable in story:
+        # Saltos de página, acciones de marco, etc.: usar platypus
+        if getattr(flowable, 'frameAction', None) or getattr(flowable, '_ZEROSIZE', False):
+            return None
+
+        space_before = 0
+        if not at_top:
+            space_before = max(flowable.getSpaceBefore() - prev_space_after, 0)
+
+        available_height = y - bottom - space_before
+        if available_height <= 0:
+            return None
+        
+        # Flowables estáticos ya medidos por RenderPlan.prewrap
+        prewrapped = getattr(flowable, '_prewrapped', None)
+        if prewrapped is not None and prewrapped[0] == available_width:
+            width, height = prewrapped[1:]
+        else:
+            width, height = flowable.wrap(available_width, available_height)
+
+        new_y = y - height - space_before
+        if new_y < bottom - _FUZZ:
+            return None
+        placements.append((flowable, x, new_y, available_width - width))
+
+        prev_space_after = flowable.getSpaceAfter()
+        new_y -= prev_space_after
+        if new_y != y:
+            at_top = False
+        y = new_y
+
+    return placements
+
+
+def draw_single_page(
+    placements: List[Placement],
+    doc: SimpleDocTemplate,
+    on_page: Optional[Callable] = None
+):
+    """
+    Dibuja y guarda la página calculada por ``layout_single_page``.
+
+    Args:
+        placements: Posiciones de los flowables
+        doc: Plantilla de documento (destino, metadatos del PDF)
+        on_page: Decoración de la página (por ejemplo la marca de agua),
+            con la firma ``on_page(canvas, doc)`` de platypus
+    """
+    # Mismo canvas (metadatos, compresión) que construiría doc.build
+    canv = doc._makeCanvas()
+    if on_page is not None:
+        on_page(canv, doc)
+
+    for flowable, x, y, spare_width in placements:
+        flowable.canv = canv
+        try:
+            flowable.drawOn(canv, x, y, _sW=spare_width)
+        finally:
+            # drawOn puede haberlo quitado ya
+            flowable.__dict__.pop('canv', None)
+
+    canv.showPage()
+    canv.save()
@@ -0,0 +1,209 @@
+"""
+Motor de renderizado paralelo para cartas de cobro.
+
+Reparte los diccionarios de ``Documento.to_pdf_data()`` entre varios procesos
+(``ProcessPoolExecutor``). Cada proceso crea un único ``CartaCobroGenerator``
+al iniciar y lo reutiliza para todas las cartas que recibe. Las entradas de
+auditoría y los tiempos por etapa (``utils.profiling``) de los trabajadores
+se devuelven al proceso principal, que es el único que escribe el log de
+auditoría.
+"""
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.audit import audit_writer
+from utils.profiling import profiler
+from .carta_cobro_generator import CartaCobroGenerator
+
+
+# (clave del llamador, datos del PDF, nombre del archivo de salida)
+RenderJob = Tuple[Any, Dict[str, Any], str]
+
+# Generador del proceso trabajador (uno por proceso, creado en _init_worker)
+_worker_generator: Optional[CartaCobroGenerator] = None
+# Entradas de auditoría pendientes de devolver al proceso principal
+_worker_audit: List[Dict[str, Any]] = []
+
+
+def _init_worker(output_dir: str, use_cache: Optional[bool] = None, profile: bool = False):
+    """Inicializa el generador reutilizable del proceso trabajador."""
+    global _worker_generator
+    profiler.enabled = profile
+    _worker_generator = CartaCobroGenerator(output_dir=Path(output_dir), use_cache=use_cache)
+    _worker_generator.audit_sink = _worker_audit.append
+
+
+def _render_in_worker(
+    data: Dict[str, Any],
+    output_filename: str
+) -> Tuple[Path, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Renderiza una carta y devuelve su ruta junto con sus entradas de
+    auditoría y sus tiempos por etapa (vacío si la medición está desactivada).
+    """
+    _worker_audit.clear()
+    output_path = _worker_generator.generate(data, output_filename)
+    return output_path, list(_worker_audit), profiler.drain()
+
+
+def render_bytes_in_worker(
+    data: Dict[str, Any],
+    output_filename: str
+) -> Tuple[bytes, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Renderiza una carta en memoria (ver ``CartaCobroGenerator.render_to_bytes``).
+
+    Se ejecuta en un proceso de ``worker_pool``. La entrega queda en la
+    auditoría con ``output_filename`` como destino.
+
+    Returns:
+        (PDF, entradas de auditoría, tiempos por etapa)
+    """
+    _worker_audit.clear()
+    pdf = _worker_generator.render_to_bytes(data)
+    _worker_generator._log_generation(data, Path(output_filename), success=True)
+    return pdf, list(_worker_audit), profiler.drain()
+
+
+def worker_pool(output_dir: Path, workers: int, use_cache: Optional[bool] = None) -> ProcessPoolExecutor:
+    """
+    Pool de procesos con un ``CartaCobroGenerator`` reutilizable por proceso.
+
+    Las entradas de auditoría y los tiempos que devuelven las funciones de
+    trabajo deben pasarse a ``collect_worker_output`` en el proceso principal.
+
+    Args:
+        output_dir: Directorio de salida de las cartas
+        workers: Número de procesos
+        use_cache: Reutilizar PDFs de cartas idénticas (None = config.RENDER_CACHE)
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(output_dir), use_cache, profiler.enabled)
+    )
+
+
+def collect_worker_output(audit_entries: List[Dict[str, Any]], timings: List[Dict[str, Any]]):
+    """Escribe la auditoría y agrega los tiempos devueltos por un trabajador."""
+    for entry in audit_entries:
+        audit_writer.write(entry)
+    profiler.merge(timings)
+
+
+@dataclass
+class RenderResult:
+    """Resultado del renderizado de una carta."""
+
+    key: Any
+    output_filename: str
+    output_path: Optional[Path] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """True si la carta se generó correctamente."""
+        return self.error is None
+
+
+class ParallelRenderer:
+    """
+    Renderizador de cartas en paralelo con cola acotada.
+
+    Los resultados se entregan en el mismo orden en que se enviaron los
+    trabajos. Como máximo ``max_in_flight`` cartas están pendientes a la vez,
+    de modo que la memoria no crece con el tamaño del lote.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        use_cache: Optional[bool] = None
+    ):
+        """
+        Inicializa el renderizador.
+
+        Args:
+            output_dir: Directorio de salida de las cartas
+            workers: Número de procesos (None = número de CPUs; 1 = mismo proceso)
+            max_in_flight: Máximo de cartas pendientes (None = 2 por proceso)
+            use_cache: Reutilizar PDFs de cartas idénticas (None = config.RENDER_CACHE)
+        """
+        self.output_dir = Path(output_dir)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.max_in_flight = max(1, max_in_flight or self.workers * 2)
+        self.use_cache = use_cache
+        self._generator: Optional[CartaCobroGenerator] = None
+
+    def render(self, jobs: Iterable[RenderJob]) -> Iterator[RenderResult]:
+        """
+        Renderiza los trabajos y entrega los resultados en orden.
+
+        Args:
+            jobs: Iterable de (clave, datos del PDF, nombre de archivo)
+
+        Yields:
+            RenderResult: Resultado de cada carta, en el orden de los trabajos
+        """
+        if self.workers == 1:
+            yield from self._render_sequential(jobs)
+            return
+
+        pending: Deque[Tuple[Any, str, Future]] = deque()
+
+        with worker_pool(self.output_dir, self.workers, self.use_cache) as executor:
+            for key, data, output_filename in jobs:
+                future = executor.submit(_render_in_worker, data, output_filename)
+                pending.append((key, output_filename, future))
+
+                # Cola acotada: esperar la carta más antigua antes de enviar más
+                while len(pending) >= self.max_in_flight:
+                    yield self._collect(*pending.popleft())
+
+            while pending:
+                yield self._collect(*pending.popleft())
+
+    @property
+    def generator(self) -> CartaCobroGenerator:
+        """Generador del proceso actual (se crea al primer uso)."""
+        if self._generator is None:
+            self._generator = CartaCobroGenerator(output_dir=self.output_dir, use_cache=self.use_cache)
+        return self._generator
+
+    def expected_output(self, data: Dict[str, Any], output_filename: str) -> Tuple[Path, str]:
+        """
+        Ruta y huella del PDF que generaría un trabajo, sin generarlo.
+
+        Returns:
+            Tuple[Path, str]: (ruta del PDF, ``CartaCobroGenerator.content_hash``)
+        """
+        return (
+            self.generator.output_path_for(data, output_filename),
+            self.generator.content_hash(data)
+        )
+
+    def _render_sequential(self, jobs: Iterable[RenderJob]) -> Iterator[RenderResult]:
+        """Renderiza en el proceso actual con un generador reutilizado."""
+        for key, data, output_filename in jobs:
+            try:
+                output_path = self.generator.generate(data, output_filename)
+                yield RenderResult(key, output_filename, output_path=output_path)
+            except Exception as e:
+                yield RenderResult(key, output_filename, error=str(e))
+
+    @staticmethod
+    def _collect(key: Any, output_filename: str, future: Future) -> RenderResult:
+        """Espera el resultado de un trabajo enviado al pool."""
+        try:
+            output_path, audit_entries, timings = future.result()
+        except Exception as e:
+            return RenderResult(key, output_filename, error=str(e))
+
+        collect_worker_output(audit_entries, timings)
+        return RenderResult(key, output_filename, output_path=output_path)
@@ -0,0 +1,167 @@
+"""
+Caché de PDFs generados, indexada por el contenido de la carta.
+
+La clave es el SHA-256 del diccionario de ``Documento.to_pdf_data()`` en
+forma canónica (claves ordenadas). Si una carta se vuelve a generar sin
+cambios, se reutiliza el PDF guardado en lugar de repetir el diseño con
+reportlab. Los archivos más antiguos (por último uso) se eliminan cuando la
+caché supera ``max_bytes``.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from utils.atomic_file import write_bytes_atomic
+from utils.config import config
+
+
+# Cambiar al modificar el diseño de la carta para invalidar la caché
+RENDER_CACHE_VERSION = 1
+
+
+def payload_hash(data: Dict[str, Any], template: str = '') -> str:
+    """
+    Calcula la clave de caché de los datos de una carta.
+
+    Args:
+        data: Datos del documento (salida de Documento.to_pdf_data())
+        template: Huella de la plantilla usada (un cambio de diseño invalida la caché)
+
+    Returns:
+        str: Hash SHA-256 hexadecimal
+    """
+    canonical = json.dumps(
+        {'version': RENDER_CACHE_VERSION, 'template': template, 'data': data},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(',', ':'),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """
+    Caché LRU en disco de PDFs generados.
+
+    El último uso de cada archivo se registra en su fecha de modificación,
+    de modo que varios procesos pueden compartir el mismo directorio. El
+    tamaño total se lleva en memoria como estimación y se vuelve a medir en
+    disco al superar el límite o tras escribir una décima parte de él (lo
+    que otros procesos agregaron no se ve en el contador local).
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = 500 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Directorio de la caché (None = config.RENDER_CACHE_DIR)
+            max_bytes: Tamaño máximo total de la caché en disco
+        """
+        self.cache_dir = cache_dir or config.RENDER_CACHE_DIR
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._total_bytes: Optional[int] = None
+        # Bytes agregados por este proceso desde la última medición en disco
+        self._unscanned_bytes = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pdf"
+
+    def _touch(self, entry: Path):
+        try:
+            os.utime(entry)  # Marca de último uso (LRU)
+        except OSError:
+            pass
+
+    def load(self, key: str) -> Optional[bytes]:
+        """
+        Contenido del PDF guardado para ``key``.
+
+        Returns:
+            bytes, o None si no hay entrada en caché
+        """
+        entry = self._entry_path(key)
+        try:
+            pdf = entry.read_bytes()
+        except FileNotFoundError:
+            return None
+        self._touch(entry)
+        return pdf
+
+    def store(self, key: str, pdf: bytes):
+        """
+        Guarda una copia del PDF generado para ``key``.
+
+        Args:
+            key: Clave (ver ``payload_hash``)
+            pdf: Contenido del PDF
+        """
+        entry = self._entry_path(key)
+        try:
+            previous = entry.stat().st_size
+        except FileNotFoundError:
+            previous = 0
+        write_bytes_atomic(entry, pdf)
+
+        with self._lock:
+            self._unscanned_bytes += len(pdf)
+            if self._total_bytes is None or self._unscanned_bytes > self.max_bytes // 10:
+                self._total_bytes = self._scan_total()
+                self._unscanned_bytes = 0
+            else:
+                # Una entrada reemplazada solo suma la diferencia
+                self._total_bytes += len(pdf) - previous
+            if self._total_bytes > self.max_bytes:
+                # _evict mide de nuevo en disco antes de eliminar
+                self._evict()
+
+    def _scan_total(self) -> int:
+        total = 0
+        for path in self.cache_dir.glob('*.pdf'):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def _evict(self):
+        """Elimina las entradas menos usadas hasta quedar bajo ``max_bytes``."""
+        entries = []
+        for path in self.cache_dir.glob('*.pdf'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+        self._total_bytes = total
+        self._unscanned_bytes = 0
+
+    def clear(self):
+        """Elimina todas las entradas de la caché."""
+        with self._lock:
+            for path in self.cache_dir.glob('*.pdf'):
+                path.unlink(missing_ok=True)
+            self._total_bytes = 0
+            self._unscanned_bytes = 0
+
+
+# Instancia global
+render_cache = RenderCache(
+    cache_dir=config.RENDER_CACHE_DIR,
+    max_bytes=config.RENDER_CACHE_MAX_MB * 1024 * 1024
+)
@@ -0,0 +1,222 @@
+"""
+Compilador de plantillas de carta (``templates/*.json``).
+
+La lista ``sections`` de la plantilla se convierte una sola vez en un plan
+de renderizado (``RenderPlan``):
+
+- los párrafos sin variables y los espaciadores se construyen al compilar y
+  se copian en cada carta (el análisis del marcado no se repite);
+- los párrafos con variables (``{campo}``) solo se formatean por carta;
+- los bloques con lógica propia (por ejemplo la tabla de cobro) se delegan
+  al generador por nombre.
+
+Así una nueva plantilla de aseguradora solo requiere un archivo JSON.
+"""
+import copy
+import hashlib
+import json
+import string
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from reportlab.lib.styles import StyleSheet1
+from reportlab.lib.units import cm
+from reportlab.platypus import Paragraph, Spacer
+
+
+# Altura disponible al medir prototipos (los párrafos estáticos no se dividen)
+PREWRAP_HEIGHT = 1e6
+
+# Constructor de un bloque: recibe los datos de la carta y retorna flowables
+BlockBuilder = Callable[[Dict[str, Any]], list]
+
+
+class _Values(dict):
+    """Valores de la carta para ``str.format_map`` (faltantes o None = vacío)."""
+
+    def __missing__(self, key):
+        return ''
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key) if key in self else self.__missing__(key)
+        return '' if value is None else value
+
+
+class _StaticStep:
+    """Flowable idéntico en todas las cartas (se copia el prototipo)."""
+
+    def __init__(self, flowable):
+        self.flowable = flowable
+
+    def build(self, values: Mapping, blocks: Dict[str, BlockBuilder]) -> list:
+        return [copy.copy(self.flowable)]
+
+    def prewrap(self, available_width: float):
+        """Mide el prototipo una vez; las copias heredan la medida."""
+        width, height = self.flowable.wrap(available_width, PREWRAP_HEIGHT)
+        self.flowable._prewrapped = (available_width, width, height)
+
+
+class _ParagraphStep:
+    """Párrafo con variables; solo el texto se formatea por carta."""
+
+    def __init__(self, text: str, style, strip: bool = False):
+        self.text = text
+        self.style = style
+        self.strip = strip
+
+    def build(self, values: Mapping, blocks: Dict[str, BlockBuilder]) -> list:
+        text = self.text.format_map(values)
+        if self.strip:
+            text = text.strip()
+        return [Paragraph(text, self.style)]
+
+
+class _BlockStep:
+    """Sección con lógica propia, construida por el generador."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def build(self, values: Mapping, blocks: Dict[str, BlockBuilder]) -> list:
+        if self.name not in blocks:
+            raise ValueError(f"La plantilla usa un bloque desconocido: {self.name}")
+        return blocks[self.name](values)
+
+
+class RenderPlan:
+    """
+    Plan de renderizado compilado a partir de una plantilla.
+
+    Es de solo lectura y puede compartirse entre cartas e hilos.
+    """
+
+    def __init__(self, template_id: str, version: str, fingerprint: str,
+                 static_values: Dict[str, Any], steps: list):
+        self.template_id = template_id
+        self.version = version
+        self.fingerprint = fingerprint
+        self.static_values = static_values
+        self.steps = steps
+        self._prewrapped_width: Optional[float] = None
+        self._prewrap_lock = Lock()
+
+    def prewrap(self, available_width: float):
+        """
+        Mide una vez los flowables estáticos para un ancho de marco.
+
+        Las copias que entrega ``build_story`` llevan la medida en
+        ``_prewrapped`` y el renderizado directo (``fast_renderer``) las
+        ubica sin volver a partir sus líneas.
+
+        Args:
+            available_width: Ancho disponible del marco (puntos)
+        """
+        with self._prewrap_lock:
+            if self._prewrapped_width == available_width:
+                return
+            for step in self.steps:
+                if isinstance(step, _StaticStep):
+                    step.prewrap(available_width)
+            self._prewrapped_width = available_width
+
+    def build_story(self, data: Dict[str, Any], blocks: Dict[str, BlockBuilder]) -> list:
+        """
+        Construye los flowables de una carta.
+
+        Args:
+            data: Datos del documento (salida de Documento.to_pdf_data())
+            blocks: Constructores de los bloques con lógica propia
+
+        Returns:
+            list: Flowables de la carta
+        """
+        values = _Values(self.static_values)
+        values.update(data)
+
+        story = []
+        for step in self.steps:
+            story.extend(step.build(values, blocks))
+        return story
+
+
+def _has_fields(text: str) -> bool:
+    """True si el texto tiene variables ``{campo}``."""
+    return any(field is not None for _, field, _, _ in string.Formatter().parse(text))
+
+
+def _compile_section(section: Dict[str, Any], styles: StyleSheet1):
+    """Compila una sección de la plantilla en un paso del plan."""
+    section_type = section.get('type')
+
+    if section_type == 'spacer':
+        return _StaticStep(Spacer(1, float(section['height_cm']) * cm))
+
+    if section_type == 'paragraph':
+        text = section['text']
+        style_name = section.get('style', 'Normal')
+        if style_name not in styles:
+            raise ValueError(f"Estilo de párrafo desconocido: {style_name}")
+        style = styles[style_name]
+
+        if _has_fields(text):
+            return _ParagraphStep(text, style, strip=section.get('strip', False))
+        return _StaticStep(Paragraph(text, style))
+
+    if section_type == 'block':
+        return _BlockStep(section['name'])
+
+    raise ValueError(f"Tipo de sección desconocido: {section_type}")
+
+
+def compile_template(template: Dict[str, Any], styles: StyleSheet1, fingerprint: str = '') -> RenderPlan:
+    """
+    Compila una plantilla ya cargada.
+
+    Args:
+        template: Contenido del JSON de la plantilla
+        styles: Hoja de estilos de párrafo
+        fingerprint: Huella del archivo (invalida cachés al cambiar la plantilla)
+
+    Returns:
+        RenderPlan: Plan de renderizado
+
+    Raises:
+        ValueError: Si la plantilla tiene secciones o estilos desconocidos
+    """
+    static_values = {
+        field['id']: field.get('value', '')
+        for field in template.get('static_fields', [])
+    }
+    steps = [_compile_section(section, styles) for section in template.get('sections', [])]
+
+    return RenderPlan(
+        template_id=template.get('template_id', ''),
+        version=str(template.get('version', '')),
+        fingerprint=fingerprint,
+        static_values=static_values,
+        steps=steps
+    )
+
+
+@lru_cache(maxsize=None)
+def _load_plan(template_path: str, styles: StyleSheet1) -> RenderPlan:
+    raw = Path(template_path).read_bytes()
+    template = json.loads(raw.decode('utf-8'))
+    return compile_template(template, styles, fingerprint=hashlib.sha256(raw).hexdigest())
+
+
+def load_render_plan(template_path: Path, styles: StyleSheet1) -> RenderPlan:
+    """
+    Retorna el plan compilado de una plantilla (se compila una vez por proceso).
+
+    Args:
+        template_path: Archivo JSON de la plantilla
+        styles: Hoja de estilos de párrafo (compartida)
+
+    Returns:
+        RenderPlan: Plan de renderizado
+    """
+    return _load_plan(str(Path(template_path).resolve()), styles)
@@ -11,7 +11,7 @@ from PyQt6.QtWidgets import (
     QTableWidget, QTableWidgetItem, QTabWidget, QMessageBox, QGroupBox,
     QFormLayout, QHeaderView, QDialog, QDialogButtonBox, QScrollArea, QCheckBox
 )
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtCore import Qt, QDate, QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt6.QtGui import QFont, QIcon
 
 # Imports del proyecto
@@ -580,6 +580,65 @@ class PolizaDialog(QDialog):
             self.tipo_input.setCurrentText(texto_actual)
 
 
+class GeneracionPdfSignals(QObject):
+    """Señales de un trabajo de generación de PDF (se entregan en el hilo de la GUI)."""
+    progreso = pyqtSignal(str)
+    terminado = pyqtSignal(object)  # Path del PDF generado
+    error = pyqtSignal(str)
+
+
+class GeneracionPdfJob(QRunnable):
+    """
+    Trabajo en segundo plano que genera el PDF de una carta.
+    
+    Registra el uso de la aseguradora y genera el PDF en la carpeta de
+    salida, sin bloquear la ventana. Los datos del formulario se leen
+    antes, en el hilo de la GUI.
+    """
+    
+    def __init__(self, pdf_data, nombre_archivo, output_folder, nombre_aseguradora,
+                 nit_aseguradora, link_pago, aseguradora_nueva):
+        super().__init__()
+        self.pdf_data = pdf_data
+        self.nombre_archivo = nombre_archivo
+        self.output_folder = Path(output_folder)
+        self.nombre_aseguradora = nombre_aseguradora
+        self.nit_aseguradora = nit_aseguradora
+        self.link_pago = link_pago
+        self.aseguradora_nueva = aseguradora_nueva
+        self.signals = GeneracionPdfSignals()
+    
+    def run(self):
+        try:
+            # Si es una nueva aseguradora, agregarla
+            if self.aseguradora_nueva and self.nombre_aseguradora:
+                try:
+                    payee_manager.add_payee(self.nombre_aseguradora, self.nit_aseguradora, self.link_pago)
+                    logger.info(f"Nueva aseguradora agregada: {self.nombre_aseguradora}")
+                except ValueError:
+                    pass  # Ya existe, continuar
+            
+            # Incrementar uso
+            if self.nombre_aseguradora:
+                payee_manager.increment_usage(self.nombre_aseguradora)
+            
+            self.signals.progreso.emit(f"⏳ Generando {self.nombre_archivo}...")
+            self.output_folder.mkdir(parents=True, exist_ok=True)
+            
+            # Escritura directa (y atómica) en la carpeta seleccionada
+            generator = CartaCobroGenerator()
+            output_file = generator.generate(
+                data=self.pdf_data,
+                output_filename=self.nombre_archivo,
+                output_dir=self.output_folder
+            )
+            
+            self.signals.terminado.emit(output_file)
+        except Exception as e:
+            logger.error(f"Error al generar PDF: {e}", exc_info=True)
+            self.signals.error.emit(str(e))
+
+
 class GeneradorCartasGUI(QMainWindow):
     """Ventana principal de la aplicación."""
     
@@ -821,6 +880,11 @@ class GeneradorCartasGUI(QMainWindow):
         # Carpeta de salida predeterminada (DEBE IR ANTES de crear pestañas)
         self.output_folder = Path("output")
         
+        # Generación de PDFs en segundo plano (una carta a la vez, en orden)
+        self.pdf_pool = QThreadPool(self)
+        self.pdf_pool.setMaxThreadCount(1)
+        self.trabajos_pdf_pendientes = 0
+        
         # Crear pestañas
         self.crear_tab_nueva_carta()
         self.crear_tab_aseguradoras()
@@ -1711,17 +1775,8 @@ class GeneradorCartasGUI(QMainWindow):
             if payee_data:
                 link_pago = payee_data.get('link_pago', '')
             
-            # Si es una nueva aseguradora, agregarla
-            if self.aseguradora_combo.currentData() is None and nombre_aseguradora:
-                try:
-                    payee_manager.add_payee(nombre_aseguradora, nit_aseguradora, link_pago)
-                    logger.info(f"Nueva aseguradora agregada: {nombre_aseguradora}")
-                except ValueError:
-                    pass  # Ya existe, continuar
-            
-            # Incrementar uso
-            if nombre_aseguradora:
-                payee_manager.increment_usage(nombre_aseguradora)
+            # La aseguradora nueva se registra en el trabajo de generación
+            aseguradora_nueva = self.aseguradora_combo.currentData() is None
             
             documento = Documento(
                 ciudad_emision=self.ciudad_emision.text().strip(),
@@ -1744,11 +1799,7 @@ class GeneradorCartasGUI(QMainWindow):
             # Generar nombre de archivo
             nombre_archivo = f"carta_cobro_{documento.numero_carta.replace(' - ', '-')}_{documento.asegurado.nit.replace('-', '')}.pdf"
             
-            # Crear carpeta si no existe
-            self.output_folder.mkdir(parents=True, exist_ok=True)
-            
-            # Generar PDF - El backend necesita dict, filename y campos activos
-            generator = CartaCobroGenerator()
+            # Datos del PDF - El backend necesita dict, filename y campos activos
             pdf_data = documento.to_pdf_data()
             pdf_data['campos_activos'] = campos_activos
             pdf_data['payee_link_pago'] = link_pago  # Agregar link de pago
@@ -1770,40 +1821,25 @@ class GeneradorCartasGUI(QMainWindow):
                 }
                 pdf_data['polizas'].append(poliza_data)
             
-            output_file = generator.generate(
-                data=pdf_data,
-                output_filename=nombre_archivo
+            # Generar en segundo plano: el formulario queda libre para la siguiente carta
+            job = GeneracionPdfJob(
+                pdf_data,
+                nombre_archivo,
+                self.output_folder,
+                nombre_aseguradora,
+                nit_aseguradora,
+                link_pago,
+                aseguradora_nueva
             )
+            job.signals.progreso.connect(self.statusBar().showMessage)
+            job.signals.terminado.connect(self.pdf_generado)
+            job.signals.error.connect(self.pdf_error)
             
-            # Mover archivo a carpeta seleccionada si no está ahí
-            if output_file.parent != self.output_folder:
-                import shutil
-                destino = self.output_folder / output_file.name
-                shutil.move(str(output_file), str(destino))
-                output_file = destino
-            
-            respuesta = QMessageBox.question(
-                self,
-                "✅ Éxito",
-                f"Carta generada correctamente:\n\n{output_file.name}\n\nGuardada en:\n{output_file.parent}\n\n¿Desea crear otra carta?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            self.trabajos_pdf_pendientes += 1
+            self.statusBar().showMessage(
+                f"⏳ En cola: {nombre_archivo} ({self.trabajos_pdf_pendientes} pendiente(s))"
             )
-            
-            if respuesta == QMessageBox.StandardButton.No:
-                # Abrir el PDF
-                import os
-                import platform
-                if platform.system() == "Windows":
-                    os.startfile(output_file)
-                elif platform.system() == "Darwin":  # macOS
-                    os.system(f'open "{output_file}"')
-                else:  # Linux
-                    os.system(f'xdg-open "{output_file}"')
-            
-            # Recargar aseguradoras
-            self.cargar_aseguradoras()
-            
-            logger.info(f"PDF generado: {output_file}")
+            self.pdf_pool.start(job)
             
         except Exception as e:
             logger.error(f"Error al generar PDF: {e}", exc_info=True)
@@ -1813,6 +1849,50 @@ class GeneradorCartasGUI(QMainWindow):
                 f"Error al generar el PDF:\n\n{str(e)}"
             )
     
+    def pdf_generado(self, output_file):
+        """Se ejecuta en el hilo de la GUI cuando un PDF termina de generarse."""
+        self.trabajos_pdf_pendientes -= 1
+        logger.info(f"PDF generado: {output_file}")
+        
+        # Recargar aseguradoras
+        self.cargar_aseguradoras()
+        
+        # Con más cartas en cola no se interrumpe al operador
+        if self.trabajos_pdf_pendientes > 0:
+            self.statusBar().showMessage(
+                f"✅ {output_file.name} generado ({self.trabajos_pdf_pendientes} pendiente(s))"
+            )
+            return
+        
+        self.statusBar().showMessage(f"✅ {output_file.name} generado", 10000)
+        respuesta = QMessageBox.question(
+            self,
+            "✅ Éxito",
+            f"Carta generada correctamente:\n\n{output_file.name}\n\nGuardada en:\n{output_file.parent}\n\n¿Desea crear otra carta?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        
+        if respuesta == QMessageBox.StandardButton.No:
+            # Abrir el PDF
+            import os
+            import platform
+            if platform.system() == "Windows":
+                os.startfile(output_file)
+            elif platform.system() == "Darwin":  # macOS
+                os.system(f'open "{output_file}"')
+            else:  # Linux
+                os.system(f'xdg-open "{output_file}"')
+    
+    def pdf_error(self, mensaje):
+        """Se ejecuta en el hilo de la GUI cuando falla la generación de un PDF."""
+        self.trabajos_pdf_pendientes -= 1
+        self.statusBar().showMessage("❌ Error al generar el PDF", 10000)
+        QMessageBox.critical(
+            self,
+            "❌ Error",
+            f"Error al generar el PDF:\n\n{mensaje}"
+        )
+    
     def agregar_aseguradora(self):
         """Abre diálogo para agregar aseguradora."""
         dialog = AseguradoraDialog(self)
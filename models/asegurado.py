@@ -31,6 +31,19 @@ class Asegurado(BaseModel):
         description="Ciudad de residencia del cliente"
     )
     
+    @field_validator('nit')
+    @classmethod
+    def validate_nit_characters(cls, v: str) -> str:
+        """
+        Rechaza NITs con caracteres de control o fuera de latin-1.
+        
+        El NIT forma parte del nombre del archivo de la carta (y del
+        encabezado Content-Disposition del servicio HTTP).
+        """
+        if any(not ch.isprintable() or ord(ch) > 0xFF for ch in v):
+            raise ValueError("El NIT contiene caracteres no válidos")
+        return v
+    
     @field_validator('razon_social')
     @classmethod
     def uppercase_razon_social(cls, v: str) -> str:
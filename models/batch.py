@@ -0,0 +1,75 @@
+"""
+Validación en lote de registros de cartas de cobro.
+
+Valida una lista de diccionarios (filas de CSV/JSONL) con un único
+``TypeAdapter(List[Documento])`` y reporta los errores por fila, sin
+excepciones: las filas válidas se pueden procesar aunque otras fallen.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from .documento import Documento
+
+
+# Validador compartido (el esquema se compila una sola vez)
+_DOCUMENTOS_ADAPTER = TypeAdapter(List[Documento])
+
+
+@dataclass
+class RowError:
+    """Errores de validación de una fila."""
+
+    index: int
+    errors: List[Dict[str, Any]]
+
+    @property
+    def message(self) -> str:
+        """Errores en una línea: ``campo.anidado: mensaje; ...``."""
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'registro'}: {error['msg']}"
+            for error in self.errors
+        )
+
+
+@dataclass
+class BatchValidationResult:
+    """Resultado de ``validate_documentos``."""
+
+    # (índice de la fila, documento validado), en el orden de entrada
+    documentos: List[Tuple[int, Documento]] = field(default_factory=list)
+    # Filas inválidas, en el orden de entrada
+    errors: List[RowError] = field(default_factory=list)
+
+
+def validate_documentos(rows: Sequence[Any]) -> BatchValidationResult:
+    """
+    Valida varias filas en una sola pasada de pydantic.
+
+    Si alguna fila es inválida, sus errores se agrupan por fila y las filas
+    válidas se vuelven a validar juntas (segunda pasada solo en ese caso).
+
+    Args:
+        rows: Registros crudos (diccionarios con la forma de ``Documento``)
+
+    Returns:
+        BatchValidationResult: Documentos válidos y errores por fila
+    """
+    try:
+        documentos = _DOCUMENTOS_ADAPTER.validate_python(rows)
+        return BatchValidationResult(documentos=list(enumerate(documentos)))
+    except ValidationError as exc:
+        errors_by_row: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for error in exc.errors(include_url=False):
+            index, *loc = error['loc']
+            errors_by_row[index].append({**error, 'loc': tuple(loc)})
+
+    valid = [index for index in range(len(rows)) if index not in errors_by_row]
+    documentos = _DOCUMENTOS_ADAPTER.validate_python([rows[index] for index in valid])
+
+    return BatchValidationResult(
+        documentos=list(zip(valid, documentos)),
+        errors=[RowError(index, errors_by_row[index]) for index in sorted(errors_by_row)]
+    )
@@ -1,13 +1,13 @@
 """
 Modelo de datos del documento (carta de cobro completa).
 """
-from pydantic import BaseModel, Field, field_validator, computed_field
-from typing import Optional, Literal
+from pydantic import BaseModel, Field, field_validator, computed_field, model_validator
+from typing import Dict, List, Optional, Literal
 from datetime import date, datetime
 from decimal import Decimal
 
 from .asegurado import Asegurado
-from .poliza import Poliza
+from .poliza import Poliza, PolizaCobro, parse_fecha
 
 
 class MontosCobro(BaseModel):
@@ -60,11 +60,17 @@ class Documento(BaseModel):
     # Datos del cliente
     asegurado: Asegurado
     
-    # Datos de la póliza
-    poliza: Poliza
+    # Datos de la póliza (si no se indica, se toma la primera de ``polizas``)
+    poliza: Optional[Poliza] = None
     
-    # Montos del cobro
-    montos: MontosCobro
+    # Montos del cobro (si no se indican, se suman los de ``polizas``)
+    montos: Optional[MontosCobro] = None
+    
+    # Carta multi-póliza: una fila de la tabla de cobro por póliza
+    polizas: List[PolizaCobro] = Field(default_factory=list)
+    
+    # Columnas de montos visibles en la tabla ('prima', 'impuesto', 'otros_rubros')
+    campos_activos: Optional[Dict[str, bool]] = None
     
     # Aseguradora beneficiaria (quien recibe el pago)
     payee_company_name: str = Field(
@@ -94,6 +100,12 @@ class Documento(BaseModel):
     # Estado del documento
     es_borrador: bool = Field(default=False, description="Si es True, se marca como BORRADOR")
     
+    @field_validator('fecha_emision', 'fecha_limite_pago', mode='before')
+    @classmethod
+    def parse_fechas(cls, v):
+        """Acepta fechas en formato dd/mm/aaaa."""
+        return parse_fecha(v)
+    
     @field_validator('firmante_nombre')
     @classmethod
     def uppercase_firmante(cls, v: str) -> str:
@@ -106,6 +118,35 @@ class Documento(BaseModel):
         """Retorna el número de carta tal cual."""
         return v.strip()
     
+    @model_validator(mode='after')
+    def derive_from_polizas(self) -> 'Documento':
+        """Completa póliza principal, montos y columnas desde ``polizas``."""
+        if self.poliza is None:
+            if not self.polizas:
+                raise ValueError("Se requiere 'poliza' o 'polizas'")
+            principal = self.polizas[0]
+            if principal.vigencia_inicio is None or principal.vigencia_fin is None:
+                raise ValueError("La primera póliza de 'polizas' debe indicar vigencia_inicio y vigencia_fin")
+            self.poliza = principal.to_poliza()
+        
+        if self.montos is None:
+            if not self.polizas:
+                raise ValueError("Se requiere 'montos' o 'polizas' con montos")
+            # Totales calculados una sola vez, en Decimal
+            self.montos = MontosCobro(
+                prima=sum((p.prima_cobrada for p in self.polizas), Decimal('0.00')),
+                otros_rubros=sum((p.otros_cobrados for p in self.polizas), Decimal('0.00')),
+                impuesto=sum((p.iva_cobrado for p in self.polizas), Decimal('0.00'))
+            )
+        
+        if self.campos_activos is None and self.polizas:
+            self.campos_activos = {
+                'prima': any(p.check_prima for p in self.polizas),
+                'impuesto': any(p.check_iva for p in self.polizas),
+                'otros_rubros': any(p.check_otros for p in self.polizas)
+            }
+        return self
+    
     @computed_field
     @property
     def numero_carta_normalized(self) -> str:
@@ -139,7 +180,7 @@ class Documento(BaseModel):
     
     def to_pdf_data(self) -> dict:
         """Genera el diccionario completo de datos para el PDF."""
-        return {
+        data = {
             # Metadatos
             "ciudad_emision": self.ciudad_emision,
             "fecha_emision": self.format_fecha_emision(),
@@ -187,6 +228,14 @@ class Documento(BaseModel):
             "sender_email": "gerencia@segurosunion.com",
             "sender_address": "Carrera 77 A # 49 - 37 .Sector Estadio - Medellin"
         }
+        
+        # Tabla de cobro multi-póliza
+        if self.polizas:
+            data["polizas"] = [poliza.model_dump_for_pdf() for poliza in self.polizas]
+        if self.campos_activos is not None:
+            data["campos_activos"] = dict(self.campos_activos)
+        
+        return data
     
     class Config:
         json_schema_extra = {
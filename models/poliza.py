@@ -3,7 +3,15 @@ Modelo de datos de la póliza.
 """
 from pydantic import BaseModel, Field, field_validator
 from typing import Literal, Optional
-from datetime import date
+from datetime import date, datetime
+from decimal import Decimal
+
+
+def parse_fecha(value):
+    """Acepta fechas ISO (2026-01-21) y en formato local (21/01/2026)."""
+    if isinstance(value, str) and '/' in value:
+        return datetime.strptime(value.strip(), '%d/%m/%Y').date()
+    return value
 
 
 class Poliza(BaseModel):
@@ -40,6 +48,12 @@ class Poliza(BaseModel):
         description="Fecha de fin del período de cobertura"
     )
     
+    @field_validator('vigencia_inicio', 'vigencia_fin', mode='before')
+    @classmethod
+    def parse_vigencia(cls, v):
+        """Acepta vigencias en formato dd/mm/aaaa."""
+        return parse_fecha(v)
+    
     @field_validator('tipo')
     @classmethod
     def normalize_tipo(cls, v: str) -> str:
@@ -90,3 +104,78 @@ class Poliza(BaseModel):
                 "vigencia_fin": "2025-10-30"
             }
         }
+
+
+class PolizaCobro(BaseModel):
+    """
+    Póliza de una carta multi-póliza: una fila de la tabla de cobro.
+    
+    Mismos campos que las pólizas de la interfaz gráfica (``data['polizas']``
+    del generador). Los montos con su casilla desactivada no se cobran.
+    """
+    
+    numero: str = Field(..., description="Número de póliza")
+    tipo: str = Field(default="VIDA GRUPO", description="Ramo de la póliza")
+    plan: str = Field(default="", description="Plan (columna Descripción)")
+    vigencia_inicio: Optional[date] = Field(default=None, description="Inicio de la vigencia")
+    vigencia_fin: Optional[date] = Field(default=None, description="Fin de la vigencia")
+    prima: Decimal = Field(default=Decimal('0.00'))
+    otros: Decimal = Field(default=Decimal('0.00'))
+    iva: Decimal = Field(default=Decimal('0.00'))
+    check_prima: bool = Field(default=True, description="Cobrar la prima")
+    check_otros: bool = Field(default=True, description="Cobrar otros rubros")
+    check_iva: bool = Field(default=True, description="Cobrar el impuesto")
+    check_plan: bool = Field(default=True, description="Mostrar el plan")
+    
+    @field_validator('vigencia_inicio', 'vigencia_fin', mode='before')
+    @classmethod
+    def parse_vigencia(cls, v):
+        """Acepta vigencias en formato dd/mm/aaaa."""
+        return parse_fecha(v)
+    
+    @property
+    def prima_cobrada(self) -> Decimal:
+        return self.prima if self.check_prima else Decimal('0.00')
+    
+    @property
+    def otros_cobrados(self) -> Decimal:
+        return self.otros if self.check_otros else Decimal('0.00')
+    
+    @property
+    def iva_cobrado(self) -> Decimal:
+        return self.iva if self.check_iva else Decimal('0.00')
+    
+    @property
+    def total(self) -> Decimal:
+        """Total cobrado de la póliza."""
+        return self.prima_cobrada + self.otros_cobrados + self.iva_cobrado
+    
+    def to_poliza(self) -> Poliza:
+        """Póliza principal del documento (asunto de la carta)."""
+        return Poliza(
+            numero=self.numero,
+            tipo=self.tipo,
+            plan_poliza=self.plan or "N/A",
+            vigencia_inicio=self.vigencia_inicio,
+            vigencia_fin=self.vigencia_fin
+        )
+    
+    def model_dump_for_pdf(self) -> dict:
+        """
+        Fila de la tabla de cobro (formato de ``data['polizas']``).
+        
+        Los montos se entregan como Decimal: el generador suma y formatea
+        sin pasar por float.
+        """
+        return {
+            "numero": self.numero,
+            "tipo": self.tipo,
+            "plan": self.plan,
+            "prima": self.prima_cobrada,
+            "iva": self.iva_cobrado,
+            "otros": self.otros_cobrados,
+            "check_prima": self.check_prima,
+            "check_iva": self.check_iva,
+            "check_otros": self.check_otros,
+            "check_plan": self.check_plan
+        }
@@ -0,0 +1,393 @@
+"""
+Servicio HTTP local para generar cartas de cobro.
+
+Recibe JSON con la forma de ``Documento`` (la misma de ``cli.py --from-json``
+y de los lotes), lo valida con los modelos pydantic y renderiza el PDF en un
+pool de procesos. Cada proceso conserva su ``CartaCobroGenerator`` y el
+proceso principal sus catálogos, así que cada petición paga solo el
+renderizado, no el arranque de Python y reportlab.
+
+Endpoints:
+    GET  /health                Estado del servicio
+    POST /cartas                Genera la carta y responde el PDF
+    POST /cartas?async=1        Responde 202 con el id del trabajo
+    GET  /cartas/<job_id>       PDF del trabajo (202 mientras está pendiente)
+
+Uso:
+    python server.py
+    python server.py --host 0.0.0.0 --port 8765 --workers 4
+
+Ejemplo:
+    curl -X POST --data @ejemplo_carta.json http://127.0.0.1:8765/cartas -o carta.pdf
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from time import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from utils.config import config
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Segundos de espera por la siguiente petición en una conexión persistente
+IDLE_TIMEOUT = 30.0
+
+# (estado, encabezados, cuerpo)
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class HttpError(Exception):
+    """Error con respuesta HTTP (se envía como JSON)."""
+
+    def __init__(self, status: int, message: str, **extra: Any):
+        super().__init__(message)
+        self.status = status
+        self.payload = {'error': message, **extra}
+
+
+@dataclass
+class Request:
+    """Petición HTTP ya leída."""
+
+    method: str
+    path: str
+    query: Dict[str, List[str]]
+    headers: Dict[str, str]
+    body: bytes
+    keep_alive: bool
+
+
+@dataclass
+class Job:
+    """Carta generada en segundo plano (``POST /cartas?async=1``)."""
+
+    numero_carta: str
+    filename: str
+    task: 'asyncio.Task[bytes]'
+    created: float = field(default_factory=time)
+
+
+def _json_response(status: int, payload: Dict[str, Any], headers: Dict[str, str] = None) -> Response:
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    return status, {'Content-Type': 'application/json; charset=utf-8', **(headers or {})}, body
+
+
+def _header_value(value: str) -> str:
+    """Valor seguro para un encabezado: ASCII imprimible, sin saltos de línea."""
+    return ''.join(ch if ' ' <= ch <= '~' else '_' for ch in value)
+
+
+def _pdf_response(pdf: bytes, filename: str, numero_carta: str) -> Response:
+    # El nombre sale de datos del cliente (NIT, número de carta)
+    filename = re.sub(r'[^A-Za-z0-9._-]', '_', filename)
+    return HTTPStatus.OK, {
+        'Content-Type': 'application/pdf',
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Numero-Carta': _header_value(numero_carta)
+    }, pdf
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """
+    Lee una petición HTTP/1.x (sin cuerpos ``chunked``).
+
+    Returns:
+        Request, o None si el cliente cerró la conexión o quedó inactivo
+
+    Raises:
+        HttpError: Si la petición está mal formada o es demasiado grande
+    """
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+    except (asyncio.TimeoutError, ConnectionError):
+        return None
+    if not request_line.strip():
+        return None
+
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', '0'))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Petición HTTP mal formada")
+
+    if length < 0:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise HttpError(HTTPStatus.LENGTH_REQUIRED, "Se requiere Content-Length")
+    if length > config.SERVER_MAX_BODY_BYTES:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Cuerpo demasiado grande")
+    body = await reader.readexactly(length) if length else b''
+
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+
+    url = urlsplit(target)
+    return Request(method.upper(), url.path, parse_qs(url.query), headers, body, keep_alive)
+
+
+async def _write_response(writer: asyncio.StreamWriter, response: Response, keep_alive: bool):
+    status, headers, body = response
+    status = HTTPStatus(status)
+    head = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    head += [f"{name}: {value}" for name, value in headers.items()]
+    head.append(f"Content-Length: {len(body)}")
+    head.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+
+
+class CartaService:
+    """
+    Servicio de generación de cartas sobre ``asyncio``.
+
+    El bucle de eventos solo lee peticiones y escribe respuestas; la
+    validación (que puede asignar consecutivos) corre en un hilo y el
+    renderizado en el pool de procesos de ``generators.parallel``.
+    """
+
+    def __init__(self, workers: Optional[int] = None, use_cache: Optional[bool] = None,
+                 max_jobs: Optional[int] = None):
+        """
+        Args:
+            workers: Procesos de renderizado (None = config.SERVER_WORKERS; 0 = uno por CPU)
+            use_cache: Reutilizar PDFs de cartas idénticas (None = config.RENDER_CACHE)
+            max_jobs: Trabajos terminados que se conservan (None = config.SERVER_MAX_JOBS)
+        """
+        workers = config.SERVER_WORKERS if workers is None else workers
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.use_cache = use_cache
+        self.max_jobs = config.SERVER_MAX_JOBS if max_jobs is None else max_jobs
+        self.jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._pool = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = None, port: int = None) -> asyncio.AbstractServer:
+        """
+        Arranca el pool de procesos y empieza a escuchar.
+
+        Args:
+            host: Interfaz (None = config.SERVER_HOST)
+            port: Puerto (None = config.SERVER_PORT; 0 = puerto libre)
+        """
+        from generators.parallel import worker_pool
+        from utils.atomic_file import remove_stale_temp_files
+        from utils.payee_manager import payee_manager
+
+        # Temporales de escrituras interrumpidas (proceso terminado a la fuerza)
+        remove_stale_temp_files(config.OUTPUT_DIR / 'cartas', config.OUTPUT_DIR / 'borradores',
+                                config.RENDER_CACHE_DIR)
+        loop = asyncio.get_running_loop()
+        self._pool = worker_pool(config.OUTPUT_DIR / 'cartas', self.workers, self.use_cache)
+        # Arrancar los procesos (y su generador) y cargar los catálogos antes de la primera petición
+        await asyncio.gather(
+            *(loop.run_in_executor(self._pool, os.getpid) for _ in range(self.workers)),
+            asyncio.to_thread(payee_manager.initialize)
+        )
+
+        self._server = await asyncio.start_server(
+            self._handle_connection,
+            config.SERVER_HOST if host is None else host,
+            config.SERVER_PORT if port is None else port
+        )
+        for sock in self._server.sockets:
+            logger.info(f"Servicio de cartas escuchando en {sock.getsockname()} ({self.workers} procesos)")
+        return self._server
+
+    async def close(self):
+        """Deja de aceptar conexiones, cancela los trabajos pendientes y cierra el pool."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for job in self.jobs.values():
+            job.task.cancel()
+        if self._pool is not None:
+            await asyncio.to_thread(self._pool.shutdown, True, cancel_futures=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HttpError as e:
+                    await _write_response(writer, _json_response(e.status, e.payload), keep_alive=False)
+                    break
+                except asyncio.IncompleteReadError:
+                    break
+                if request is None:
+                    break
+
+                response = await self.handle(request)
+                await _write_response(writer, response, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(self, request: Request) -> Response:
+        """Atiende una petición (enrutamiento y errores)."""
+        try:
+            if request.path == '/health':
+                self._require_method(request, 'GET')
+                return _json_response(HTTPStatus.OK, {
+                    'estado': 'ok',
+                    'procesos': self.workers,
+                    'trabajos_pendientes': sum(not job.task.done() for job in self.jobs.values())
+                })
+            if request.path == '/cartas':
+                self._require_method(request, 'POST')
+                return await self._post_carta(request)
+            if request.path.startswith('/cartas/'):
+                self._require_method(request, 'GET')
+                return self._get_job(request.path[len('/cartas/'):])
+            raise HttpError(HTTPStatus.NOT_FOUND, "Ruta no encontrada")
+        except HttpError as e:
+            return _json_response(e.status, e.payload)
+        except Exception as e:
+            logger.error(f"Error atendiendo {request.method} {request.path}: {str(e)}", exc_info=True)
+            return _json_response(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)})
+
+    @staticmethod
+    def _require_method(request: Request, method: str):
+        if request.method != method:
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"Use {method}")
+
+    async def _post_carta(self, request: Request) -> Response:
+        try:
+            payload = json.loads(request.body)
+        except (ValueError, UnicodeDecodeError):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "El cuerpo debe ser JSON")
+        if not isinstance(payload, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "El cuerpo debe ser un objeto JSON (una carta)")
+
+        pdf_data, filename = await asyncio.to_thread(self._prepare, payload)
+        render = asyncio.ensure_future(self._render(pdf_data, filename))
+
+        run_async = request.query.get('async', ['0'])[0].lower() in ('1', 'true')
+        if not run_async:
+            return _pdf_response(await render, filename, pdf_data['numero_carta'])
+
+        job_id = uuid.uuid4().hex
+        render.add_done_callback(lambda task: self._log_job_result(job_id, task))
+        self.jobs[job_id] = Job(pdf_data['numero_carta'], filename, render)
+        self._prune_jobs()
+        return _json_response(HTTPStatus.ACCEPTED, {
+            'job_id': job_id,
+            'numero_carta': pdf_data['numero_carta'],
+            'estado': 'pendiente',
+            'url': f"/cartas/{job_id}"
+        }, headers={'Location': f"/cartas/{job_id}"})
+
+    @staticmethod
+    def _prepare(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """
+        Valida la carta y arma los datos del PDF (en un hilo: puede asignar
+        consecutivo y leer el catálogo de aseguradoras). Una carta inválida
+        no consume consecutivo.
+
+        Raises:
+            HttpError: 422 con los errores de validación por campo
+        """
+        from generators.carta_data import build_output_filename, build_pdf_data, validate_cartas
+
+        # El consecutivo se asigna solo si la carta es válida
+        result = validate_cartas([payload])
+        if result.errors:
+            row_error = result.errors[0]
+            raise HttpError(
+                HTTPStatus.UNPROCESSABLE_ENTITY,
+                "Datos inválidos",
+                detalle=row_error.message,
+                errores=[
+                    {'campo': '.'.join(str(part) for part in error['loc']), 'mensaje': error['msg']}
+                    for error in row_error.errors
+                ]
+            )
+
+        _, documento = result.documentos[0]
+        return build_pdf_data(documento, payload), build_output_filename(documento) + '.pdf'
+
+    async def _render(self, pdf_data: Dict[str, Any], filename: str) -> bytes:
+        from generators.parallel import collect_worker_output, render_bytes_in_worker
+
+        loop = asyncio.get_running_loop()
+        pdf, audit_entries, timings = await loop.run_in_executor(
+            self._pool, render_bytes_in_worker, pdf_data, filename
+        )
+        collect_worker_output(audit_entries, timings)
+        return pdf
+
+    @staticmethod
+    def _log_job_result(job_id: str, task: 'asyncio.Task[bytes]'):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Trabajo {job_id} fallido: {str(task.exception())}")
+
+    def _get_job(self, job_id: str) -> Response:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "Trabajo no encontrado")
+        if not job.task.done():
+            return _json_response(HTTPStatus.ACCEPTED, {
+                'job_id': job_id, 'numero_carta': job.numero_carta, 'estado': 'pendiente'
+            })
+        if job.task.cancelled() or job.task.exception() is not None:
+            error = "cancelado" if job.task.cancelled() else str(job.task.exception())
+            return _json_response(HTTPStatus.INTERNAL_SERVER_ERROR, {
+                'job_id': job_id, 'numero_carta': job.numero_carta, 'estado': 'error', 'error': error
+            })
+        return _pdf_response(job.task.result(), job.filename, job.numero_carta)
+
+    def _prune_jobs(self):
+        """Descarta los trabajos terminados más antiguos por encima de ``max_jobs``."""
+        excess = len(self.jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.task.done()][:max(excess, 0)]:
+            del self.jobs[job_id]
+
+
+async def serve(host: str = None, port: int = None, workers: Optional[int] = None,
+                use_cache: Optional[bool] = None):
+    """Arranca el servicio y atiende peticiones hasta que se interrumpa."""
+    service = CartaService(workers=workers, use_cache=use_cache)
+    server = await service.start(host, port)
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main():
+    """Punto de entrada del servicio."""
+    parser = argparse.ArgumentParser(description='Servicio HTTP de cartas de cobro - SEGUROS UNIÓN')
+    parser.add_argument('--host', default=None, help=f'Interfaz (por defecto {config.SERVER_HOST})')
+    parser.add_argument('--port', type=int, default=None, help=f'Puerto (por defecto {config.SERVER_PORT})')
+    parser.add_argument('--workers', '-w', type=int, default=None, metavar='N',
+                        help='Procesos de renderizado (0 = todos los núcleos)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Renderizar siempre, sin reutilizar PDFs de cartas idénticas')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, use_cache=False if args.no_cache else None))
+    except KeyboardInterrupt:
+        logger.info("Servicio de cartas detenido")
+
+
+if __name__ == '__main__':
+    main()
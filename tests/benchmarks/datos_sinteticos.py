@@ -0,0 +1,125 @@
+"""
+Generadores de datos sintéticos para los benchmarks.
+
+Todos los datos son deterministas (dependen solo del índice), de modo que
+dos corridas en el mismo equipo miden exactamente el mismo trabajo y los
+resultados de distintas versiones son comparables.
+"""
+import random
+from typing import Any, Dict, List
+
+from models.documento import Documento
+
+MESES = [
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
+]
+CIUDADES = ["Medellín", "Bogotá D.C.", "Cali", "Barranquilla", "Bucaramanga", "Pereira"]
+RAMOS = ["VIDA GRUPO", "SALUD", "ACCIDENTES PERSONALES", "AUTOS", "HOGAR", "CUMPLIMIENTO"]
+PALABRAS = [
+    "COOPERATIVA", "COMERCIALIZADORA", "INVERSIONES", "TRANSPORTES", "ANDINA",
+    "DEL VALLE", "NACIONAL", "INDUSTRIAL", "SERVICIOS", "INTEGRALES", "COLOMBIA"
+]
+
+# Pesos de la DIAN para el dígito de verificación del NIT
+_PESOS_NIT = [3, 7, 13, 17, 19, 23, 29, 37, 41, 43, 47, 53, 59, 67, 71]
+
+
+def nit_sintetico(numero: int) -> str:
+    """NIT de 9 dígitos con dígito de verificación válido."""
+    base = f"{800000000 + numero % 100000000:09d}"
+    suma = sum(int(d) * p for d, p in zip(reversed(base), _PESOS_NIT))
+    residuo = suma % 11
+    dv = residuo if residuo in (0, 1) else 11 - residuo
+    return f"{base}-{dv}"
+
+
+def registro_sintetico(indice: int = 0, year: int = 2026) -> Dict[str, Any]:
+    """
+    Registro de carta (formato del lote JSON/CSV) para el índice dado.
+
+    Args:
+        indice: Índice del registro (determina todos los valores)
+        year: Año del número de carta
+
+    Returns:
+        dict: Registro válido para ``Documento.model_validate``
+    """
+    rnd = random.Random(indice)
+    mes = rnd.randrange(12)
+    return {
+        "numero_carta": f"{indice + 1} - {year}",
+        "mes_cobro": MESES[mes],
+        "fecha_emision": f"{year}-{mes + 1:02d}-{rnd.randint(1, 20):02d}",
+        "fecha_limite_pago": f"{year}-{mes + 1:02d}-28",
+        "asegurado": {
+            "razon_social": " ".join(rnd.sample(PALABRAS, 3)) + " S.A.S.",
+            "nit": nit_sintetico(indice),
+            "direccion": f"CR {rnd.randint(1, 99)} {rnd.randint(1, 99)} {rnd.randint(1, 99)}",
+            "telefono": f"60{rnd.randint(10000000, 99999999)}",
+            "ciudad": rnd.choice(CIUDADES)
+        },
+        "poliza": {
+            "numero": str(3000000 + indice),
+            "plan_poliza": f"{rnd.randint(1, 9):02d}  {3000000 + indice}",
+            "documento_referencia": str(21000000 + indice),
+            "cuota_numero": rnd.randint(1, 12),
+            "vigencia_inicio": f"{year}-01-01",
+            "vigencia_fin": f"{year}-12-31"
+        },
+        "montos": {
+            "prima": f"{rnd.randint(100000, 50000000)}.{rnd.randint(0, 99):02d}",
+            "impuesto": f"{rnd.randint(0, 900000)}.00"
+        },
+        "firmante_nombre": "Firmante de Prueba",
+        "firmante_cargo": "Ejecutivo",
+        "firmante_iniciales": "FP"
+    }
+
+
+def registros_sinteticos(cantidad: int, inicio: int = 0) -> List[Dict[str, Any]]:
+    """Lista de ``cantidad`` registros consecutivos."""
+    return [registro_sintetico(i) for i in range(inicio, inicio + cantidad)]
+
+
+def polizas_sinteticas(cantidad: int) -> List[Dict[str, Any]]:
+    """Pólizas de una carta multi-póliza (formato de ``data['polizas']``)."""
+    rnd = random.Random(cantidad)
+    return [
+        {
+            "numero": str(4000000 + n),
+            "tipo": RAMOS[n % len(RAMOS)],
+            "plan": f"PLAN {n % 7 + 1}",
+            "prima": round(rnd.uniform(50000, 5000000), 2),
+            "otros": round(rnd.uniform(0, 20000), 2),
+            "iva": round(rnd.uniform(0, 900000), 2)
+        }
+        for n in range(cantidad)
+    ]
+
+
+def pdf_data_sintetico(indice: int = 0, polizas: int = 0) -> Dict[str, Any]:
+    """
+    Datos listos para el generador (salida de ``Documento.to_pdf_data()``).
+
+    Args:
+        indice: Índice del registro
+        polizas: Número de pólizas de la tabla (0 = póliza única)
+    """
+    data = Documento.model_validate(registro_sintetico(indice)).to_pdf_data()
+    if polizas:
+        data["polizas"] = polizas_sinteticas(polizas)
+    return data
+
+
+def payees_sinteticos(cantidad: int) -> List[Dict[str, Any]]:
+    """Aseguradoras para poblar un catálogo de ``cantidad`` entradas."""
+    return [
+        {
+            "name": f"ASEGURADORA SINTETICA {n:05d} S.A.",
+            "nit": nit_sintetico(50000000 + n),
+            "link_pago": f"www.aseguradora{n}.com.co",
+            "usage_count": n % 17
+        }
+        for n in range(cantidad)
+    ]
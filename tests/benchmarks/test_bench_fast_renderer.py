@@ -0,0 +1,41 @@
+"""
+Benchmarks del renderizado directo sobre el canvas.
+
+Compara generar una carta de una página con el motor de páginas de
+platypus (``SimpleDocTemplate``) contra el dibujo directo en el canvas.
+
+Uso:
+    python -m pytest tests/benchmarks --benchmark-only
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+# Fuera de la corrida normal: se ejecutan con -m benchmark (ver pytest.ini)
+pytestmark = pytest.mark.benchmark
+
+from generators.carta_cobro_generator import CartaCobroGenerator
+
+from datos_sinteticos import pdf_data_sintetico
+
+
+def _generator(tmp_path, fast_path):
+    generator = CartaCobroGenerator(output_dir=tmp_path, use_cache=False, fast_path=fast_path)
+    generator.audit_sink = lambda entry: None  # Sin escritura del log de auditoría
+    return generator
+
+
+@pytest.mark.benchmark(group="renderizado")
+def test_bench_render_platypus(benchmark, tmp_path):
+    """Carta de una página con SimpleDocTemplate."""
+    generator = _generator(tmp_path, fast_path=False)
+    data = pdf_data_sintetico()
+    assert benchmark(generator.generate, data, "carta").exists()
+
+
+@pytest.mark.benchmark(group="renderizado")
+def test_bench_render_fast_path(benchmark, tmp_path):
+    """Carta de una página dibujada directamente en el canvas."""
+    generator = _generator(tmp_path, fast_path=True)
+    data = pdf_data_sintetico()
+    assert benchmark(generator.generate, data, "carta").exists()
@@ -0,0 +1,54 @@
+"""
+Benchmarks de la reutilización de flowables estáticos.
+
+Compara construir los flowables de una carta analizando todos los párrafos
+(comportamiento anterior) contra copiar los prototipos de la plantilla y
+del link de pago.
+
+Uso:
+    python -m pytest tests/benchmarks --benchmark-only
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+# Fuera de la corrida normal: se ejecutan con -m benchmark (ver pytest.ini)
+pytestmark = pytest.mark.benchmark
+
+from reportlab.platypus import Paragraph
+
+from generators.carta_cobro_generator import CartaCobroGenerator
+
+from datos_sinteticos import pdf_data_sintetico
+
+
+@pytest.fixture(scope="module")
+def carta():
+    generator = CartaCobroGenerator(use_cache=False)
+    data = pdf_data_sintetico()
+    return generator, data
+
+
+def _reparse(flowable):
+    """Vuelve a analizar el marcado de un párrafo (sin prototipo)."""
+    if isinstance(flowable, Paragraph):
+        return Paragraph(flowable.text, flowable.style)
+    return flowable
+
+
+@pytest.mark.benchmark(group="flowables")
+def test_bench_story_parsed_per_letter(benchmark, carta):
+    """Todos los párrafos se analizan en cada carta."""
+    generator, data = carta
+
+    def build():
+        return [_reparse(f) for f in generator._build_story(data)]
+
+    assert benchmark(build)
+
+
+@pytest.mark.benchmark(group="flowables")
+def test_bench_story_with_prototypes(benchmark, carta):
+    """Párrafos estáticos y link de pago copiados de sus prototipos."""
+    generator, data = carta
+    assert benchmark(generator._build_story, data)
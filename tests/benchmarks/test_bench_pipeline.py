@@ -0,0 +1,121 @@
+"""
+Benchmarks de las etapas del flujo de generación de cartas.
+
+Cubre la validación del ``Documento`` (una a una y en lote), ``to_pdf_data()``, la tabla de cobro
+con 1/10/100 pólizas, ``generate()`` completo, las búsquedas de
+aseguradoras y la asignación de consecutivos. Los datos salen de
+``datos_sinteticos`` y son deterministas.
+
+Uso:
+    python -m pytest tests/benchmarks --benchmark-only
+    python -m pytest tests/benchmarks --benchmark-only --benchmark-autosave
+    pytest-benchmark compare          # Comparar con corridas guardadas
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+# Fuera de la corrida normal: se ejecutan con -m benchmark (ver pytest.ini)
+pytestmark = pytest.mark.benchmark
+
+from generators.carta_cobro_generator import CartaCobroGenerator
+from models.documento import Documento
+from utils.payee_manager import PayeeManager
+from utils.versioning import VersionManager
+
+from datos_sinteticos import payees_sinteticos, pdf_data_sintetico, registro_sintetico, registros_sinteticos
+
+
+@pytest.fixture(scope="module")
+def generator(tmp_path_factory):
+    generator = CartaCobroGenerator(output_dir=tmp_path_factory.mktemp("cartas"), use_cache=False)
+    generator.audit_sink = lambda entry: None  # Sin escritura del log de auditoría
+    return generator
+
+
+@pytest.mark.benchmark(group="documento")
+def test_bench_documento_validation(benchmark):
+    """Construcción y validación del Documento desde un registro del lote."""
+    registro = registro_sintetico(1)
+    documento = benchmark(Documento.model_validate, registro)
+    assert documento.numero_carta == "2 - 2026"
+
+
+@pytest.mark.benchmark(group="documento")
+def test_bench_to_pdf_data(benchmark):
+    """Conversión del Documento a los datos del PDF."""
+    documento = Documento.model_validate(registro_sintetico(1))
+    data = benchmark(documento.to_pdf_data)
+    assert data["numero_carta"] == "2 - 2026"
+
+
+@pytest.mark.benchmark(group="validacion_lote")
+def test_bench_validation_per_object(benchmark):
+    """1000 registros validados uno a uno con Documento.model_validate."""
+    registros = registros_sinteticos(1000)
+    documentos = benchmark(lambda: [Documento.model_validate(r) for r in registros])
+    assert len(documentos) == 1000
+
+
+@pytest.mark.benchmark(group="validacion_lote")
+def test_bench_validation_type_adapter(benchmark):
+    """1000 registros validados en una pasada (models.batch)."""
+    from models.batch import validate_documentos
+
+    registros = registros_sinteticos(1000)
+    result = benchmark(validate_documentos, registros)
+    assert len(result.documentos) == 1000
+
+
+@pytest.mark.benchmark(group="tabla")
+@pytest.mark.parametrize("polizas", [1, 10, 100])
+def test_bench_billing_table(benchmark, generator, polizas):
+    """Tabla de cobro según el número de pólizas."""
+    data = pdf_data_sintetico(2, polizas=polizas)
+    table = benchmark(generator._build_billing_table, data)
+    assert len(table._cellvalues) == polizas + 1
+
+
+@pytest.mark.benchmark(group="generate")
+@pytest.mark.parametrize("polizas", [0, 100])
+def test_bench_generate(benchmark, generator, polizas):
+    """generate() completo: una página, o varias con 100 pólizas."""
+    data = pdf_data_sintetico(3, polizas=polizas)
+    assert benchmark(generator.generate, data, f"carta_{polizas}").exists()
+
+
+@pytest.mark.benchmark(group="aseguradoras")
+@pytest.mark.parametrize("cantidad", [10, 1000])
+def test_bench_payee_lookup(benchmark, tmp_path, cantidad):
+    """Búsqueda de una aseguradora por nombre (peor caso: la última)."""
+    manager = PayeeManager(tmp_path / "payees.json")
+    manager.payees = payees_sinteticos(cantidad)
+    buscada = manager.payees[-1]["name"].lower()
+
+    assert benchmark(manager.get_payee_by_name, buscada) is not None
+
+
+@pytest.mark.benchmark(group="aseguradoras")
+def test_bench_payee_names(benchmark, tmp_path):
+    """Nombres ordenados por uso (lista del autocompletado)."""
+    manager = PayeeManager(tmp_path / "payees.json")
+    manager.payees = payees_sinteticos(1000)
+
+    assert len(benchmark(manager.get_payee_names)) == 1000
+
+
+@pytest.mark.benchmark(group="consecutivos")
+def test_bench_consecutivo_per_letter(benchmark, tmp_path):
+    """Un consecutivo por carta (bloqueo y escritura del archivo cada vez)."""
+    manager = VersionManager(tmp_path / "consecutivos.json")
+    assert benchmark(manager.get_next_numero_carta, 2026).endswith("- 2026")
+
+
+@pytest.mark.benchmark(group="consecutivos")
+def test_bench_consecutivo_block(benchmark, tmp_path):
+    """Consecutivos tomados de bloques reservados de 100."""
+    allocator = VersionManager(tmp_path / "consecutivos.json").block_allocator(100)
+    try:
+        assert benchmark(allocator.next_numero_carta, 2026).endswith("- 2026")
+    finally:
+        allocator.close()
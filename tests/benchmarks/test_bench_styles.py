@@ -0,0 +1,47 @@
+"""
+Benchmarks de la hoja de estilos de párrafo de la carta.
+
+Compara reconstruir los estilos en cada carta (comportamiento anterior)
+contra la hoja compartida por proceso.
+
+Uso:
+    python -m pytest tests/benchmarks --benchmark-only
+"""
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+# Fuera de la corrida normal: se ejecutan con -m benchmark (ver pytest.ini)
+pytestmark = pytest.mark.benchmark
+
+from generators.carta_cobro_generator import _build_style_sheet, get_carta_styles
+
+
+def _allocated_bytes(func, repeticiones: int = 100) -> int:
+    """Bytes asignados en promedio por llamada a ``func``."""
+    func()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    snapshot = [func() for _ in range(repeticiones)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del snapshot
+    return (after - before) // repeticiones
+
+
+@pytest.mark.benchmark(group="estilos")
+def test_bench_styles_rebuilt_per_letter(benchmark):
+    """Costo de construir la hoja de estilos para cada carta."""
+    benchmark.extra_info["bytes_por_carta"] = _allocated_bytes(_build_style_sheet)
+    styles = benchmark(_build_style_sheet)
+    assert 'CartaTitle' in styles
+
+
+@pytest.mark.benchmark(group="estilos")
+def test_bench_styles_shared(benchmark):
+    """Costo de obtener la hoja de estilos compartida."""
+    benchmark.extra_info["bytes_por_carta"] = _allocated_bytes(get_carta_styles)
+    styles = benchmark(get_carta_styles)
+    assert styles is get_carta_styles()
@@ -0,0 +1,47 @@
+"""
+Configuración común de los tests.
+"""
+import pytest
+
+from utils.config import config
+
+
+@pytest.fixture(autouse=True)
+def isolated_storage(tmp_path, monkeypatch):
+    """Cola de lotes, catálogo SQLite y caché de PDFs en la carpeta temporal del test."""
+    from generators.render_cache import render_cache
+
+    monkeypatch.setattr(config, "JOB_QUEUE_DB", tmp_path / "logs" / "job_queue.db")
+    monkeypatch.setattr(config, "CATALOG_DB", tmp_path / "logs" / "catalogos.db")
+    monkeypatch.setattr(config, "RENDER_CACHE_DIR", tmp_path / "output" / ".render_cache")
+    monkeypatch.setattr(render_cache, "cache_dir", config.RENDER_CACHE_DIR)
+    monkeypatch.setattr(render_cache, "_total_bytes", None)
+
+
+@pytest.fixture
+def registro_valido():
+    """Constructor de registros mínimos válidos para un Documento."""
+    def build(numero_carta="100 - 2026", nit="900123456-6"):
+        return {
+            "numero_carta": numero_carta,
+            "mes_cobro": "Enero",
+            "fecha_emision": "2026-01-21",
+            "fecha_limite_pago": "2026-02-21",
+            "asegurado": {
+                "razon_social": "Cliente de Prueba",
+                "nit": nit,
+                "direccion": "CR 1 1 1",
+                "telefono": "6067676",
+                "ciudad": "Medellín"
+            },
+            "poliza": {
+                "numero": "3144016",
+                "vigencia_inicio": "2026-01-01",
+                "vigencia_fin": "2026-12-31"
+            },
+            "montos": {"prima": "1500000.00"},
+            "firmante_nombre": "Firmante",
+            "firmante_cargo": "Ejecutivo"
+        }
+
+    return build
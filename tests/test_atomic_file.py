@@ -0,0 +1,114 @@
+"""
+Tests de la escritura atómica y del renderizado en memoria.
+"""
+import os
+import stat
+import time
+
+import pytest
+from reportlab import rl_config
+
+from generators.carta_data import build_documento
+from generators.carta_cobro_generator import CartaCobroGenerator
+from utils import atomic_file
+from utils.atomic_file import atomic_open, remove_stale_temp_files, write_bytes_atomic
+
+
+def test_atomic_open_replaces_only_on_success(tmp_path):
+    """Un error durante la escritura conserva el archivo anterior y no deja temporales."""
+    destino = tmp_path / "sub" / "carta.pdf"
+    write_bytes_atomic(destino, b"anterior")
+
+    with pytest.raises(RuntimeError):
+        with atomic_open(destino) as f:
+            f.write(b"a medias")
+            raise RuntimeError("fallo")
+
+    assert destino.read_bytes() == b"anterior"
+    assert [p.name for p in destino.parent.iterdir()] == ["carta.pdf"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="permisos POSIX")
+def test_atomic_file_mode_follows_umask(tmp_path):
+    """El archivo final tiene los permisos de un ``open`` normal (0666 menos la umask)."""
+    previous = os.umask(0o027)
+    try:
+        write_bytes_atomic(tmp_path / "carta.pdf", b"pdf")
+    finally:
+        os.umask(previous)
+
+    assert stat.S_IMODE((tmp_path / "carta.pdf").stat().st_mode) == 0o640
+
+
+
+def test_content_is_synced_before_replace(tmp_path, monkeypatch):
+    """El temporal se sincroniza a disco antes de reemplazar el destino."""
+    calls = []
+    real_fsync, real_replace = os.fsync, os.replace
+    monkeypatch.setattr(atomic_file.os, "fsync", lambda fd: calls.append("fsync") or real_fsync(fd))
+    monkeypatch.setattr(atomic_file.os, "replace", lambda a, b: calls.append("replace") or real_replace(a, b))
+
+    write_bytes_atomic(tmp_path / "carta.pdf", b"pdf")
+
+    assert calls == ["fsync", "replace"]
+
+
+def test_remove_stale_temp_files(tmp_path):
+    """Solo se eliminan temporales de atomic_open abandonados."""
+    stale = tmp_path / ".CARTA_1.pdf.0123456789ab.tmp"
+    fresh = tmp_path / ".CARTA_2.pdf.ba9876543210.tmp"
+    other = tmp_path / "notas.tmp"
+    for path in (stale, fresh, other):
+        path.write_bytes(b"x")
+    old = time.time() - 2 * atomic_file.STALE_TEMP_AGE
+    os.utime(stale, (old, old))
+    os.utime(other, (old, old))
+
+    assert remove_stale_temp_files(tmp_path, tmp_path / "no-existe") == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == [fresh.name, other.name]
+
+@pytest.fixture
+def carta(tmp_path, monkeypatch, registro_valido):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rl_config, 'invariant', 1)
+    generator = CartaCobroGenerator(output_dir=tmp_path / "cartas", use_cache=False)
+    return generator, build_documento(registro_valido("800 - 2026")).to_pdf_data()
+
+
+def test_render_to_bytes_matches_generated_file(tmp_path, carta):
+    """El PDF en memoria es el mismo que se escribe a disco."""
+    generator, data = carta
+
+    pdf = generator.render_to_bytes(data)
+    path = generator.generate(data, "carta")
+
+    assert pdf.startswith(b"%PDF")
+    assert path.read_bytes() == pdf
+
+
+def test_generate_writes_to_output_dir(tmp_path, carta):
+    """Con ``output_dir`` el PDF (también el borrador) va directo a esa carpeta."""
+    generator, data = carta
+
+    path = generator.generate({**data, "es_borrador": True}, "carta", output_dir=tmp_path / "elegida")
+
+    assert path == tmp_path / "elegida" / "carta.pdf"
+    assert path.exists()
+    assert not (tmp_path / "borradores").exists()
+
+
+def test_failed_render_leaves_no_file(tmp_path, carta, monkeypatch):
+    """Si el diseño falla no queda un PDF a medias en el destino."""
+    generator, data = carta
+    generator.generate(data, "carta")
+    original = (tmp_path / "cartas" / "carta.pdf").read_bytes()
+
+    def fallar(data):
+        raise RuntimeError("fallo de diseño")
+
+    monkeypatch.setattr(generator, "_build_story", fallar)
+    with pytest.raises(RuntimeError):
+        generator.generate({**data, "numero_carta": "801 - 2026"}, "carta")
+
+    assert (tmp_path / "cartas" / "carta.pdf").read_bytes() == original
+    assert [p.name for p in (tmp_path / "cartas").iterdir()] == ["carta.pdf"]
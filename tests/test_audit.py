@@ -0,0 +1,140 @@
+"""
+Tests para el escritor del log de auditoría.
+"""
+import gzip
+import json
+import os
+import time
+
+from utils.audit import AuditWriter
+
+
+def _read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_entries_are_buffered_until_flush(tmp_path):
+    """Las entradas se agrupan en memoria y se escriben al vaciar el búfer."""
+    log_file = tmp_path / "audit_trail.log"
+    writer = AuditWriter(log_file, flush_interval=60)
+
+    writer.write({"document_number": "1 - 2026"})
+    writer.write({"document_number": "2 - 2026"})
+    assert not log_file.exists()
+
+    writer.flush()
+    assert [e["document_number"] for e in _read_lines(log_file)] == ["1 - 2026", "2 - 2026"]
+    writer.close()
+
+
+def test_full_buffer_and_close_flush(tmp_path):
+    """Un búfer lleno se escribe de inmediato y close() escribe el resto."""
+    log_file = tmp_path / "audit_trail.log"
+    writer = AuditWriter(log_file, flush_interval=60, max_buffer=2)
+
+    for idx in range(3):
+        writer.write({"n": idx})
+    assert len(_read_lines(log_file)) == 2
+
+    writer.close()
+    assert [e["n"] for e in _read_lines(log_file)] == [0, 1, 2]
+
+
+def test_background_flush_interval(tmp_path):
+    """El hilo de fondo escribe dentro del intervalo configurado."""
+    log_file = tmp_path / "audit_trail.log"
+    writer = AuditWriter(log_file, flush_interval=0.05)
+
+    writer.write({"n": 1})
+    deadline = time.monotonic() + 5
+    while not log_file.exists() or not log_file.read_text(encoding="utf-8"):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    writer.close()
+
+
+def test_rotation_by_size_with_compression(tmp_path):
+    """Al superar max_bytes el segmento se rota y se comprime."""
+    log_file = tmp_path / "audit_trail.log"
+    writer = AuditWriter(log_file, flush_interval=60, max_bytes=100, compress=True)
+
+    writer.write({"payload": "x" * 80})
+    writer.flush()
+    writer.write({"payload": "y" * 80})
+    writer.close()
+
+    rotated = list(tmp_path.glob("audit_trail.*.log.gz"))
+    assert len(rotated) == 1
+    with gzip.open(rotated[0], "rt", encoding="utf-8") as f:
+        assert json.loads(f.read())["payload"] == "x" * 80
+    assert _read_lines(log_file)[0]["payload"] == "y" * 80
+
+
+def test_rotation_by_date(tmp_path):
+    """Un segmento de un día anterior se rota antes de escribir."""
+    log_file = tmp_path / "audit_trail.log"
+    log_file.write_text('{"n": 0}\n', encoding="utf-8")
+    yesterday = time.time() - 86400
+    os.utime(log_file, (yesterday, yesterday))
+
+    writer = AuditWriter(log_file, flush_interval=60)
+    writer.write({"n": 1})
+    writer.close()
+
+    rotated = list(tmp_path.glob("audit_trail.*.log"))
+    assert len(rotated) == 1
+    assert _read_lines(rotated[0]) == [{"n": 0}]
+    assert _read_lines(log_file) == [{"n": 1}]
+
+
+
+def test_writer_follows_rotation_by_another_process(tmp_path):
+    """Si otro proceso rotó el log, la siguiente escritura va al archivo nuevo."""
+    log_file = tmp_path / "audit_trail.log"
+    writer = AuditWriter(log_file, flush_interval=60, index=False)
+    writer.write({"n": 1})
+    writer.flush()
+
+    os.replace(log_file, tmp_path / "audit_trail.20260101-000000.log")
+    writer.write({"n": 2})
+    writer.close()
+
+    assert _read_lines(tmp_path / "audit_trail.20260101-000000.log") == [{"n": 1}]
+    assert _read_lines(log_file) == [{"n": 2}]
+
+
+def test_writers_sharing_a_log_rotate_without_losing_entries(tmp_path):
+    """Dos escritores sobre el mismo log (como dos procesos) rotan sin perder entradas."""
+    log_file = tmp_path / "audit_trail.log"
+    writers = [AuditWriter(log_file, flush_interval=60, max_bytes=60, index=False) for _ in range(2)]
+
+    for n in range(20):
+        writer = writers[n % 2]
+        writer.write({"n": n})
+        writer.flush()
+    for writer in writers:
+        writer.close()
+
+    segments = sorted(tmp_path.glob("audit_trail.*.log")) + [log_file]
+    entries = [entry["n"] for segment in segments for entry in _read_lines(segment)]
+    assert sorted(entries) == list(range(20))
+    assert all(segment.stat().st_size <= 60 for segment in segments)
+
+def test_parallel_workers_audit_through_parent(tmp_path, monkeypatch, registro_valido):
+    """Las cartas renderizadas en otros procesos quedan en el log del proceso principal."""
+    monkeypatch.chdir(tmp_path)
+    from generators.carta_data import build_documento, build_output_filename
+    from generators.parallel import ParallelRenderer
+    from utils.audit import audit_writer
+
+    jobs = []
+    for idx in range(4):
+        documento = build_documento(registro_valido(f"{400 + idx} - 2026"))
+        jobs.append((idx, documento.to_pdf_data(), build_output_filename(documento)))
+
+    results = list(ParallelRenderer(tmp_path / "cartas", workers=2).render(jobs))
+    audit_writer.flush()
+
+    assert all(r.ok for r in results)
+    entries = _read_lines(tmp_path / "logs" / "audit_trail.log")
+    assert sorted(e["document_number"] for e in entries) == [f"{400 + idx} - 2026" for idx in range(4)]
@@ -0,0 +1,148 @@
+"""
+Tests para el índice del log de auditoría.
+"""
+import gzip
+import json
+import sqlite3
+
+import pytest
+
+from utils.audit import AuditWriter
+from utils.audit_index import AuditIndex
+
+
+def _entry(numero, nit="900123456-6", poliza="3144016", timestamp="2026-03-10T10:00:00"):
+    return {
+        "timestamp": timestamp,
+        "document_type": "CartaCobroGenerator",
+        "document_number": numero,
+        "policy_number": poliza,
+        "client_nit": nit,
+        "output_path": f"output/cartas/{numero}.pdf",
+        "status": "success",
+        "is_draft": False
+    }
+
+
+def test_writer_flush_updates_index(tmp_path):
+    """Las entradas escritas quedan indexadas junto al log."""
+    writer = AuditWriter(tmp_path / "audit_trail.log", flush_interval=60)
+    writer.write(_entry("1 - 2026"))
+    writer.write(_entry("2 - 2026", nit="800111222-3"))
+    writer.write(_entry("3 - 2026", nit="7001112224"))
+    writer.close()
+
+    index = AuditIndex.open(tmp_path / "audit_index.db")
+
+    assert [e["document_number"] for e in index.query(nit="900123456-6")] == ["1 - 2026"]
+    # El NIT se compara normalizado en ambos sentidos
+    assert [e["document_number"] for e in index.query(nit="8001112223")] == ["2 - 2026"]
+    assert [e["document_number"] for e in index.query(nit="700.111.222-4")] == ["3 - 2026"]
+    assert index.query(document="2 - 2026")[0]["client_nit"] == "800111222-3"
+
+
+def test_query_filters_by_date_range(tmp_path):
+    """Una fecha final sin hora incluye el día completo."""
+    index = AuditIndex.open(tmp_path / "audit_index.db")
+    index.add_entries([
+        _entry("1 - 2025", timestamp="2025-12-31T23:59:59"),
+        _entry("2 - 2026", timestamp="2026-01-15T08:00:00"),
+        _entry("3 - 2026", timestamp="2026-02-01T00:00:00", poliza="999")
+    ])
+
+    desde_enero = index.query(since="2026-01-01", until="2026-01-15")
+    assert [e["document_number"] for e in desde_enero] == ["2 - 2026"]
+    assert [e["document_number"] for e in index.query(policy="999")] == ["3 - 2026"]
+    assert len(index.query(nit="900123456-6", limit=2)) == 2
+
+
+def test_rebuild_reads_rotated_segments(tmp_path):
+    """La reconstrucción incluye segmentos rotados y comprimidos."""
+    log_file = tmp_path / "audit_trail.log"
+    with gzip.open(tmp_path / "audit_trail.20260101-000000.log.gz", "wt", encoding="utf-8") as f:
+        f.write(json.dumps(_entry("1 - 2026")) + "\n")
+    (tmp_path / "audit_trail.20260102-000000.log").write_text(
+        json.dumps(_entry("2 - 2026")) + "\nlínea dañada\n", encoding="utf-8"
+    )
+    log_file.write_text(json.dumps(_entry("3 - 2026")) + "\n", encoding="utf-8")
+
+    index = AuditIndex.open(tmp_path / "audit_index.db")
+    index.add_entries([_entry("obsoleta")])
+
+    assert index.rebuild(log_file) == 3
+    assert index.count() == 3
+
+
+def test_rebuild_failure_keeps_previous_index(tmp_path, monkeypatch):
+    """Si la lectura del log falla, el índice anterior queda intacto."""
+    index = AuditIndex.open(tmp_path / "audit_index.db")
+    index.add_entries([_entry("1 - 2026"), _entry("2 - 2026")])
+
+    def broken_log(log_file):
+        yield _entry("3 - 2026")
+        raise OSError("segmento ilegible")
+
+    monkeypatch.setattr("utils.audit_index.iter_audit_entries", broken_log)
+    with pytest.raises(OSError):
+        index.rebuild(tmp_path / "audit_trail.log")
+
+    assert [e["document_number"] for e in index.query()] == ["1 - 2026", "2 - 2026"]
+
+
+def test_old_index_gets_normalized_nit_column(tmp_path):
+    """Un índice creado sin la columna normalizada se migra al abrirlo."""
+    db_path = tmp_path / "audit_index.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript("""
+        CREATE TABLE audit_entries (
+            id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL,
+            document_type TEXT NOT NULL DEFAULT '', document_number TEXT NOT NULL DEFAULT '',
+            policy_number TEXT NOT NULL DEFAULT '', client_nit TEXT NOT NULL DEFAULT '',
+            output_path TEXT NOT NULL DEFAULT '', status TEXT NOT NULL DEFAULT '',
+            is_draft INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX idx_audit_nit ON audit_entries (client_nit, timestamp);
+        INSERT INTO audit_entries (timestamp, document_number, client_nit)
+        VALUES ('2026-03-10T10:00:00', '1 - 2026', '800111222-3');
+    """)
+    conn.close()
+
+    index = AuditIndex.open(db_path)
+
+    assert [e["document_number"] for e in index.query(nit="8001112223")] == ["1 - 2026"]
+
+
+def test_existing_log_is_indexed_on_first_use(tmp_path):
+    """El historial previo del log entra al índice la primera vez que se usa."""
+    log_file = tmp_path / "audit_trail.log"
+    log_file.write_text(
+        "".join(json.dumps(_entry(f"{n} - 2025")) + "\n" for n in (1, 2)), encoding="utf-8"
+    )
+
+    writer = AuditWriter(log_file, flush_interval=60)
+    writer.write(_entry("3 - 2026"))
+    writer.close()
+
+    index = AuditIndex.open(tmp_path / "audit_index.db")
+    assert [e["document_number"] for e in index.query()] == ["1 - 2025", "2 - 2025", "3 - 2026"]
+
+
+def test_failed_insert_marks_index_for_rebuild(tmp_path, monkeypatch):
+    """Si indexar falla, el índice queda marcado y se reconstruye en la siguiente consulta."""
+    log_file = tmp_path / "audit_trail.log"
+    writer = AuditWriter(log_file, flush_interval=60)
+    writer.write(_entry("1 - 2026"))
+    writer.flush()
+
+    def locked(self, entries):
+        raise sqlite3.OperationalError("database is locked")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(AuditIndex, "add_entries", locked)
+        writer.write(_entry("2 - 2026"))
+        writer.close()
+
+    index = AuditIndex.open(tmp_path / "audit_index.db", log_file)
+    assert (tmp_path / "audit_index.db.dirty").exists()
+    assert [e["document_number"] for e in index.query()] == ["1 - 2026", "2 - 2026"]
+    assert not (tmp_path / "audit_index.db.dirty").exists()
@@ -0,0 +1,348 @@
+"""
+Tests para la generación de cartas en lote.
+"""
+import json
+import pytest
+
+from utils.batch_reader import InvalidRecord, iter_batch_records
+
+
+CSV_HEADER = (
+    "numero_carta;mes_cobro;fecha_emision;fecha_limite_pago;"
+    "asegurado.razon_social;asegurado.nit;asegurado.direccion;asegurado.telefono;asegurado.ciudad;"
+    "poliza.numero;poliza.vigencia_inicio;poliza.vigencia_fin;"
+    "montos.prima;montos.impuesto;firmante_nombre;firmante_cargo"
+)
+
+
+def test_csv_nested_columns(tmp_path):
+    """Las columnas con punto se convierten en diccionarios anidados."""
+    csv_file = tmp_path / "lote.csv"
+    csv_file.write_text(
+        CSV_HEADER + "\n"
+        "1 - 2026;Enero;2026-01-21;2026-02-21;CLIENTE;900123456-6;CR 1;6067676;MEDELLIN;"
+        "3144016;2026-01-01;2026-12-31;1500000.00;;FIRMANTE;Ejecutivo\n",
+        encoding="utf-8"
+    )
+
+    records = list(iter_batch_records(csv_file))
+
+    assert len(records) == 1
+    number, record = records[0]
+    assert number == 1
+    assert record["asegurado"]["nit"] == "900123456-6"
+    assert record["montos"] == {"prima": "1500000.00"}  # Celda vacía omitida
+
+
+def test_jsonl_skips_blank_lines(tmp_path):
+    """Las líneas vacías del JSONL se ignoran."""
+    jsonl_file = tmp_path / "lote.jsonl"
+    jsonl_file.write_text('{"a": 1}\n\n{"a": 2}\n', encoding="utf-8")
+
+    records = list(iter_batch_records(jsonl_file))
+
+    assert records == [(1, {"a": 1}), (2, {"a": 2})]
+
+
+@pytest.mark.parametrize("chunk_size", [3, 64 * 1024])
+def test_json_array_streaming(tmp_path, chunk_size, registro_valido):
+    """Un arreglo JSON se lee registro a registro, aunque cruce bloques."""
+    from utils.batch_reader import _iter_json
+
+    registros = [registro_valido(f"{400 + i} - 2026") for i in range(5)]
+    registros[2]["montos"]["prima"] = 1500000.25  # Número partido entre bloques
+    json_file = tmp_path / "lote.json"
+    json_file.write_text(json.dumps(registros, indent=2), encoding="utf-8")
+
+    records = list(_iter_json(json_file, chunk_size=chunk_size))
+
+    assert [idx for idx, _ in records] == [1, 2, 3, 4, 5]
+    assert [record for _, record in records] == registros
+
+
+def test_json_single_object_and_errors(tmp_path, registro_valido):
+    """Un objeto solo es un lote de una carta; un arreglo mal formado falla."""
+    single = tmp_path / "carta.json"
+    single.write_text(json.dumps(registro_valido()), encoding="utf-8")
+    assert [idx for idx, _ in iter_batch_records(single)] == [1]
+
+    empty = tmp_path / "vacio.json"
+    empty.write_text(" [ ] ", encoding="utf-8")
+    assert list(iter_batch_records(empty)) == []
+
+    broken = tmp_path / "roto.json"
+    broken.write_text('[{"a": 1}, 3, {"b": ], {"c": 3}]', encoding="utf-8")
+    records = list(iter_batch_records(broken))
+    assert records[0] == (1, {"a": 1})
+    assert [idx for idx, _ in records[1:]] == [2, 3]
+    assert all(isinstance(record, InvalidRecord) for _, record in records[1:])
+
+
+def test_json_array_bounded_memory(tmp_path, registro_valido):
+    """La memoria máxima no depende del número de registros del arreglo."""
+    import tracemalloc
+
+    json_file = tmp_path / "lote.json"
+    with open(json_file, "w", encoding="utf-8") as f:
+        f.write("[")
+        f.write(",".join(json.dumps(registro_valido(f"{i} - 2026")) for i in range(5000)))
+        f.write("]")
+    assert json_file.stat().st_size > 2 * 1024 * 1024
+
+    tracemalloc.start()
+    total = sum(1 for _ in iter_batch_records(json_file))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert total == 5000
+    assert peak < 1024 * 1024
+
+
+
+def test_json_array_malformed_record_bounded_memory(tmp_path, registro_valido):
+    """Un registro mal formado al inicio no carga el resto del archivo en memoria."""
+    import tracemalloc
+
+    json_file = tmp_path / "lote.json"
+    with open(json_file, "w", encoding="utf-8") as f:
+        f.write('[{"numero_carta": 1 2},')
+        f.write(",".join(json.dumps(registro_valido(f"{i} - 2026")) for i in range(5000)))
+        f.write("]")
+
+    tracemalloc.start()
+    records = list(iter_batch_records(json_file))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert len(records) == 1 and isinstance(records[0][1], InvalidRecord)
+    assert peak < 1024 * 1024
+
+
+def test_json_values_split_at_every_position(tmp_path):
+    """Literales, números y escapes cortados entre bloques se leen completos."""
+    from utils.batch_reader import _iter_json
+
+    registros = [{"a": False, "b": None, "c": True, "d": -1.5e-3, "e": "\u00e9\\\"x"}] * 3
+    json_file = tmp_path / "lote.json"
+    json_file.write_text(json.dumps(registros), encoding="utf-8")
+
+    for chunk_size in range(1, 24):
+        assert [r for _, r in _iter_json(json_file, chunk_size)] == registros
+
+def test_unsupported_extension(tmp_path):
+    """Un formato desconocido produce ValueError."""
+    with pytest.raises(ValueError):
+        iter_batch_records(tmp_path / "lote.xlsx")
+
+
+def test_validate_documentos_reports_errors_per_row(registro_valido):
+    """La validación en lote no lanza excepciones y separa filas válidas e inválidas."""
+    from models.batch import validate_documentos
+
+    sin_asegurado = registro_valido("301 - 2026")
+    del sin_asegurado["asegurado"]
+    mes_invalido = registro_valido("302 - 2026")
+    mes_invalido["mes_cobro"] = "Enerx"
+
+    result = validate_documentos([
+        registro_valido("300 - 2026"), sin_asegurado, mes_invalido, "no es un registro",
+        registro_valido("304 - 2026")
+    ])
+
+    assert [(i, d.numero_carta) for i, d in result.documentos] == [(0, "300 - 2026"), (4, "304 - 2026")]
+    assert [e.index for e in result.errors] == [1, 2, 3]
+    assert result.errors[0].message.startswith("asegurado: ")
+    assert result.errors[1].errors[0]["loc"] == ("mes_cobro",)
+    assert result.errors[2].message.startswith("registro: ")
+
+
+def test_validate_documentos_all_valid(registro_valido):
+    """Sin errores basta una pasada y se conserva el orden."""
+    from models.batch import validate_documentos
+
+    result = validate_documentos([registro_valido(f"{310 + i} - 2026") for i in range(3)])
+
+    assert result.errors == []
+    assert [i for i, _ in result.documentos] == [0, 1, 2]
+
+
+def test_run_batch_continues_after_failure(tmp_path, monkeypatch, registro_valido):
+    """Un registro inválido no detiene el lote."""
+    monkeypatch.chdir(tmp_path)
+    from cli import run_batch
+    from generators.parallel import ParallelRenderer
+
+    registro_malo = registro_valido("101 - 2026")
+    del registro_malo["asegurado"]
+
+    jsonl_file = tmp_path / "lote.jsonl"
+    jsonl_file.write_text(
+        "\n".join(json.dumps(r) for r in [
+            registro_valido("100 - 2026"),
+            registro_malo,
+            registro_valido("102 - 2026")
+        ]),
+        encoding="utf-8"
+    )
+
+    summary = run_batch(jsonl_file, ParallelRenderer(tmp_path / "cartas", workers=1))
+
+    assert summary["total"] == 3
+    assert summary["generados"] == 2
+    assert [numero for numero, _ in summary["fallidos"]] == [2]
+    assert (tmp_path / "cartas" / "CARTA_100-2026_9001234566.pdf").exists()
+    assert (tmp_path / "cartas" / "CARTA_102-2026_9001234566.pdf").exists()
+
+
+
+def test_invalid_rows_do_not_use_consecutivos(tmp_path, monkeypatch, registro_valido):
+    """Solo los registros válidos reciben número de carta: no quedan huecos."""
+    monkeypatch.chdir(tmp_path)
+    from datetime import datetime
+    from cli import run_batch
+    from generators.parallel import ParallelRenderer
+    from utils.versioning import version_manager
+
+    registro_malo = registro_valido("")
+    del registro_malo["asegurado"]
+
+    jsonl_file = tmp_path / "lote.jsonl"
+    jsonl_file.write_text(
+        "\n".join(json.dumps(r) for r in [registro_valido(""), registro_malo, registro_valido("")]),
+        encoding="utf-8"
+    )
+
+    summary = run_batch(jsonl_file, ParallelRenderer(tmp_path / "cartas", workers=1))
+    year = datetime.now().year
+
+    assert summary["generados"] == 2
+    assert version_manager.get_current_consecutivo(year) == 2
+    assert sorted(p.name for p in (tmp_path / "cartas").glob("*.pdf")) == [
+        f"CARTA_1-{year}_9001234566.pdf", f"CARTA_2-{year}_9001234566.pdf"
+    ]
+
+def test_run_batch_skips_malformed_jsonl_line(tmp_path, monkeypatch, registro_valido):
+    """Una línea JSONL mal formada es un registro fallido; el resto se genera."""
+    monkeypatch.chdir(tmp_path)
+    from cli import run_batch
+    from generators.parallel import ParallelRenderer
+
+    jsonl_file = tmp_path / "lote.jsonl"
+    jsonl_file.write_text(
+        json.dumps(registro_valido("100 - 2026")) + "\n"
+        '{"numero_carta": "101 - 2026", \n'
+        "[1, 2]\n"
+        + json.dumps(registro_valido("102 - 2026")) + "\n",
+        encoding="utf-8"
+    )
+
+    summary = run_batch(jsonl_file, ParallelRenderer(tmp_path / "cartas", workers=1))
+
+    assert summary["total"] == 4
+    assert summary["generados"] == 2
+    assert [numero for numero, _ in summary["fallidos"]] == [2, 3]
+    assert summary["fallidos"][0][1].startswith("Línea 2: JSON inválido")
+    assert summary["fallidos"][1][1] == "Línea 3: el registro no es un objeto JSON"
+    assert (tmp_path / "cartas" / "CARTA_102-2026_9001234566.pdf").exists()
+
+
+def test_run_batch_multipoliza(tmp_path, monkeypatch, registro_valido):
+    """Los lotes aceptan el arreglo ``polizas`` de la interfaz gráfica."""
+    monkeypatch.chdir(tmp_path)
+    from cli import run_batch
+    from generators.parallel import ParallelRenderer
+
+    registro = registro_valido("100 - 2026")
+    del registro["poliza"], registro["montos"]
+    registro["polizas"] = [
+        {
+            "numero": f"VG-{n}", "tipo": "VIDA GRUPO", "plan": f"PLAN {n}",
+            "vigencia_inicio": "01/01/2026", "vigencia_fin": "31/12/2026",
+            "prima": "100000.10", "iva": "19000.02"
+        }
+        for n in range(30)
+    ]
+
+    json_file = tmp_path / "lote.json"
+    json_file.write_text(json.dumps([registro]), encoding="utf-8")
+
+    summary = run_batch(json_file, ParallelRenderer(tmp_path / "cartas", workers=1))
+
+    assert summary["generados"] == 1
+    assert summary["fallidos"] == []
+    assert (tmp_path / "cartas" / "CARTA_100-2026_9001234566.pdf").exists()
+
+
+def test_parallel_renderer_keeps_order(tmp_path, monkeypatch, registro_valido):
+    """El pool de procesos entrega los resultados en el orden de envío."""
+    monkeypatch.chdir(tmp_path)
+    from generators.carta_data import build_documento, build_output_filename
+    from generators.parallel import ParallelRenderer
+
+    jobs = []
+    for idx in range(6):
+        documento = build_documento(registro_valido(f"{200 + idx} - 2026"))
+        jobs.append((idx, documento.to_pdf_data(), build_output_filename(documento)))
+    jobs.insert(3, ("malo", {"numero_carta": "X"}, "CARTA_MALA"))
+
+    renderer = ParallelRenderer(tmp_path / "cartas", workers=2, max_in_flight=3)
+    results = list(renderer.render(jobs))
+
+    assert [r.key for r in results] == [0, 1, 2, "malo", 3, 4, 5]
+    assert not results[3].ok
+    assert "Faltan campos requeridos" in results[3].error
+    assert all(r.ok and r.output_path.exists() for r in results if r.key != "malo")
+
+
+def test_run_batch_collated_single_pdf(tmp_path, monkeypatch, registro_valido):
+    """El modo consolidado produce un solo PDF con una página por carta."""
+    monkeypatch.chdir(tmp_path)
+    from cli import run_batch_collated
+    from generators.carta_cobro_generator import CartaCobroGenerator
+
+    jsonl_file = tmp_path / "lote.jsonl"
+    jsonl_file.write_text(
+        "\n".join(json.dumps(registro_valido(f"{300 + idx} - 2026")) for idx in range(3)),
+        encoding="utf-8"
+    )
+
+    generator = CartaCobroGenerator(output_dir=tmp_path / "cartas")
+    summary = run_batch_collated(jsonl_file, generator, "lote_impresion")
+
+    assert summary["generados"] == 3
+    assert summary["output_path"] == tmp_path / "cartas" / "lote_impresion.pdf"
+    pdf_bytes = summary["output_path"].read_bytes()
+    assert pdf_bytes.count(b"/Type /Page\n") == 3
+    assert b"/Outlines" in pdf_bytes
+    assert list((tmp_path / "cartas").iterdir()) == [summary["output_path"]]
+
+
+def test_run_batch_collated_streams_letters(tmp_path, monkeypatch, registro_valido):
+    """Las cartas llegan al generador como iterador, no como lista cargada."""
+    monkeypatch.chdir(tmp_path)
+    from cli import run_batch_collated
+    from generators.carta_cobro_generator import CartaCobroGenerator
+
+    jsonl_file = tmp_path / "lote.jsonl"
+    jsonl_file.write_text(
+        "\n".join(json.dumps(registro_valido(f"{310 + idx} - 2026")) for idx in range(2)),
+        encoding="utf-8"
+    )
+
+    generator = CartaCobroGenerator(output_dir=tmp_path / "cartas")
+    collate = generator.generate_collated
+
+    def spy(items, *args, **kwargs):
+        assert iter(items) is items
+        return collate(items, *args, **kwargs)
+
+    monkeypatch.setattr(generator, "generate_collated", spy)
+    summary = run_batch_collated(jsonl_file, generator, "lote_stream")
+
+    assert summary["generados"] == 2
+    assert summary["output_path"].exists()
+
+    jsonl_file.write_text(json.dumps({"numero_carta": "sin datos"}), encoding="utf-8")
+    summary = run_batch_collated(jsonl_file, generator, "lote_vacio")
+    assert summary["generados"] == 0 and summary["output_path"] is None
+    assert len(summary["fallidos"]) == 1
@@ -0,0 +1,168 @@
+"""
+Tests para el almacenamiento SQLite de catálogos.
+"""
+import json
+import sqlite3
+
+import pytest
+
+from utils import catalog_store
+from utils.catalog_store import JsonListStore, JsonPayeeStore, SqlitePayeeStore, SqliteListStore
+from utils.payee_manager import PayeeManager
+from utils.ramo_manager import RamoManager
+
+
+def test_sqlite_payees_persist_between_instances(tmp_path):
+    """Las aseguradoras guardadas en SQLite se recuperan en otra instancia."""
+    db = tmp_path / "catalogos.db"
+    manager1 = PayeeManager(store=SqlitePayeeStore(db))
+    manager1.add_payee("seguros bolívar s.a.", "860002503-4", "www.bolivar.com")
+
+    manager2 = PayeeManager(store=SqlitePayeeStore(db))
+    payee = manager2.get_payee_by_name("SEGUROS BOLÍVAR S.A.")
+
+    assert payee is not None
+    assert payee["nit"] == "860002503-4"
+    assert payee["link_pago"] == "www.bolivar.com"
+    assert len(manager2.get_all_payees()) == len(manager1.get_all_payees())
+
+
+def test_sqlite_usage_counter_shared(tmp_path):
+    """Los incrementos de dos gestores (procesos) sobre la misma base se suman."""
+    db = tmp_path / "catalogos.db"
+    manager1 = PayeeManager(store=SqlitePayeeStore(db))
+    manager1.add_payee("ASEGURADORA A", "111111111-1")
+    manager2 = PayeeManager(store=SqlitePayeeStore(db))
+
+    manager1.increment_usage("ASEGURADORA A")
+    manager2.increment_usage("ASEGURADORA A")
+
+    assert manager2.get_payee_by_name("ASEGURADORA A")["usage_count"] == 3
+    conn = sqlite3.connect(db)
+    count = conn.execute(
+        "SELECT usage_count FROM payees WHERE name_key = 'ASEGURADORA A'"
+    ).fetchone()[0]
+    conn.close()
+    assert count == 3
+
+
+def _db_usage_count(db, name_key):
+    conn = sqlite3.connect(db)
+    count = conn.execute("SELECT usage_count FROM payees WHERE name_key = ?", (name_key,)).fetchone()[0]
+    conn.close()
+    return count
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_sqlite_upsert_keeps_other_process_increments(tmp_path, monkeypatch, returning):
+    """Actualizar o renombrar una aseguradora con datos en memoria atrasados no pisa el contador."""
+    monkeypatch.setattr(catalog_store, "SQLITE_RETURNING", returning)
+    db = tmp_path / "catalogos.db"
+    manager1 = PayeeManager(store=SqlitePayeeStore(db))
+    manager1.add_payee("ASEGURADORA A", "111111111-1")
+    manager2 = PayeeManager(store=SqlitePayeeStore(db))
+    for _ in range(3):
+        manager2.increment_usage("ASEGURADORA A")
+
+    payee = manager1.add_payee("ASEGURADORA A", "111111111-1", "www.a.com")
+
+    assert payee["usage_count"] == 5
+    assert _db_usage_count(db, "ASEGURADORA A") == 5
+
+    manager2.increment_usage("ASEGURADORA A")
+    manager1.update_payee("ASEGURADORA A", "ASEGURADORA B", "111111111-1")
+    assert _db_usage_count(db, "ASEGURADORA B") == 6
+
+
+def test_sqlite_rename_and_delete(tmp_path):
+    """Renombrar y eliminar se reflejan en la base."""
+    db = tmp_path / "catalogos.db"
+    manager = PayeeManager(store=SqlitePayeeStore(db))
+    manager.add_payee("ASEGURADORA A", "111111111-1")
+    manager.update_payee("ASEGURADORA A", "ASEGURADORA B", "222222222-2")
+    manager.delete_payee("ALLIANZ SEGUROS S.A")
+
+    reloaded = PayeeManager(store=SqlitePayeeStore(db))
+    assert reloaded.get_payee_by_name("ASEGURADORA A") is None
+    assert reloaded.get_payee_by_name("ASEGURADORA B")["nit"] == "222222222-2"
+    assert reloaded.get_payee_by_name("ALLIANZ SEGUROS S.A") is None
+
+
+
+def test_rename_onto_existing_name_is_rejected(tmp_path):
+    """Renombrar sobre el nombre de otra aseguradora no la reemplaza."""
+    db = tmp_path / "catalogos.db"
+    manager = PayeeManager(store=SqlitePayeeStore(db))
+    manager.add_payee("ASEGURADORA A", "111111111-1")
+    manager.add_payee("ASEGURADORA B", "222222222-2")
+
+    with pytest.raises(ValueError):
+        manager.update_payee("ASEGURADORA A", "aseguradora b", "111111111-1")
+    # Cambiar solo mayúsculas del propio nombre sigue permitido
+    manager.update_payee("ASEGURADORA A", "Aseguradora A", "333333333-3")
+
+    reloaded = PayeeManager(store=SqlitePayeeStore(db))
+    assert reloaded.get_payee_by_name("ASEGURADORA A")["nit"] == "333333333-3"
+    assert reloaded.get_payee_by_name("ASEGURADORA B")["nit"] == "222222222-2"
+
+
+def test_sqlite_rename_onto_name_created_elsewhere_fails(tmp_path):
+    """Si otro proceso creó el nombre nuevo, la base rechaza el cambio sin borrar nada."""
+    db = tmp_path / "catalogos.db"
+    manager1 = PayeeManager(store=SqlitePayeeStore(db))
+    manager1.add_payee("ASEGURADORA A", "111111111-1")
+    PayeeManager(store=SqlitePayeeStore(db)).add_payee("ASEGURADORA B", "222222222-2")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        manager1.update_payee("ASEGURADORA A", "ASEGURADORA B", "111111111-1")
+
+    assert _db_usage_count(db, "ASEGURADORA A") == 1
+    assert _db_usage_count(db, "ASEGURADORA B") == 1
+
+def test_sqlite_imports_legacy_json(tmp_path):
+    """Una base vacía importa el archivo JSON existente."""
+    legacy = tmp_path / "payees.json"
+    legacy.write_text(json.dumps({"payees": [
+        {"name": "SOLO UNA", "nit": "1", "link_pago": "", "usage_count": 7}
+    ]}), encoding="utf-8")
+
+    manager = PayeeManager(store=SqlitePayeeStore(tmp_path / "catalogos.db", legacy_file=legacy))
+
+    assert manager.get_all_payees() == [
+        {"name": "SOLO UNA", "nit": "1", "link_pago": "", "usage_count": 7}
+    ]
+
+
+def test_sqlite_ramos(tmp_path):
+    """Los ramos se guardan y eliminan en SQLite."""
+    db = tmp_path / "catalogos.db"
+    manager = RamoManager(store=SqliteListStore(db, "ramos"))
+    manager.add_ramo("nuevo ramo")
+    manager.remove_ramo("SOAT")
+
+    reloaded = RamoManager(store=SqliteListStore(db, "ramos"))
+    assert "NUEVO RAMO" in reloaded.get_all()
+    assert "SOAT" not in reloaded.get_all()
+    assert reloaded.get_all() == sorted(manager.ramos)
+
+
+def test_json_stores_write_atomically_once(tmp_path, monkeypatch):
+    """El backend JSON escribe con reemplazo atómico, una vez por cambio."""
+    writes = []
+    real_write = catalog_store.write_text_atomic
+    monkeypatch.setattr(
+        catalog_store, "write_text_atomic",
+        lambda path, text: writes.append(path.name) or real_write(path, text)
+    )
+
+    manager = PayeeManager(store=JsonPayeeStore(tmp_path / "payees.json"))
+    manager.add_payee("ASEGURADORA A", "111111111-1")
+    writes.clear()
+    payee = manager.add_payee("ASEGURADORA A", "111111111-1", "www.a.com")
+    JsonListStore(tmp_path / "ramos.json", "ramos").save_all(["VIDA"])
+
+    assert writes == ["payees.json", "ramos.json"]
+    assert payee["usage_count"] == 2
+    saved = json.loads((tmp_path / "payees.json").read_text(encoding="utf-8"))["payees"]
+    assert [p for p in saved if p["name"] == "ASEGURADORA A"][0]["link_pago"] == "www.a.com"
+    assert not list(tmp_path.glob(".*.tmp"))
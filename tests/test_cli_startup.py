@@ -0,0 +1,54 @@
+"""
+Tests de los imports de arranque del CLI (``python -X importtime``).
+
+Los comandos informativos no deben cargar reportlab, pydantic ni los
+catálogos; si alguien vuelve a importarlos a nivel de módulo, estos tests
+lo detectan. No se mide el tiempo: depende de la máquina y de la caché de
+disco.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+CLI = Path(__file__).parent.parent / "cli.py"
+
+# Módulos que solo deben cargarse al generar cartas
+HEAVY_MODULES = ("reportlab", "pydantic", "models", "generators", "utils.payee_manager")
+
+
+def _importtime(cwd, *args):
+    """
+    Ejecuta Python con -X importtime.
+
+    Returns:
+        set: Módulos importados
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():  # Omite el encabezado
+            modules.add(name.strip())
+    return modules
+
+
+@pytest.mark.parametrize("args", [("--help",), ("--version",), ("--stats",)])
+def test_informational_commands_skip_heavy_imports(tmp_path, args):
+    """--help, --version y --stats no importan reportlab, pydantic ni los modelos."""
+    modules = _importtime(tmp_path, str(CLI), *args)
+
+    heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES or m in HEAVY_MODULES)
+    assert heavy == []
+
@@ -0,0 +1,174 @@
+"""
+Tests de la cola persistente de lotes y de la reanudación (--resume).
+"""
+import json
+
+import pytest
+
+import cli
+from generators.parallel import ParallelRenderer
+from utils.job_queue import JobQueue
+
+
+class _RenderCounter(ParallelRenderer):
+    """Renderizador en proceso que cuenta las cartas y puede "morir" a mitad del lote."""
+
+    def __init__(self, output_dir, fail_after=None):
+        super().__init__(output_dir, workers=1)
+        self.rendered = []
+        self.fail_after = fail_after
+
+    def render(self, jobs):
+        for result in super().render(jobs):
+            if self.fail_after is not None and len(self.rendered) == self.fail_after:
+                raise KeyboardInterrupt
+            self.rendered.append(result.key)
+            yield result
+
+
+@pytest.fixture
+def lote(tmp_path, monkeypatch, registro_valido):
+    """Lote JSONL de 7 cartas (la 4 inválida) con bloques de 2 registros."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli, "BATCH_BLOCK_SIZE", 2)
+    registros = [registro_valido(f"{300 + n} - 2026") for n in range(7)]
+    del registros[3]["asegurado"]
+    path = tmp_path / "lote.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in registros), encoding="utf-8")
+    return path
+
+
+def test_resume_only_redoes_unfinished(tmp_path, lote):
+    """Tras una interrupción, --resume genera solo las cartas que faltan."""
+    interrupted = _RenderCounter(tmp_path / "cartas", fail_after=4)
+    with pytest.raises(KeyboardInterrupt):
+        cli.run_batch(lote, interrupted)
+
+    queue = JobQueue.open(cli.config.JOB_QUEUE_DB)
+    (run,) = queue.runs()
+    run_id = run["run_id"]
+    assert queue.summary(run_id)["generados"] == 4
+
+    resumed = _RenderCounter(tmp_path / "cartas")
+    summary = cli.run_batch(None, resumed, run_id=run_id)
+
+    assert resumed.rendered == ["305 - 2026|900123456-6", "306 - 2026|900123456-6"]
+    assert summary["total"] == 7
+    assert summary["generados"] == 6
+    assert summary["pendientes"] == 0
+    assert summary["reintentables"] == 0
+    assert [record for record, _ in summary["fallidos"]] == [4]
+    assert len(list((tmp_path / "cartas").glob("*.pdf"))) == 6
+
+
+def test_resume_interrupted_while_enqueuing(tmp_path, lote, monkeypatch):
+    """Si el lote muere mientras se encola, se continúa desde el último bloque guardado."""
+    original = JobQueue.add_block
+    calls = []
+
+    def add_block_then_die(self, *args):
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        calls.append(args)
+        return original(self, *args)
+
+    monkeypatch.setattr(JobQueue, "add_block", add_block_then_die)
+    with pytest.raises(KeyboardInterrupt):
+        cli.run_batch(lote, _RenderCounter(tmp_path / "cartas"))
+    monkeypatch.setattr(JobQueue, "add_block", original)
+
+    queue = JobQueue.open(cli.config.JOB_QUEUE_DB)
+    (run,) = queue.runs()
+    run_id = run["run_id"]
+    assert queue.last_record(run_id) == 4
+
+    summary = cli.run_batch(None, _RenderCounter(tmp_path / "cartas"), run_id=run_id)
+
+    assert summary["total"] == 7
+    assert summary["generados"] == 6
+
+
+def test_duplicate_letters_are_enqueued_once(tmp_path, monkeypatch, registro_valido):
+    """La misma carta (número + NIT) dos veces en un lote genera un solo trabajo."""
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "lote.jsonl"
+    path.write_text("\n".join(json.dumps(registro_valido("400 - 2026")) for _ in range(2)), encoding="utf-8")
+
+    renderer = _RenderCounter(tmp_path / "cartas")
+    summary = cli.run_batch(path, renderer)
+
+    assert renderer.rendered == ["400 - 2026|900123456-6"]
+    assert summary["generados"] == 1
+    assert summary["fallidos"] == [(2, "Carta repetida en el lote: 400 - 2026")]
+
+
+def test_unreadable_batch_creates_no_run(tmp_path, monkeypatch):
+    """Un lote inexistente o con formato no soportado no deja ejecuciones huérfanas."""
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        cli.run_batch(tmp_path / "no_existe.jsonl", _RenderCounter(tmp_path / "cartas"))
+    (tmp_path / "lote.xlsx").write_text("", encoding="utf-8")
+    with pytest.raises(ValueError):
+        cli.run_batch(tmp_path / "lote.xlsx", _RenderCounter(tmp_path / "cartas"))
+
+    assert JobQueue.open(cli.config.JOB_QUEUE_DB).runs() == []
+
+
+def test_resume_unknown_run(tmp_path, monkeypatch):
+    """Retomar una ejecución inexistente es un error."""
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError):
+        cli.run_batch(None, _RenderCounter(tmp_path / "cartas"), run_id="no-existe")
+
+
+def test_rerun_regenerates_only_changed_letters(tmp_path, monkeypatch, registro_valido):
+    """Un lote repetido solo regenera las cartas cuyos datos cambiaron o cuyo PDF falta."""
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "lote.jsonl"
+    registros = [registro_valido(f"{500 + n} - 2026") for n in range(3)]
+    path.write_text("\n".join(json.dumps(r) for r in registros), encoding="utf-8")
+    cli.run_batch(path, _RenderCounter(tmp_path / "cartas"))
+
+    registros[1]["montos"]["prima"] = "999999.00"
+    path.write_text("\n".join(json.dumps(r) for r in registros), encoding="utf-8")
+    (tmp_path / "cartas" / "CARTA_502-2026_9001234566.pdf").unlink()
+
+    renderer = _RenderCounter(tmp_path / "cartas")
+    summary = cli.run_batch(path, renderer)
+
+    assert renderer.rendered == ["501 - 2026|900123456-6", "502 - 2026|900123456-6"]
+    assert summary["generados"] == 2
+    assert summary["omitidos"] == 1
+
+    forced = _RenderCounter(tmp_path / "cartas")
+    summary = cli.run_batch(path, forced, force=True)
+    assert len(forced.rendered) == 3
+    assert summary["omitidos"] == 0
+
+
+def test_rerun_keeps_auto_assigned_numbers(tmp_path, monkeypatch, registro_valido):
+    """Un registro sin numero_carta que no cambió conserva su número y no se regenera."""
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "lote.jsonl"
+    registros = [registro_valido(nit=nit) for nit in ("900123456-6", "800197268-4")]
+    for registro in registros:
+        del registro["numero_carta"]
+    path.write_text("\n".join(json.dumps(r) for r in registros), encoding="utf-8")
+    cli.run_batch(path, _RenderCounter(tmp_path / "cartas"))
+    first = sorted(p.name for p in (tmp_path / "cartas").glob("*.pdf"))
+
+    renderer = _RenderCounter(tmp_path / "cartas")
+    summary = cli.run_batch(path, renderer)
+
+    assert renderer.rendered == []
+    assert summary["omitidos"] == 2
+    assert sorted(p.name for p in (tmp_path / "cartas").glob("*.pdf")) == first
+
+    registros[1]["mes_cobro"] = "Febrero"
+    path.write_text("\n".join(json.dumps(r) for r in registros), encoding="utf-8")
+    renderer = _RenderCounter(tmp_path / "cartas")
+    summary = cli.run_batch(path, renderer)
+
+    assert len(renderer.rendered) == 1
+    assert summary["omitidos"] == 1
+    assert len(list((tmp_path / "cartas").glob("*.pdf"))) == 3
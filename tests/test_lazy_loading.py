@@ -0,0 +1,51 @@
+"""
+Tests de la carga diferida de catálogos, consecutivos y log.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+from utils.payee_manager import PayeeManager
+from utils.ramo_manager import RamoManager
+from utils.versioning import VersionManager
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_import_does_not_touch_disk(tmp_path):
+    """Importar los gestores no lee ni crea archivos en logs/."""
+    code = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "import utils.logger, utils.payee_manager, utils.ramo_manager\n"
+        "import utils.descripcion_manager, utils.versioning\n"
+    ) % str(ROOT)
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, check=True, timeout=60)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_managers_load_on_first_access(tmp_path):
+    """El almacenamiento se abre al primer uso o al llamar initialize()."""
+    payees_file = tmp_path / "payees.json"
+    manager = PayeeManager(payees_file)
+    assert not payees_file.exists()
+
+    assert manager.get_payee_by_name("HDI SEGUROS") is not None
+    assert payees_file.exists()
+
+    ramos_file = tmp_path / "ramos.json"
+    ramos = RamoManager(ramos_file)
+    assert ramos.initialize() is ramos
+    assert ramos_file.exists()
+
+
+def test_version_manager_lazy(tmp_path):
+    """El gestor de consecutivos no crea su carpeta hasta asignar un número."""
+    storage_file = tmp_path / "logs" / "consecutivos.json"
+    manager = VersionManager(storage_file)
+
+    assert manager.get_current_consecutivo(2026) == 0
+    assert not storage_file.parent.exists()
+
+    assert manager.get_next_numero_carta(2026) == "1 - 2026"
+    assert storage_file.exists()
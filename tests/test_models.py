@@ -6,7 +6,7 @@ from decimal import Decimal
 from datetime import date
 
 from models.asegurado import Asegurado
-from models.poliza import Poliza
+from models.poliza import Poliza, PolizaCobro
 from models.documento import Documento, MontosCobro
 
 
@@ -57,4 +57,107 @@ def test_montos_cobro_format():
     assert raw['total'] == "1.372.412,00"
 
 
+def _documento_multipoliza(**extra):
+    """Carta con dos pólizas y sin póliza ni montos explícitos."""
+    return Documento.model_validate({
+        "numero_carta": "15434 - 2026",
+        "mes_cobro": "Enero",
+        "fecha_emision": "21/01/2026",
+        "fecha_limite_pago": "2026-02-21",
+        "asegurado": {
+            "razon_social": "CLIENTE",
+            "nit": "900123456-6",
+            "direccion": "CR 1 1 1",
+            "telefono": "6067676",
+            "ciudad": "Medellín"
+        },
+        "polizas": [
+            {
+                "numero": "VG-1", "tipo": "VIDA GRUPO", "plan": "Plan A",
+                "vigencia_inicio": "21/01/2026", "vigencia_fin": "21/01/2027",
+                "prima": "0.10", "otros": "5", "iva": "0.20"
+            },
+            {
+                "numero": "AP-2", "tipo": "ACCIDENTES PERSONALES",
+                "prima": "1000000.05", "otros": "99", "iva": "190000.01",
+                "check_otros": False
+            }
+        ],
+        "firmante_nombre": "Firmante",
+        "firmante_cargo": "Ejecutivo",
+        **extra
+    })
+
+
+def test_documento_multipoliza_derives_poliza_and_montos():
+    """Póliza principal y totales (en Decimal) se derivan de las pólizas."""
+    documento = _documento_multipoliza()
+
+    assert documento.fecha_emision == date(2026, 1, 21)
+    assert documento.poliza.numero == "VG-1"
+    assert documento.poliza.plan_poliza == "Plan A"
+    assert documento.poliza.vigencia_fin == date(2027, 1, 21)
+    # Otros rubros de la segunda póliza no se cobran
+    assert documento.montos.prima == Decimal("1000000.15")
+    assert documento.montos.otros_rubros == Decimal("5")
+    assert documento.montos.impuesto == Decimal("190000.21")
+    assert documento.montos.total == Decimal("1190005.36")
+    assert documento.campos_activos == {'prima': True, 'impuesto': True, 'otros_rubros': True}
+
+    pdf_data = documento.to_pdf_data()
+    assert pdf_data["amounts_raw"]["total"] == "1.190.005,36"
+    assert [p["numero"] for p in pdf_data["polizas"]] == ["VG-1", "AP-2"]
+    assert pdf_data["polizas"][1]["otros"] == 0
+    assert pdf_data["polizas"][1]["check_otros"] is False
+
+
+def test_documento_multipoliza_explicit_values_win():
+    """Montos y columnas explícitos no se recalculan."""
+    documento = _documento_multipoliza(
+        montos={"prima": "1.00"},
+        campos_activos={"prima": True, "impuesto": False, "otros_rubros": False}
+    )
+
+    assert documento.montos.total == Decimal("1.00")
+    assert documento.to_pdf_data()["campos_activos"]["impuesto"] is False
+
+
+def test_documento_requires_poliza_or_polizas():
+    """Sin póliza ni pólizas el documento es inválido."""
+    with pytest.raises(ValueError):
+        _documento_multipoliza(polizas=[])
+    # La póliza principal necesita vigencia
+    with pytest.raises(ValueError):
+        _documento_multipoliza(polizas=[{"numero": "X", "prima": "1"}])
+
+
+def test_documento_single_poliza_pdf_data_unchanged():
+    """Sin pólizas múltiples no se agregan claves nuevas a los datos del PDF."""
+    pdf_data = Documento.model_validate(Documento.model_config["json_schema_extra"]["example"]).to_pdf_data()
+
+    assert "polizas" not in pdf_data
+    assert "campos_activos" not in pdf_data
+
+
+def test_poliza_cobro_unchecked_amounts():
+    """Los montos con la casilla desactivada no suman al total."""
+    poliza = PolizaCobro(numero="1", prima="10", iva="2", otros="3", check_iva=False)
+
+    assert poliza.total == Decimal("13")
+    assert poliza.model_dump_for_pdf()["iva"] == 0
+
+
+def test_poliza_cobro_amounts_stay_decimal(tmp_path):
+    """Los montos por póliza llegan al PDF en Decimal y se suman sin desviación."""
+    from generators.carta_cobro_generator import CartaCobroGenerator
+
+    poliza = PolizaCobro(numero="1", prima="98765432109876.54", iva="1.00", otros="0.01")
+    fila = poliza.model_dump_for_pdf()
+    assert fila["prima"] == Decimal("98765432109876.54")
+
+    data = {'amounts_raw': {}, 'polizas': [fila]}
+    table = CartaCobroGenerator(output_dir=tmp_path)._build_billing_table(data)
+    assert table._cellvalues[1][-1] == "$98,765,432,109,877.55"
+
+
 # TODO: Agregar más tests
@@ -234,3 +234,34 @@ def test_update_payee_preserves_usage_count(temp_storage):
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+def test_usage_order_follows_increments(temp_storage):
+    """La lista por uso se actualiza tras incrementar el uso de una aseguradora."""
+    manager = PayeeManager(storage_file=temp_storage)
+    manager.add_payee("ASEGURADORA A", "111111111-1")
+    manager.add_payee("ASEGURADORA B", "222222222-2")
+    assert manager.get_all_payees()[0]['name'] == "ASEGURADORA A"
+    
+    manager.increment_usage("  aseguradora b ")
+    manager.increment_usage("ASEGURADORA B")
+    
+    assert manager.get_all_payees()[0]['name'] == "ASEGURADORA B"
+
+
+def test_lookup_by_nit_and_after_rename(temp_storage):
+    """Búsqueda por NIT (compartido entre aseguradoras) y por nombre tras renombrar."""
+    manager = PayeeManager(storage_file=temp_storage)
+    manager.add_payee("ASEGURADORA A", "111111111-1")
+    manager.add_payee("ASEGURADORA B", "111111111-1")
+    
+    assert [p['name'] for p in manager.get_payees_by_nit("111111111-1")] == [
+        "ASEGURADORA A", "ASEGURADORA B"
+    ]
+    
+    manager.update_payee("ASEGURADORA B", "ASEGURADORA C", "333333333-3")
+    
+    assert manager.get_payee_by_name("ASEGURADORA B") is None
+    assert manager.get_payee_by_name("aseguradora c")['nit'] == "333333333-3"
+    assert [p['name'] for p in manager.get_payees_by_nit("111111111-1")] == ["ASEGURADORA A"]
+    assert manager.get_payees_by_nit("999999999-9") == []
@@ -0,0 +1,87 @@
+"""
+Tests de la medición de tiempos por etapa.
+"""
+import json
+
+from utils.profiling import StageProfiler
+
+
+def test_disabled_profiler_records_nothing():
+    """Desactivado, los contextos son nulos y no se acumula nada."""
+    profiler = StageProfiler(enabled=False)
+
+    with profiler.letter("1 - 2026"):
+        with profiler.stage("story"):
+            pass
+
+    assert profiler.letter("2 - 2026") is profiler.stage("pdf")
+    assert profiler.summary() == {}
+    assert len(profiler.records) == 0
+
+
+def test_letter_records_and_totals():
+    """Cada carta produce un registro; las etapas se suman por nombre."""
+    profiler = StageProfiler(enabled=True)
+
+    for numero in ("1 - 2026", "2 - 2026"):
+        with profiler.letter(numero):
+            with profiler.stage("cache"):
+                pass
+            with profiler.stage("pdf"):
+                pass
+            with profiler.stage("cache"):
+                pass
+    with profiler.stage("documento"):  # Fuera de una carta
+        pass
+
+    assert [r["documento"] for r in profiler.records] == ["1 - 2026", "2 - 2026"]
+    assert set(profiler.records[0]["etapas"]) == {"cache", "pdf", "total"}
+
+    summary = profiler.summary()
+    assert summary["cache"]["count"] == 2  # Una vez por carta
+    assert summary["total"]["count"] == 2
+    assert summary["documento"]["count"] == 1
+    assert "cartas" in profiler.format_summary()
+
+
+def test_merge_and_export(tmp_path):
+    """Los registros de trabajadores se agregan y se exportan."""
+    worker = StageProfiler(enabled=True)
+    with worker.letter("7 - 2026"):
+        with worker.stage("pdf"):
+            pass
+    profiler = StageProfiler(enabled=True)
+    profiler.merge(worker.drain())
+
+    assert len(worker.records) == 0
+    assert profiler.summary()["pdf"]["count"] == 1
+
+    profiler.export(tmp_path / "tiempos.jsonl")
+    lines = (tmp_path / "tiempos.jsonl").read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[0])["documento"] == "7 - 2026"
+
+    profiler.export(tmp_path / "tiempos.prom")
+    prom = (tmp_path / "tiempos.prom").read_text(encoding="utf-8")
+    assert "# TYPE carta_cobro_stage_seconds_total counter" in prom
+    assert 'carta_cobro_stage_count_total{stage="pdf"} 1' in prom
+
+
+def test_generate_reports_stages(tmp_path, monkeypatch, registro_valido):
+    """generate() mide validación, diseño, PDF y auditoría."""
+    monkeypatch.chdir(tmp_path)
+    from generators.carta_data import build_documento
+    from generators.carta_cobro_generator import CartaCobroGenerator
+    from utils.profiling import profiler
+
+    monkeypatch.setattr(profiler, "enabled", True)
+    profiler.reset()
+    try:
+        generator = CartaCobroGenerator(output_dir=tmp_path / "cartas", use_cache=False)
+        generator.audit_sink = lambda entry: None
+        generator.generate(build_documento(registro_valido("800 - 2026")).to_pdf_data(), "carta")
+
+        record = profiler.records[-1]
+        assert record["documento"] == "800 - 2026"
+        assert {"validacion", "story", "pdf", "auditoria", "total"} <= set(record["etapas"])
+    finally:
+        profiler.reset()
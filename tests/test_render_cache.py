@@ -0,0 +1,86 @@
+"""
+Tests para la caché de PDFs generados.
+"""
+import os
+
+import pytest
+
+from generators.render_cache import RenderCache, payload_hash
+
+
+@pytest.fixture
+def pdf_data(tmp_path, monkeypatch, registro_valido):
+    monkeypatch.chdir(tmp_path)
+    from generators.carta_data import build_documento
+
+    return build_documento(registro_valido("500 - 2026")).to_pdf_data()
+
+
+def test_payload_hash_is_canonical():
+    """El orden de las claves no cambia el hash; los valores sí."""
+    assert payload_hash({"a": 1, "b": [1, 2]}) == payload_hash({"b": [1, 2], "a": 1})
+    assert payload_hash({"a": 1}) != payload_hash({"a": 2})
+
+
+def test_identical_letter_is_copied_from_cache(tmp_path, pdf_data, monkeypatch):
+    """Una carta sin cambios se copia sin volver a diseñarla."""
+    from generators.carta_cobro_generator import CartaCobroGenerator
+
+    generator = CartaCobroGenerator(output_dir=tmp_path / "cartas", use_cache=True)
+    generator.render_cache = RenderCache(tmp_path / "cache")
+    first = generator.generate(pdf_data, "primera")
+
+    monkeypatch.setattr(generator, "_build_story", lambda data: pytest.fail("no debía renderizar"))
+    second = generator.generate(dict(pdf_data), "segunda")
+
+    assert second.read_bytes() == first.read_bytes()
+
+
+def test_changed_letter_or_disabled_cache_renders(tmp_path, pdf_data):
+    """Datos distintos o use_cache=False generan el PDF de nuevo."""
+    from generators.carta_cobro_generator import CartaCobroGenerator
+
+    cache = RenderCache(tmp_path / "cache")
+    generator = CartaCobroGenerator(output_dir=tmp_path / "cartas", use_cache=True)
+    generator.render_cache = cache
+    generator.generate(pdf_data, "original")
+    generator.generate({**pdf_data, "cliente_razon_social": "Otro Cliente"}, "cambiada")
+
+    assert len(list(cache.cache_dir.glob("*.pdf"))) == 2
+    assert CartaCobroGenerator(output_dir=tmp_path / "cartas", use_cache=False).render_cache is None
+
+
+def test_lru_eviction_by_total_bytes(tmp_path):
+    """Al superar el límite se eliminan las entradas usadas hace más tiempo."""
+    cache = RenderCache(tmp_path / "cache", max_bytes=250)
+    for idx, key in enumerate(["a", "b", "c"]):
+        cache.store(key, b"x" * 100)
+        os.utime(cache.cache_dir / f"{key}.pdf", (1000 + idx, 1000 + idx))
+        if key == "b":
+            # Usar "a" después de guardar "b": "b" queda como la menos reciente
+            assert cache.load("a") == b"x" * 100
+            os.utime(cache.cache_dir / "a.pdf", (2000, 2000))
+
+    assert sorted(p.stem for p in cache.cache_dir.glob("*.pdf")) == ["a", "c"]
+
+
+def test_overwriting_an_entry_counts_its_size_once(tmp_path):
+    """Reemplazar una entrada solo suma la diferencia de tamaño."""
+    cache = RenderCache(tmp_path / "cache", max_bytes=10_000)
+    cache.store("a", b"x" * 100)
+    cache.store("a", b"x" * 100)
+    cache.store("a", b"x" * 60)
+
+    assert cache._total_bytes == 60
+
+
+def test_entries_written_by_another_process_count_toward_limit(tmp_path):
+    """Lo que otra instancia escribió en el directorio también se desaloja."""
+    cache = RenderCache(tmp_path / "cache", max_bytes=1000)
+    cache.store("propia", b"x" * 50)
+
+    RenderCache(tmp_path / "cache", max_bytes=1000).store("ajena", b"x" * 900)
+    os.utime(cache.cache_dir / "ajena.pdf", (1000, 1000))
+    cache.store("nueva", b"x" * 150)
+
+    assert sorted(p.stem for p in cache.cache_dir.glob("*.pdf")) == ["nueva", "propia"]
@@ -0,0 +1,186 @@
+"""
+Tests del servicio HTTP de cartas.
+"""
+import asyncio
+import json
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+
+from server import CartaService
+
+
+def _request(port, method, path, payload=None):
+    """Petición HTTP bloqueante: (estado, encabezados, cuerpo)."""
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def _raw_request(port, data):
+    """Envía bytes tal cual y retorna la respuesta completa."""
+    with socket.create_connection(("127.0.0.1", port), timeout=30) as sock:
+        sock.sendall(data)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+
+@pytest.fixture
+def run_service(tmp_path, monkeypatch):
+    """Ejecuta un escenario contra el servicio en un puerto libre."""
+    monkeypatch.chdir(tmp_path)
+
+    def run(scenario):
+        async def main():
+            service = CartaService(workers=1, use_cache=False)
+            server = await service.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+
+            async def call(*args):
+                return await asyncio.to_thread(_request, port, *args)
+            call.port = port
+
+            try:
+                return await scenario(call)
+            finally:
+                await service.close()
+
+        return asyncio.run(main())
+
+    return run
+
+
+def test_post_carta_returns_pdf(run_service, registro_valido):
+    """Una carta válida se responde con el PDF."""
+    async def scenario(call):
+        return await call("POST", "/cartas", registro_valido("900 - 2026"))
+
+    status, headers, body = run_service(scenario)
+
+    assert status == 200
+    assert headers["Content-Type"] == "application/pdf"
+    assert headers["X-Numero-Carta"] == "900 - 2026"
+    assert "CARTA_900-2026_9001234566.pdf" in headers["Content-Disposition"]
+    assert body.startswith(b"%PDF")
+
+
+def test_post_carta_async_job(run_service, registro_valido):
+    """Con ?async=1 se responde un id de trabajo y luego el PDF."""
+    async def scenario(call):
+        status, _, body = await call("POST", "/cartas?async=1", registro_valido("901 - 2026"))
+        assert status == 202
+        job = json.loads(body)
+        for _ in range(200):
+            status, headers, body = await call("GET", job["url"])
+            if status != 202:
+                return status, headers, body
+            await asyncio.sleep(0.05)
+        raise AssertionError("el trabajo no terminó")
+
+    status, headers, body = run_service(scenario)
+
+    assert status == 200
+    assert body.startswith(b"%PDF")
+
+
+def test_invalid_requests(run_service, registro_valido):
+    """Errores de validación, JSON, rutas y métodos."""
+    registro = registro_valido("902 - 2026")
+    del registro["asegurado"]
+
+    async def scenario(call):
+        return [
+            await call("POST", "/cartas", registro),
+            await call("POST", "/cartas", [registro]),
+            await call("GET", "/cartas"),
+            await call("GET", "/cartas/no-existe"),
+            await call("GET", "/health"),
+        ]
+
+    invalid, not_object, wrong_method, missing_job, health = run_service(scenario)
+
+    assert invalid[0] == 422
+    assert json.loads(invalid[2])["errores"][0]["campo"] == "asegurado"
+    assert not_object[0] == 400
+    assert wrong_method[0] == 405
+    assert missing_job[0] == 404
+    assert json.loads(health[2]) == {"estado": "ok", "procesos": 1, "trabajos_pendientes": 0}
+
+
+def test_nit_with_header_characters_is_rejected(run_service, registro_valido):
+    """Un NIT con CRLF o fuera de latin-1 se rechaza con 422 y no llega a los encabezados."""
+    async def scenario(call):
+        return [
+            await call("POST", "/cartas", registro_valido("903 - 2026", nit="9\r\nX-Injected: yes")),
+            await call("POST", "/cartas", registro_valido("904 - 2026", nit="900€1")),
+        ]
+
+    for status, headers, body in run_service(scenario):
+        assert status == 422
+        assert "X-Injected" not in headers
+        assert json.loads(body)["errores"][0]["campo"] == "asegurado.nit"
+
+
+def test_pdf_filename_is_sanitized():
+    """El nombre del archivo en Content-Disposition solo lleva caracteres seguros."""
+    from server import _pdf_response
+
+    _, headers, _ = _pdf_response(b"%PDF", 'CARTA_1-2026_9"; x=y\r\n.pdf', "1 - 2026\r\nX: y")
+
+    assert headers["Content-Disposition"] == 'attachment; filename="CARTA_1-2026_9___x_y__.pdf"'
+    assert headers["X-Numero-Carta"] == "1 - 2026__X: y"
+
+
+def test_bad_content_length(run_service, monkeypatch):
+    """Un Content-Length negativo responde 400 y uno excesivo 413."""
+    from utils.config import config
+
+    monkeypatch.setattr(config, "SERVER_MAX_BODY_BYTES", 1024)
+
+    async def scenario(call):
+        return [
+            await asyncio.to_thread(_raw_request, call.port, request)
+            for request in (
+                b"POST /cartas HTTP/1.1\r\nContent-Length: -5\r\n\r\n",
+                b"POST /cartas HTTP/1.1\r\nContent-Length: 2048\r\n\r\n",
+            )
+        ]
+
+    negative, too_large = run_service(scenario)
+
+    assert negative.startswith(b"HTTP/1.1 400 ")
+    assert too_large.startswith(b"HTTP/1.1 413 ")
+
+
+def test_invalid_letter_does_not_use_a_consecutivo(run_service, registro_valido):
+    """Un 422 no consume número de carta: la siguiente carta válida recibe el primero."""
+    from datetime import datetime
+    from utils.versioning import version_manager
+
+    sin_numero = registro_valido("")
+    invalida = dict(sin_numero, mes_cobro="Smarch")
+
+    async def scenario(call):
+        return [
+            await call("POST", "/cartas", invalida),
+            await call("POST", "/cartas", invalida),
+            await call("POST", "/cartas", sin_numero),
+        ]
+
+    first, retry, valid = run_service(scenario)
+    year = datetime.now().year
+
+    assert first[0] == retry[0] == 422
+    assert valid[0] == 200
+    assert valid[1]["X-Numero-Carta"] == f"1 - {year}"
+    assert version_manager.get_current_consecutivo(year) == 1
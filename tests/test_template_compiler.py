@@ -0,0 +1,98 @@
+"""
+Tests para el compilador de plantillas de carta.
+"""
+import json
+
+import pytest
+from reportlab.platypus import Paragraph
+
+from generators.carta_cobro_generator import get_carta_styles
+from generators.template_compiler import compile_template
+
+
+TEMPLATE = {
+    "template_id": "otra_aseguradora",
+    "version": "1.0",
+    "static_fields": [{"id": "sender_email", "value": "cobros@otra.com"}],
+    "sections": [
+        {"type": "paragraph", "text": "<b>Señores</b>"},
+        {"type": "paragraph", "text": "{cliente_razon_social} - NIT {cliente_nit}"},
+        {"type": "spacer", "height_cm": 0.5},
+        {"type": "block", "name": "billing_table"},
+        {"type": "paragraph", "style": "CenteredSmall", "text": "E-mail: {sender_email}"},
+        {"type": "paragraph", "text": "{firmante_cargo} {firmante_iniciales}", "strip": True}
+    ]
+}
+
+
+def _texts(story):
+    return [f.text for f in story if isinstance(f, Paragraph)]
+
+
+def test_static_sections_are_prebuilt():
+    """Los párrafos sin variables se construyen una vez y se copian por carta."""
+    plan = compile_template(TEMPLATE, get_carta_styles())
+    blocks = {"billing_table": lambda data: []}
+
+    first = plan.build_story({"cliente_razon_social": "A", "cliente_nit": "1"}, blocks)
+    second = plan.build_story({"cliente_razon_social": "B", "cliente_nit": "2"}, blocks)
+
+    assert first[0] is not second[0]
+    assert first[0].frags is second[0].frags  # Marcado analizado una sola vez
+    assert _texts(second)[1] == "B - NIT 2"
+
+
+def test_static_fields_and_missing_values():
+    """Los campos estáticos son valores por defecto; faltantes o None quedan vacíos."""
+    plan = compile_template(TEMPLATE, get_carta_styles())
+
+    story = plan.build_story(
+        {"firmante_cargo": "Ejecutivo", "firmante_iniciales": None},
+        {"billing_table": lambda data: []}
+    )
+
+    assert _texts(story)[1:] == ["- NIT", "E-mail: cobros@otra.com", "Ejecutivo"]
+
+
+def test_invalid_templates_are_rejected():
+    """Secciones, estilos o bloques desconocidos producen ValueError."""
+    styles = get_carta_styles()
+    with pytest.raises(ValueError):
+        compile_template({"sections": [{"type": "imagen"}]}, styles)
+    with pytest.raises(ValueError):
+        compile_template({"sections": [{"type": "paragraph", "style": "NoExiste", "text": "x"}]}, styles)
+
+    plan = compile_template({"sections": [{"type": "block", "name": "no_existe"}]}, styles)
+    with pytest.raises(ValueError):
+        plan.build_story({}, {})
+
+
+def test_generator_uses_another_template(tmp_path, monkeypatch, registro_valido):
+    """Una plantilla nueva genera cartas sin código adicional."""
+    monkeypatch.chdir(tmp_path)
+    from generators.carta_data import build_documento
+    from generators.carta_cobro_generator import CartaCobroGenerator
+
+    template_file = tmp_path / "otra_aseguradora.json"
+    template_file.write_text(json.dumps(TEMPLATE), encoding="utf-8")
+    generator = CartaCobroGenerator(output_dir=tmp_path / "cartas", use_cache=False, template_path=template_file)
+    data = build_documento(registro_valido("600 - 2026")).to_pdf_data()
+
+    assert generator.plan.template_id == "otra_aseguradora"
+    assert "CLIENTE DE PRUEBA - NIT 900123456-6" in _texts(generator._build_story(data))[1].upper()
+    assert generator.generate(data, "otra").exists()
+
+
+def test_payment_link_parsed_once_per_link():
+    """El párrafo del link de pago se analiza una vez por link."""
+    from generators.carta_cobro_generator import CartaCobroGenerator
+
+    generator = CartaCobroGenerator(use_cache=False)
+    first = generator._build_payment_link({'payee_link_pago': 'www.hdi.com.co'})[0]
+    second = generator._build_payment_link({'payee_link_pago': 'www.hdi.com.co'})[0]
+    other = generator._build_payment_link({'payee_link_pago': 'https://pagos.sura.com'})[0]
+
+    assert first is not second
+    assert first.frags is second.frags
+    assert 'href="https://www.hdi.com.co"' in first.text
+    assert other.frags is not first.frags
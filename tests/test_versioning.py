@@ -0,0 +1,67 @@
+"""
+Tests para el gestor de consecutivos.
+"""
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from utils.versioning import VersionManager
+
+
+def _allocate_many(storage_file: str, count: int) -> list:
+    """Asigna ``count`` números desde un proceso independiente."""
+    manager = VersionManager(Path(storage_file))
+    return [manager.get_next_numero_carta(2026) for _ in range(count)]
+
+
+def test_no_duplicates_across_processes(tmp_path):
+    """Varios procesos nunca reciben el mismo número de carta."""
+    storage_file = tmp_path / "consecutivos.json"
+
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(_allocate_many, str(storage_file), 20) for _ in range(3)]
+        numeros = [numero for future in futures for numero in future.result()]
+
+    assert len(numeros) == 60
+    assert len(set(numeros)) == 60
+    assert VersionManager(storage_file).get_current_consecutivo(2026) == 60
+
+
+def test_reserve_block_hands_out_from_memory(tmp_path):
+    """Un bloque reservado avanza el archivo una sola vez."""
+    storage_file = tmp_path / "consecutivos.json"
+    manager = VersionManager(storage_file)
+
+    block = manager.reserve_block(3, 2026)
+    data = json.loads(storage_file.read_text(encoding="utf-8"))
+
+    assert data["2026"]["last_consecutivo"] == 3
+    assert [block.next_numero_carta() for _ in range(4)] == ["1 - 2026", "2 - 2026", "3 - 2026", None]
+    assert manager.get_next_numero_carta(2026) == "4 - 2026"
+
+
+def test_release_returns_unused_numbers(tmp_path):
+    """Los números sobrantes vuelven solo si nadie reservó después."""
+    manager = VersionManager(tmp_path / "consecutivos.json")
+
+    block = manager.reserve_block(10, 2026)
+    block.next_numero_carta()
+    assert block.release() == 9
+    assert manager.get_current_consecutivo(2026) == 1
+
+    block = manager.reserve_block(10, 2026)
+    manager.get_next_numero_carta(2026)
+    assert block.release() == 0
+    assert manager.get_current_consecutivo(2026) == 12
+
+
+def test_block_allocator_refills(tmp_path):
+    """El asignador reserva un nuevo bloque al agotar el anterior."""
+    manager = VersionManager(tmp_path / "consecutivos.json")
+    allocator = manager.block_allocator(block_size=2)
+
+    numeros = [allocator.next_numero_carta(2026) for _ in range(5)]
+    allocator.close()
+
+    assert numeros == [f"{n} - 2026" for n in range(1, 6)]
+    assert manager.get_current_consecutivo(2026) == 5
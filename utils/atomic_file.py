@@ -0,0 +1,122 @@
+"""
+Escritura atómica de archivos.
+
+Se escribe en un archivo temporal del mismo directorio y al terminar se
+renombra sobre el destino (``os.replace``). Un lector, o una corrida que se
+interrumpe a la mitad, nunca ve un archivo incompleto: ve el anterior o el
+nuevo completo. Si la escritura falla, el temporal se elimina.
+
+El contenido se sincroniza a disco (``fsync``) antes del renombre, para que
+un corte de luz no deje el destino vacío. Si el proceso muere a mitad de una
+escritura el temporal queda en el directorio; ``remove_stale_temp_files`` lo
+limpia (al iniciar un lote o el servicio).
+"""
+import os
+import re
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Tuple, Union
+
+
+# Temporales de atomic_open: .<nombre>.<12 hex>.tmp
+_TEMP_NAME = re.compile(r'^\..+\.[0-9a-f]{12}\.tmp$')
+
+# Segundos tras los cuales un temporal se considera abandonado (una
+# escritura en curso de otro proceso es más reciente)
+STALE_TEMP_AGE = 3600
+
+
+def _create_temp(directory: Path, prefix: str) -> Tuple[int, str]:
+    """
+    Crea un archivo temporal exclusivo en ``directory``.
+
+    A diferencia de ``tempfile.mkstemp`` (permisos 0600) usa el modo 0666:
+    el sistema operativo le aplica la umask del proceso, como a cualquier
+    archivo creado con ``open``.
+
+    Returns:
+        (descriptor, ruta)
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    for _ in range(tempfile.TMP_MAX):
+        tmp_path = str(directory / f"{prefix}{uuid.uuid4().hex[:12]}.tmp")
+        try:
+            return os.open(tmp_path, flags, 0o666), tmp_path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No se pudo crear un archivo temporal en {directory}")
+
+
+@contextmanager
+def atomic_open(path: Union[str, Path], mode: str = 'wb', encoding: str = None):
+    """
+    Abre un archivo temporal que reemplaza a ``path`` al cerrar sin errores.
+
+    Example:
+        >>> with atomic_open(Path('output/carta.pdf')) as f:
+        ...     f.write(pdf_bytes)
+
+    Args:
+        path: Archivo de destino (el directorio se crea si no existe)
+        mode: 'wb' o 'w'
+        encoding: Codificación en modo texto
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = _create_temp(path.parent, f".{path.name}.")
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_bytes_atomic(path: Union[str, Path], data: bytes):
+    """Escribe ``data`` en ``path`` completo o nada."""
+    with atomic_open(path, 'wb') as f:
+        f.write(data)
+
+
+def write_text_atomic(path: Union[str, Path], text: str, encoding: str = 'utf-8'):
+    """Escribe ``text`` en ``path`` completo o nada."""
+    with atomic_open(path, 'w', encoding=encoding) as f:
+        f.write(text)
+
+
+def remove_stale_temp_files(*directories: Union[str, Path], max_age: float = STALE_TEMP_AGE) -> int:
+    """
+    Elimina los temporales abandonados de ``atomic_open``.
+
+    Args:
+        directories: Directorios a revisar (los que no existen se ignoran)
+        max_age: Antigüedad mínima en segundos; los más recientes pueden ser
+            escrituras en curso de otro proceso
+
+    Returns:
+        int: Temporales eliminados
+    """
+    limit = time.time() - max_age
+    removed = 0
+    for directory in directories:
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if not _TEMP_NAME.match(entry.name):
+                continue
+            try:
+                if entry.is_file() and entry.stat().st_mtime < limit:
+                    os.unlink(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
@@ -0,0 +1,272 @@
+"""
+Escritor del log de auditoría (``logs/audit_trail.log``).
+
+Mantiene el archivo abierto y agrupa las entradas en memoria; un hilo de
+fondo las escribe cada ``flush_interval`` segundos (o antes si el búfer se
+llena). Los segmentos se rotan por tamaño y por fecha, opcionalmente
+comprimidos con gzip, y el búfer se vacía siempre al cerrar el proceso.
+Cada escritura actualiza además el índice consultable (``audit_index.db``).
+
+Varios procesos (GUI, CLI, servicio, pool de lotes) escriben el mismo log:
+cada escritura y cada rotación se hacen bajo ``audit_trail.lock``, y antes de
+escribir se comprueba que el archivo abierto siga siendo el de la ruta (otro
+proceso pudo haberlo rotado).
+"""
+import atexit
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+from .audit_index import AuditIndex, index_path_for, mark_dirty
+from .config import config
+from .file_lock import FileLock
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AuditWriter:
+    """
+    Escritor con búfer y rotación del log de auditoría.
+
+    Ante un fallo abrupto del proceso se pierden como máximo las entradas de
+    los últimos ``flush_interval`` segundos; una salida normal las escribe todas.
+    """
+
+    def __init__(
+        self,
+        log_file: Optional[Path] = None,
+        flush_interval: float = 1.0,
+        max_buffer: int = 500,
+        max_bytes: int = 10 * 1024 * 1024,
+        rotate_daily: bool = True,
+        compress: bool = False,
+        index: bool = True
+    ):
+        """
+        Args:
+            log_file: Archivo de auditoría (por defecto logs/audit_trail.log)
+            flush_interval: Segundos máximos que una entrada espera en memoria
+            max_buffer: Entradas en memoria que fuerzan una escritura inmediata
+            max_bytes: Tamaño a partir del cual se rota el segmento (0 = sin límite)
+            rotate_daily: Si True, se inicia un segmento nuevo cada día
+            compress: Si True, los segmentos rotados se comprimen con gzip
+            index: Si True, las entradas se indexan en audit_index.db (junto al log)
+        """
+        self.log_file = log_file or Path('logs/audit_trail.log')
+        self.flush_interval = flush_interval
+        self.max_buffer = max(1, max_buffer)
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+        self.index = index
+
+        self._buffer: List[str] = []
+        self._entries: List[Dict[str, Any]] = []
+        self._buffer_path: Optional[str] = None
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+        self._file_path: Optional[str] = None
+        self._segment_date: Optional[date] = None
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        atexit.register(self.close)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def write(self, entry: Dict[str, Any]):
+        """
+        Agrega una entrada al log de auditoría.
+
+        Args:
+            entry: Diccionario serializable a JSON (una línea por entrada)
+        """
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        # La ruta relativa se resuelve al momento de registrar la entrada
+        path = os.path.abspath(self.log_file)
+
+        with self._lock:
+            if path != self._buffer_path:
+                self._flush_locked()
+                self._buffer_path = path
+            self._buffer.append(line)
+            self._entries.append(entry)
+            buffer_full = len(self._buffer) >= self.max_buffer
+            if self._closed:
+                self._flush_locked()
+                return
+
+        if buffer_full:
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def flush(self):
+        """Escribe en disco las entradas pendientes."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        """Vacía el búfer y cierra el archivo (se llama también al salir)."""
+        with self._lock:
+            self._closed = True
+            self._flush_locked()
+            self._close_file()
+        self._wakeup.set()
+
+    def _flush_locked(self):
+        """Escribe el búfer; requiere ``self._lock``."""
+        if not self._buffer:
+            return
+
+        data = ''.join(self._buffer)
+
+        with FileLock(Path(self._buffer_path).with_suffix('.lock')):
+            self._open_file(self._buffer_path)
+            self._rotate_if_needed(len(data.encode('utf-8')))
+            self._file.write(data)
+            self._file.flush()
+        self._buffer.clear()
+
+        entries, self._entries = self._entries, []
+        if self.index:
+            index_path = index_path_for(self._buffer_path)
+            try:
+                AuditIndex.open(index_path, self._buffer_path).add_entries(entries)
+            except (sqlite3.Error, OSError) as e:
+                # El log es la fuente de verdad: el índice se reconstruye en la próxima consulta
+                mark_dirty(index_path)
+                logger.warning(f"No se pudo actualizar el índice de auditoría (se reconstruirá): {e}")
+
+    def _open_file(self, path: str):
+        """
+        Abre el segmento ``path`` (o cambia de archivo si es otro).
+
+        También reabre si el archivo abierto ya no es el de la ruta (otro
+        proceso lo rotó).
+        """
+        if self._file is not None and path == self._file_path and self._is_current():
+            return
+
+        self._close_file()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._file_path = path
+
+        if os.path.getsize(path) > 0:
+            self._segment_date = date.fromtimestamp(os.path.getmtime(path))
+        else:
+            self._segment_date = date.today()
+
+    def _is_current(self) -> bool:
+        """Si el archivo abierto sigue siendo el que está en ``self._file_path``."""
+        try:
+            on_disk = os.stat(self._file_path)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(self._file.fileno())
+        return (on_disk.st_dev, on_disk.st_ino) == (opened.st_dev, opened.st_ino)
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_path = None
+
+    def _rotate_if_needed(self, incoming_bytes: int):
+        """
+        Rota el segmento si cambió el día o si superaría ``max_bytes``.
+
+        Requiere el candado del log: otros procesos también escriben en él.
+        """
+        # Tamaño real (incluye lo que escribieron otros procesos)
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            self._segment_date = date.today()
+            return
+
+        new_day = self.rotate_daily and self._segment_date != date.today()
+        too_big = self.max_bytes and size + incoming_bytes > self.max_bytes
+        if not (new_day or too_big):
+            return
+
+        path = Path(self._file_path)
+        self._close_file()
+
+        rotated = self._rotated_path(path)
+        os.replace(path, rotated)
+        if self.compress:
+            with open(rotated, 'rb') as src, gzip.open(f"{rotated}.gz", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.unlink(rotated)
+
+        self._open_file(str(path))
+
+    @staticmethod
+    def _rotated_path(path: Path) -> Path:
+        """Nombre del segmento rotado: audit_trail.20250121-153000.log"""
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        candidate = path.with_name(f"{path.stem}.{stamp}{path.suffix}")
+        counter = 1
+        while candidate.exists() or Path(f"{candidate}.gz").exists():
+            candidate = path.with_name(f"{path.stem}.{stamp}-{counter}{path.suffix}")
+            counter += 1
+        return candidate
+
+    def _ensure_thread(self):
+        """Inicia (una sola vez) el hilo que escribe periódicamente."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name='audit-writer',
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except OSError:
+                # Se reintenta en el siguiente ciclo y en close()
+                pass
+
+    def _after_fork(self):
+        """En un proceso hijo no se hereda el búfer, el archivo ni el hilo."""
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._buffer = []
+        self._entries = []
+        self._buffer_path = None
+        self._thread = None
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+        self._file_path = None
+
+
+# Instancia global
+audit_writer = AuditWriter(
+    flush_interval=config.AUDIT_FLUSH_INTERVAL,
+    max_bytes=config.AUDIT_MAX_BYTES,
+    rotate_daily=config.AUDIT_ROTATE_DAILY,
+    compress=config.AUDIT_COMPRESS,
+    index=config.AUDIT_INDEX
+)
@@ -0,0 +1,359 @@
+"""
+Índice consultable del log de auditoría.
+
+Cada vez que el escritor de auditoría vacía su búfer, las mismas entradas se
+insertan en una base SQLite (``logs/audit_index.db``, junto al log) con
+índices por NIT, póliza, número de carta y fecha. Así una consulta como
+"cartas enviadas al NIT 900123456-6 este año" no recorre el log completo.
+
+El log es la fuente de verdad: un índice vacío (recién creado, por ejemplo
+al actualizar con un log ya existente) o marcado como desactualizado
+(``audit_index.db.dirty``, tras un fallo al indexar) se reconstruye desde el
+log en la siguiente escritura o consulta.
+"""
+import gzip
+import json
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+# Columnas indexadas (en el orden en que se guardan)
+INDEX_FIELDS = (
+    'timestamp',
+    'document_type',
+    'document_number',
+    'policy_number',
+    'client_nit',
+    'output_path',
+    'status',
+    'is_draft'
+)
+
+
+def normalize_nit(nit: Any) -> str:
+    """
+    Forma canónica de un NIT para compararlo.
+
+    Quita guiones, puntos y espacios: "900.123.456-6", "900123456-6" y
+    "9001234566" son el mismo NIT.
+    """
+    return ''.join(ch for ch in str(nit) if ch.isalnum()).upper()
+
+
+def _parse_bound(value: str, end: bool = False) -> str:
+    """
+    Convierte una fecha de filtro a texto ISO comparable con ``timestamp``.
+
+    Una fecha sin hora como límite final incluye el día completo.
+    """
+    value = value.strip()
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        return datetime.fromisoformat(value).isoformat()
+
+    if end:
+        day += timedelta(days=1)
+    return datetime.combine(day, datetime.min.time()).isoformat()
+
+
+class AuditIndex:
+    """
+    Índice SQLite (modo WAL) de las entradas de auditoría.
+
+    Una instancia por archivo de base de datos y proceso; usar ``open()``.
+    Si se conoce el log (``log_file``), el índice se reconstruye desde él
+    cuando está vacío o marcado como desactualizado.
+    """
+
+    _instances: Dict[str, 'AuditIndex'] = {}
+    _instances_lock = Lock()
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS audit_entries (
+            id              INTEGER PRIMARY KEY,
+            timestamp       TEXT NOT NULL,
+            document_type   TEXT NOT NULL DEFAULT '',
+            document_number TEXT NOT NULL DEFAULT '',
+            policy_number   TEXT NOT NULL DEFAULT '',
+            client_nit      TEXT NOT NULL DEFAULT '',
+            output_path     TEXT NOT NULL DEFAULT '',
+            status          TEXT NOT NULL DEFAULT '',
+            is_draft        INTEGER NOT NULL DEFAULT 0,
+            client_nit_norm TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS idx_audit_nit_norm ON audit_entries (client_nit_norm, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_audit_policy ON audit_entries (policy_number, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_audit_document ON audit_entries (document_number, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_entries (timestamp);
+    """
+
+    # Columnas agregadas después de la primera versión de la base
+    MIGRATIONS = (
+        ('client_nit_norm', (
+            "ALTER TABLE audit_entries ADD COLUMN client_nit_norm TEXT NOT NULL DEFAULT ''",
+            "UPDATE audit_entries SET client_nit_norm = normalize_nit(client_nit)",
+            "DROP INDEX IF EXISTS idx_audit_nit",
+        )),
+    )
+
+    def __init__(self, db_path: Path, log_file: Optional[Path] = None):
+        self.db_path = Path(db_path)
+        self.log_file = Path(log_file) if log_file is not None else None
+        self.dirty_marker = dirty_marker_for(self.db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = Lock()
+        self.conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.create_function('normalize_nit', 1, normalize_nit)
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'audit_entries'").fetchone():
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(audit_entries)")}
+            for column, statements in self.MIGRATIONS:
+                if column not in columns:
+                    for sql in statements:
+                        self.conn.execute(sql)
+        self.conn.executescript(self.SCHEMA)
+
+    @classmethod
+    def open(cls, db_path: Path, log_file: Optional[Path] = None) -> 'AuditIndex':
+        """
+        Retorna el índice compartido para ``db_path``.
+
+        Args:
+            db_path: Base de datos del índice
+            log_file: Log de auditoría del que se reconstruye si hace falta
+        """
+        key = str(Path(db_path).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(db_path, log_file)
+            index = cls._instances[key]
+            if index.log_file is None and log_file is not None:
+                index.log_file = Path(log_file)
+            return index
+
+    def refresh(self) -> bool:
+        """
+        Reconstruye el índice desde el log si está vacío o desactualizado.
+
+        Returns:
+            bool: True si se reconstruyó
+        """
+        if self.log_file is None:
+            return False
+        if not self.dirty_marker.exists():
+            with self.lock:
+                if self.conn.execute("SELECT 1 FROM audit_entries LIMIT 1").fetchone():
+                    return False
+        self.rebuild(self.log_file)
+        return True
+
+    def _insert(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """Inserta entradas dentro de la transacción en curso (con el lock tomado)."""
+        rows = [
+            (
+                str(entry.get('timestamp', '')),
+                str(entry.get('document_type', '')),
+                str(entry.get('document_number', '')),
+                str(entry.get('policy_number', '')),
+                str(entry.get('client_nit', '')),
+                str(entry.get('output_path', '')),
+                str(entry.get('status', '')),
+                int(bool(entry.get('is_draft', False))),
+                normalize_nit(entry.get('client_nit', ''))
+            )
+            for entry in entries
+        ]
+        columns = INDEX_FIELDS + ('client_nit_norm',)
+        self.conn.executemany(
+            f"INSERT INTO audit_entries ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})",
+            rows
+        )
+        return len(rows)
+
+    def add_entries(self, entries: Iterable[Dict[str, Any]]):
+        """
+        Indexa entradas de auditoría en una sola transacción.
+
+        Si el índice se reconstruye desde el log (ver ``refresh``), las
+        entradas ya vienen en él: se escriben en el log antes de indexarlas.
+
+        Args:
+            entries: Entradas tal como se escriben en audit_trail.log
+        """
+        entries = list(entries)
+        if not entries or self.refresh():
+            return
+
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._insert(entries)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def query(
+        self,
+        nit: Optional[str] = None,
+        policy: Optional[str] = None,
+        document: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca entradas de auditoría.
+
+        Args:
+            nit: NIT del cliente (con o sin guión, ej: 900123456-6)
+            policy: Número de póliza
+            document: Número de carta (ej: "15434 - 2025")
+            since: Fecha/hora ISO inicial (incluida)
+            until: Fecha/hora ISO final (una fecha sin hora incluye todo el día)
+            limit: Máximo de resultados
+
+        Returns:
+            List[Dict]: Entradas ordenadas por fecha
+        """
+        self.refresh()
+
+        conditions = []
+        params: List[Any] = []
+
+        if nit:
+            # El NIT puede haberse registrado con o sin guión: se comparan
+            # las formas normalizadas
+            conditions.append("client_nit_norm = ?")
+            params.append(normalize_nit(nit))
+        if policy:
+            conditions.append("policy_number = ?")
+            params.append(policy.strip())
+        if document:
+            conditions.append("document_number = ?")
+            params.append(document.strip())
+        if since:
+            conditions.append("timestamp >= ?")
+            params.append(_parse_bound(since))
+        if until:
+            conditions.append("timestamp < ?")
+            params.append(_parse_bound(until, end=True))
+
+        sql = f"SELECT {', '.join(INDEX_FIELDS)} FROM audit_entries"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp, id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+
+        results = []
+        for row in rows:
+            entry = dict(zip(INDEX_FIELDS, row))
+            entry['is_draft'] = bool(entry['is_draft'])
+            results.append(entry)
+        return results
+
+    def count(self) -> int:
+        """Número de entradas indexadas."""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM audit_entries").fetchone()[0]
+
+    def rebuild(self, log_file: Path) -> int:
+        """
+        Reconstruye el índice desde el log y sus segmentos rotados.
+
+        El borrado y la carga van en una sola transacción: si la lectura
+        falla, el índice anterior queda intacto y las consultas de otros
+        procesos nunca ven un índice vacío o a medias.
+
+        Args:
+            log_file: Log de auditoría actual (ej: logs/audit_trail.log)
+
+        Returns:
+            int: Entradas indexadas
+        """
+        # Una marca puesta durante la reconstrucción se conserva para la siguiente
+        self.dirty_marker.unlink(missing_ok=True)
+        total = 0
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("DELETE FROM audit_entries")
+                batch: List[Dict[str, Any]] = []
+                for entry in iter_audit_entries(log_file):
+                    batch.append(entry)
+                    if len(batch) >= 5000:
+                        total += self._insert(batch)
+                        batch = []
+                total += self._insert(batch)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                mark_dirty(self.db_path)
+                raise
+        return total
+
+
+def iter_audit_entries(log_file: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Lee las entradas del log de auditoría, incluidos los segmentos rotados.
+
+    Los segmentos se leen del más antiguo al más reciente y al final el
+    archivo actual. Las líneas dañadas se omiten.
+    """
+    log_file = Path(log_file)
+    segments = sorted(
+        p for p in log_file.parent.glob(f"{log_file.stem}.*{log_file.suffix}*")
+        if p != log_file
+    )
+    if log_file.exists():
+        segments.append(log_file)
+
+    for segment in segments:
+        opener = gzip.open if segment.suffix == '.gz' else open
+        with opener(segment, 'rt', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def index_path_for(log_file: Path) -> Path:
+    """Ruta del índice que acompaña a un log de auditoría."""
+    return Path(log_file).with_name('audit_index.db')
+
+
+def dirty_marker_for(db_path: Path) -> Path:
+    """Marca de índice desactualizado (ej: logs/audit_index.db.dirty)."""
+    db_path = Path(db_path)
+    return db_path.with_name(db_path.name + '.dirty')
+
+
+def mark_dirty(db_path: Path):
+    """
+    Marca el índice como desactualizado: la siguiente escritura o consulta
+    lo reconstruye desde el log.
+    """
+    try:
+        dirty_marker_for(db_path).touch()
+    except OSError:
+        pass
@@ -0,0 +1,260 @@
+"""
+Lectura de archivos de lote para generación masiva de cartas.
+
+Soporta CSV (columnas anidadas con notación de punto, ej: ``asegurado.nit``),
+JSONL (un objeto JSON por línea) y JSON (un arreglo de objetos). Los
+registros se leen uno a uno para no cargar el archivo completo en memoria:
+el consumo es el mismo para 100 o para 1.000.000 de cartas.
+
+Un registro ilegible (JSON mal formado o que no es un objeto) no detiene la
+lectura: se entrega como ``InvalidRecord`` para reportarlo como fallido.
+"""
+import csv
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple, Union
+
+
+# Caracteres leídos por vez de un arreglo JSON
+JSON_CHUNK_SIZE = 64 * 1024
+
+# Un error de JSON a menos de estos caracteres del final del buffer puede ser
+# un valor cortado entre bloques (``fals``, ``1.``, ``\u00``), no un error real
+_JSON_TRUNCATION_MARGIN = 16
+
+
+@dataclass(frozen=True)
+class InvalidRecord:
+    """Registro del lote que no se pudo leer."""
+
+    error: str
+
+
+Record = Union[Dict[str, Any], InvalidRecord]
+
+
+def _check_record(value: Any, where: str) -> Record:
+    """Retorna el registro si es un objeto JSON; si no, un ``InvalidRecord``."""
+    if isinstance(value, dict):
+        return value
+    return InvalidRecord(f"{where}: el registro no es un objeto JSON")
+
+
+def _unflatten(row: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Convierte columnas con notación de punto en diccionarios anidados.
+
+    Las celdas vacías se omiten para que apliquen los valores por defecto
+    de los modelos.
+
+    Args:
+        row: Fila del CSV ({'asegurado.nit': '900123456-6', ...})
+
+    Returns:
+        Dict: Registro anidado ({'asegurado': {'nit': '900123456-6'}, ...})
+    """
+    record: Dict[str, Any] = {}
+    for column, value in row.items():
+        if column is None or value is None:
+            continue
+        value = value.strip()
+        if not value:
+            continue
+
+        parts = column.strip().split('.')
+        target = record
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return record
+
+
+def _iter_csv(path: Path) -> Iterator[Tuple[int, Record]]:
+    """Itera los registros de un archivo CSV (detecta ',' ';' o tabulador)."""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+
+        reader = csv.DictReader(f, dialect=dialect)
+        for idx, row in enumerate(reader, 1):
+            yield idx, _unflatten(row)
+
+
+def _iter_jsonl(path: Path) -> Iterator[Tuple[int, Record]]:
+    """Itera los registros de un archivo JSONL (líneas vacías se ignoran)."""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        idx = 0
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            idx += 1
+            try:
+                yield idx, _check_record(json.loads(line), f"Línea {line_number}")
+            except json.JSONDecodeError as e:
+                yield idx, InvalidRecord(f"Línea {line_number}: JSON inválido ({e.msg})")
+
+
+class _JsonStream:
+    """Lector incremental de valores JSON consecutivos en un archivo de texto."""
+
+    def __init__(self, f: TextIO, chunk_size: int = JSON_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _read_more(self) -> bool:
+        """Agrega el siguiente bloque al buffer (descarta lo ya consumido)."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> Optional[str]:
+        """Siguiente carácter que no es espacio (None al final del archivo)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_more():
+                return None
+
+    def skip(self):
+        """Consume el carácter retornado por ``peek``."""
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """
+        Decodifica el siguiente valor, leyendo más bloques si está incompleto.
+
+        Solo se lee más si el error puede deberse al final del buffer (valor
+        cortado entre bloques); un registro mal formado falla de inmediato,
+        sin cargar el resto del archivo.
+        """
+        self.peek()  # raw_decode no acepta espacios iniciales
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # "Unterminated string": el texto llegó al final del buffer sin cerrar la cadena
+                truncated = (e.msg.startswith('Unterminated string')
+                             or len(self.buffer) - e.pos <= _JSON_TRUNCATION_MARGIN)
+                if not truncated or not self._read_more():
+                    raise
+                continue
+            # Un valor que termina justo al final del buffer puede seguir (números)
+            if end == len(self.buffer) and self._read_more():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_json(path: Path, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Tuple[int, Record]]:
+    """
+    Itera los registros de un arreglo JSON sin cargar el archivo completo.
+
+    Un archivo con un único objeto (formato de --from-json) es un lote de
+    un registro. Después de un registro mal formado no es posible ubicar el
+    siguiente: se entrega como ``InvalidRecord`` y la lectura termina.
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        stream = _JsonStream(f, chunk_size)
+
+        first = stream.peek()
+        if first is None:
+            return
+        if first != '[':
+            try:
+                yield 1, _check_record(stream.decode(), "Registro 1")
+            except json.JSONDecodeError as e:
+                yield 1, InvalidRecord(f"JSON inválido en {path.name} ({e.msg})")
+            return
+        stream.skip()
+
+        if stream.peek() == ']':
+            return
+        idx = 0
+        while True:
+            idx += 1
+            try:
+                value = stream.decode()
+            except json.JSONDecodeError as e:
+                yield idx, InvalidRecord(
+                    f"Registro {idx}: JSON inválido ({e.msg}); no se leyeron los registros siguientes"
+                )
+                return
+            yield idx, _check_record(value, f"Registro {idx}")
+
+            separator = stream.peek()
+            if separator == ',':
+                stream.skip()
+            elif separator == ']':
+                return
+            else:
+                yield idx + 1, InvalidRecord(
+                    f"JSON inválido en {path.name}: se esperaba ',' o ']' después del registro {idx}; "
+                    f"no se leyeron los registros siguientes"
+                )
+                return
+
+
+def iter_batch_records(path: Path) -> Iterator[Tuple[int, Record]]:
+    """
+    Itera los registros de un archivo de lote según su extensión.
+
+    Args:
+        path: Archivo .csv, .jsonl o .json
+
+    Yields:
+        Tuple[int, Dict | InvalidRecord]: (número de registro comenzando en 1,
+        datos del registro o el error de lectura)
+
+    Raises:
+        ValueError: Si la extensión no es soportada
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    if suffix == '.csv':
+        return _iter_csv(path)
+    if suffix in ('.jsonl', '.ndjson'):
+        return _iter_jsonl(path)
+    if suffix == '.json':
+        return _iter_json(path)
+
+    raise ValueError(f"Formato de lote no soportado: {path.suffix} (use .csv, .jsonl o .json)")
+
+
+def check_batch_file(path: Path) -> Path:
+    """
+    Verifica que un archivo de lote se pueda leer antes de procesarlo.
+
+    Args:
+        path: Archivo .csv, .jsonl o .json
+
+    Returns:
+        Path: La misma ruta
+
+    Raises:
+        ValueError: Si la extensión no es soportada
+        OSError: Si el archivo no existe o no se puede abrir
+    """
+    path = Path(path)
+    iter_batch_records(path)  # Solo valida la extensión: la lectura es perezosa
+    with open(path, 'rb'):
+        pass
+    return path
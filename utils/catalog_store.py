@@ -0,0 +1,493 @@
+"""
+Almacenamiento de catálogos (aseguradoras, ramos y descripciones).
+
+Define la interfaz de almacenamiento que usan los gestores de catálogos y dos
+implementaciones:
+
+- JSON: un archivo por catálogo que se reescribe completo (y de forma
+  atómica) en cada cambio (comportamiento histórico).
+- SQLite (modo WAL): una base compartida donde cada cambio es una operación
+  de una sola fila; varios procesos pueden usar el catálogo a la vez.
+
+El backend se elige con la variable de entorno ``CATALOG_BACKEND``
+(``json`` por defecto, o ``sqlite``).
+"""
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional
+
+from .atomic_file import write_text_atomic
+from .config import config
+
+
+# UPDATE ... RETURNING requiere SQLite 3.35
+SQLITE_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+def normalize_name(name: str) -> str:
+    """Clave de búsqueda de una aseguradora (nombre en mayúsculas)."""
+    return name.upper().strip()
+
+
+class PayeeStore(ABC):
+    """
+    Interfaz de almacenamiento de aseguradoras.
+
+    Los métodos de modificación reciben el registro afectado y la lista
+    completa en memoria: cada backend persiste lo que necesita.
+    """
+
+    @abstractmethod
+    def load(self) -> Optional[List[Dict]]:
+        """
+        Carga las aseguradoras.
+
+        Returns:
+            Optional[List[Dict]]: Aseguradoras, o None si el almacenamiento
+            está vacío o dañado (el gestor crea las de por defecto)
+        """
+        pass
+
+    @abstractmethod
+    def save_all(self, payees: List[Dict]):
+        """Reemplaza todas las aseguradoras guardadas."""
+        pass
+
+    @abstractmethod
+    def upsert(self, payee: Dict, payees: List[Dict]):
+        """Guarda una aseguradora nueva o modificada."""
+        pass
+
+    @abstractmethod
+    def increment_usage(self, payee: Dict, payees: List[Dict]) -> int:
+        """
+        Incrementa el contador de uso de una aseguradora.
+
+        Returns:
+            int: Contador de uso actualizado
+        """
+        pass
+
+    @abstractmethod
+    def upsert_and_increment_usage(self, payee: Dict, payees: List[Dict]) -> int:
+        """
+        Guarda una aseguradora modificada e incrementa su contador de uso
+        en una sola operación.
+
+        Returns:
+            int: Contador de uso actualizado
+        """
+        pass
+
+    @abstractmethod
+    def rename(self, old_name: str, payee: Dict, payees: List[Dict]):
+        """Guarda una aseguradora cuyo nombre cambió."""
+        pass
+
+    @abstractmethod
+    def delete(self, name: str, payees: List[Dict]):
+        """Elimina una aseguradora."""
+        pass
+
+
+class ListStore(ABC):
+    """Interfaz de almacenamiento de catálogos de texto (ramos, descripciones)."""
+
+    @abstractmethod
+    def load(self) -> Optional[List[str]]:
+        """
+        Carga los elementos del catálogo.
+
+        Returns:
+            Optional[List[str]]: Elementos, o None si el almacenamiento está
+            vacío o dañado (el gestor crea los de por defecto)
+        """
+        pass
+
+    @abstractmethod
+    def save_all(self, items: List[str]):
+        """Reemplaza todos los elementos guardados."""
+        pass
+
+    @abstractmethod
+    def add(self, item: str, items: List[str]):
+        """Guarda un elemento nuevo."""
+        pass
+
+    @abstractmethod
+    def remove(self, item: str, items: List[str]):
+        """Elimina un elemento."""
+        pass
+
+
+# ----------------------------------------------------------------------
+# Backend JSON
+# ----------------------------------------------------------------------
+
+def _read_json(storage_file: Path) -> Optional[Dict]:
+    """Lee un archivo JSON; None si no existe, está vacío o dañado."""
+    if not storage_file.exists():
+        return None
+    try:
+        with open(storage_file, 'r', encoding='utf-8') as f:
+            content = f.read().strip()
+        return json.loads(content) if content else None
+    except json.JSONDecodeError:
+        return None
+
+
+class JsonPayeeStore(PayeeStore):
+    """Aseguradoras en un archivo JSON reescrito en cada cambio."""
+
+    def __init__(self, storage_file: Path):
+        self.storage_file = storage_file
+        self.storage_file.parent.mkdir(parents=True, exist_ok=True)
+
+    def load(self) -> Optional[List[Dict]]:
+        data = _read_json(self.storage_file)
+        if data is None:
+            return None
+        return data.get('payees', [])
+
+    def save_all(self, payees: List[Dict]):
+        write_text_atomic(self.storage_file, json.dumps({
+            'payees': payees,
+            'last_updated': str(Path(__file__).parent)
+        }, indent=2, ensure_ascii=False))
+
+    def upsert(self, payee: Dict, payees: List[Dict]):
+        self.save_all(payees)
+
+    def increment_usage(self, payee: Dict, payees: List[Dict]) -> int:
+        payee['usage_count'] += 1
+        self.save_all(payees)
+        return payee['usage_count']
+
+    def upsert_and_increment_usage(self, payee: Dict, payees: List[Dict]) -> int:
+        return self.increment_usage(payee, payees)
+
+    def rename(self, old_name: str, payee: Dict, payees: List[Dict]):
+        self.save_all(payees)
+
+    def delete(self, name: str, payees: List[Dict]):
+        self.save_all(payees)
+
+
+class JsonListStore(ListStore):
+    """Catálogo de texto en un archivo JSON reescrito en cada cambio."""
+
+    def __init__(self, storage_file: Path, key: str):
+        """
+        Args:
+            storage_file: Archivo JSON del catálogo
+            key: Clave de la lista dentro del JSON (ej: 'ramos')
+        """
+        self.storage_file = storage_file
+        self.key = key
+        self.storage_file.parent.mkdir(parents=True, exist_ok=True)
+
+    def load(self) -> Optional[List[str]]:
+        data = _read_json(self.storage_file)
+        if data is None:
+            return None
+        return data.get(self.key, [])
+
+    def save_all(self, items: List[str]):
+        write_text_atomic(self.storage_file, json.dumps({self.key: items}, ensure_ascii=False, indent=2))
+
+    def add(self, item: str, items: List[str]):
+        self.save_all(items)
+
+    def remove(self, item: str, items: List[str]):
+        self.save_all(items)
+
+
+# ----------------------------------------------------------------------
+# Backend SQLite
+# ----------------------------------------------------------------------
+
+class SqliteCatalog:
+    """
+    Conexión compartida a la base SQLite de catálogos (modo WAL).
+
+    Una instancia por archivo de base de datos y proceso; usar ``open()``.
+    """
+
+    _instances: Dict[str, 'SqliteCatalog'] = {}
+    _instances_lock = Lock()
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS payees (
+            name_key    TEXT PRIMARY KEY,
+            name        TEXT NOT NULL,
+            nit         TEXT NOT NULL DEFAULT '',
+            link_pago   TEXT NOT NULL DEFAULT '',
+            usage_count INTEGER NOT NULL DEFAULT 0,
+            position    INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS catalog_items (
+            kind  TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (kind, value)
+        );
+        CREATE TABLE IF NOT EXISTS catalog_meta (
+            kind        TEXT PRIMARY KEY,
+            initialized INTEGER NOT NULL DEFAULT 1
+        );
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = Lock()
+        self.conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    @classmethod
+    def open(cls, db_path: Path) -> 'SqliteCatalog':
+        """Retorna la conexión compartida para ``db_path``."""
+        key = str(Path(db_path).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(db_path)
+            return cls._instances[key]
+
+    def execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Ejecuta una sentencia en modo autocommit y retorna sus filas."""
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def transaction(self, statements: List[tuple]) -> List[tuple]:
+        """
+        Ejecuta varias sentencias (sql, params) en una sola transacción.
+
+        Returns:
+            List[tuple]: Filas de la última sentencia
+        """
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = []
+                for sql, params in statements:
+                    rows = self.conn.execute(sql, params).fetchall()
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            return rows
+
+    def is_initialized(self, kind: str) -> bool:
+        """True si el catálogo ``kind`` ya fue guardado alguna vez."""
+        return bool(self.execute("SELECT 1 FROM catalog_meta WHERE kind = ?", (kind,)))
+
+    def mark_initialized_sql(self, kind: str) -> tuple:
+        """Sentencia para marcar un catálogo como inicializado."""
+        return ("INSERT OR IGNORE INTO catalog_meta (kind) VALUES (?)", (kind,))
+
+
+class SqlitePayeeStore(PayeeStore):
+    """
+    Aseguradoras en SQLite, indexadas por nombre en mayúsculas.
+
+    Si la base está vacía y existe el archivo JSON histórico, se importa.
+    """
+
+    KIND = 'payees'
+
+    def __init__(self, db_path: Path, legacy_file: Optional[Path] = None):
+        self.catalog = SqliteCatalog.open(db_path)
+        self.legacy_file = legacy_file
+
+    def load(self) -> Optional[List[Dict]]:
+        if not self.catalog.is_initialized(self.KIND):
+            legacy = JsonPayeeStore(self.legacy_file).load() if self.legacy_file else None
+            if legacy is None:
+                return None
+            self.save_all(legacy)
+
+        rows = self.catalog.execute(
+            "SELECT name, nit, link_pago, usage_count FROM payees ORDER BY position"
+        )
+        return [
+            {"name": name, "nit": nit, "link_pago": link_pago, "usage_count": usage_count}
+            for name, nit, link_pago, usage_count in rows
+        ]
+
+    def save_all(self, payees: List[Dict]):
+        statements = [("DELETE FROM payees", ())]
+        for position, payee in enumerate(payees):
+            statements.append(self._upsert_sql(payee, position))
+        statements.append(self.catalog.mark_initialized_sql(self.KIND))
+        self.catalog.transaction(statements)
+
+    def upsert(self, payee: Dict, payees: List[Dict]):
+        self.catalog.transaction([self._upsert_sql(payee, self._position(payee, payees))])
+
+    def increment_usage(self, payee: Dict, payees: List[Dict]) -> int:
+        name_key = normalize_name(payee['name'])
+        if SQLITE_RETURNING:
+            rows = self.catalog.execute(
+                "UPDATE payees SET usage_count = usage_count + 1 WHERE name_key = ? "
+                "RETURNING usage_count",
+                (name_key,)
+            )
+        else:
+            rows = self.catalog.transaction([
+                ("UPDATE payees SET usage_count = usage_count + 1 WHERE name_key = ?", (name_key,)),
+                ("SELECT usage_count FROM payees WHERE name_key = ?", (name_key,))
+            ])
+        payee['usage_count'] = rows[0][0] if rows else payee['usage_count'] + 1
+        return payee['usage_count']
+
+    def upsert_and_increment_usage(self, payee: Dict, payees: List[Dict]) -> int:
+        name_key = normalize_name(payee['name'])
+        rows = self.catalog.transaction([
+            self._upsert_sql(payee, self._position(payee, payees)),
+            ("UPDATE payees SET usage_count = usage_count + 1 WHERE name_key = ?", (name_key,)),
+            ("SELECT usage_count FROM payees WHERE name_key = ?", (name_key,))
+        ])
+        payee['usage_count'] = rows[0][0]
+        return payee['usage_count']
+
+    def rename(self, old_name: str, payee: Dict, payees: List[Dict]):
+        old_key, new_key = normalize_name(old_name), normalize_name(payee['name'])
+        self.catalog.transaction([
+            # El contador de la base se conserva: la copia en memoria puede estar
+            # atrasada. Si otro proceso ya creó el nombre nuevo, la clave
+            # primaria rechaza el cambio (sqlite3.IntegrityError).
+            (
+                "UPDATE payees SET name_key = ?, name = ?, nit = ?, link_pago = ? WHERE name_key = ?",
+                (new_key, payee['name'], payee.get('nit', ''), payee.get('link_pago', ''), old_key)
+            ),
+            # Si otro proceso la eliminó, se vuelve a crear
+            self._upsert_sql(payee, self._position(payee, payees))
+        ])
+
+    def delete(self, name: str, payees: List[Dict]):
+        self.catalog.execute("DELETE FROM payees WHERE name_key = ?", (normalize_name(name),))
+
+    @staticmethod
+    def _position(payee: Dict, payees: List[Dict]) -> int:
+        """Posición de la aseguradora en la lista (orden de inserción)."""
+        for idx, item in enumerate(payees):
+            if item is payee:
+                return idx
+        return len(payees)
+
+    @staticmethod
+    def _upsert_sql(payee: Dict, position: int) -> tuple:
+        """
+        Inserta o actualiza una aseguradora.
+
+        ``usage_count`` se escribe solo al insertar: en una fila existente la
+        copia en memoria puede estar atrasada respecto a otros procesos, y
+        los incrementos se hacen en la base (``increment_usage``).
+        """
+        return (
+            "INSERT INTO payees (name_key, name, nit, link_pago, usage_count, position) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(name_key) DO UPDATE SET "
+            "name = excluded.name, nit = excluded.nit, link_pago = excluded.link_pago",
+            (
+                normalize_name(payee['name']),
+                payee['name'],
+                payee.get('nit', ''),
+                payee.get('link_pago', ''),
+                payee.get('usage_count', 0),
+                position
+            )
+        )
+
+
+class SqliteListStore(ListStore):
+    """
+    Catálogo de texto en SQLite.
+
+    Si el catálogo está vacío y existe el archivo JSON histórico, se importa.
+    """
+
+    def __init__(self, db_path: Path, kind: str, legacy_file: Optional[Path] = None):
+        """
+        Args:
+            db_path: Base de datos SQLite de catálogos
+            kind: Nombre del catálogo (ej: 'ramos')
+            legacy_file: Archivo JSON histórico a importar
+        """
+        self.catalog = SqliteCatalog.open(db_path)
+        self.kind = kind
+        self.legacy_file = legacy_file
+
+    def load(self) -> Optional[List[str]]:
+        if not self.catalog.is_initialized(self.kind):
+            legacy = JsonListStore(self.legacy_file, self.kind).load() if self.legacy_file else None
+            if legacy is None:
+                return None
+            self.save_all(legacy)
+
+        rows = self.catalog.execute(
+            "SELECT value FROM catalog_items WHERE kind = ? ORDER BY value", (self.kind,)
+        )
+        return [value for (value,) in rows]
+
+    def save_all(self, items: List[str]):
+        statements = [("DELETE FROM catalog_items WHERE kind = ?", (self.kind,))]
+        for item in items:
+            statements.append((
+                "INSERT OR IGNORE INTO catalog_items (kind, value) VALUES (?, ?)",
+                (self.kind, item)
+            ))
+        statements.append(self.catalog.mark_initialized_sql(self.kind))
+        self.catalog.transaction(statements)
+
+    def add(self, item: str, items: List[str]):
+        self.catalog.execute(
+            "INSERT OR IGNORE INTO catalog_items (kind, value) VALUES (?, ?)", (self.kind, item)
+        )
+
+    def remove(self, item: str, items: List[str]):
+        self.catalog.execute(
+            "DELETE FROM catalog_items WHERE kind = ? AND value = ?", (self.kind, item)
+        )
+
+
+# ----------------------------------------------------------------------
+# Selección de backend
+# ----------------------------------------------------------------------
+
+def _use_sqlite() -> bool:
+    return config.CATALOG_BACKEND == 'sqlite'
+
+
+def create_payee_store(storage_file: Path) -> PayeeStore:
+    """
+    Crea el almacenamiento de aseguradoras según ``CATALOG_BACKEND``.
+
+    Args:
+        storage_file: Archivo JSON (backend json, o origen de importación en sqlite)
+    """
+    if _use_sqlite():
+        return SqlitePayeeStore(config.CATALOG_DB, legacy_file=storage_file)
+    return JsonPayeeStore(storage_file)
+
+
+def create_list_store(storage_file: Path, kind: str) -> ListStore:
+    """
+    Crea el almacenamiento de un catálogo de texto según ``CATALOG_BACKEND``.
+
+    Args:
+        storage_file: Archivo JSON (backend json, o origen de importación en sqlite)
+        kind: Nombre del catálogo y clave de la lista en el JSON (ej: 'ramos')
+    """
+    if _use_sqlite():
+        return SqliteListStore(config.CATALOG_DB, kind, legacy_file=storage_file)
+    return JsonListStore(storage_file, kind)
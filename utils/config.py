@@ -49,6 +49,38 @@ class Config:
         self.PDF_MARGIN_LEFT = float(os.getenv('PDF_MARGIN_LEFT', '2.5'))
         self.PDF_MARGIN_RIGHT = float(os.getenv('PDF_MARGIN_RIGHT', '2.5'))
         
+        # Catálogos (aseguradoras, ramos, descripciones): 'json' o 'sqlite'
+        self.CATALOG_BACKEND = os.getenv('CATALOG_BACKEND', 'json').lower()
+        self.CATALOG_DB = self.BASE_DIR / os.getenv('CATALOG_DB', self.LOGS_DIR / 'catalogos.db')
+        
+        # Cola persistente de los lotes (cli.py --resume RUN_ID)
+        self.JOB_QUEUE_DB = self.BASE_DIR / os.getenv('JOB_QUEUE_DB', self.LOGS_DIR / 'job_queue.db')
+        
+        # Caché de PDFs generados (por contenido de la carta)
+        self.RENDER_CACHE = os.getenv('RENDER_CACHE', 'true').lower() == 'true'
+        self.RENDER_CACHE_DIR = self.BASE_DIR / os.getenv('RENDER_CACHE_DIR', self.OUTPUT_DIR / '.render_cache')
+        self.RENDER_CACHE_MAX_MB = int(os.getenv('RENDER_CACHE_MAX_MB', '500'))
+        
+        # Cartas de una página dibujadas directamente en el canvas
+        self.FAST_RENDER = os.getenv('FAST_RENDER', 'true').lower() == 'true'
+        
+        # Medición de tiempos por etapa (también con cli.py --profile)
+        self.PROFILE = os.getenv('PROFILE', 'false').lower() == 'true'
+        
+        # Servicio HTTP local (server.py)
+        self.SERVER_HOST = os.getenv('SERVER_HOST', '127.0.0.1')
+        self.SERVER_PORT = int(os.getenv('SERVER_PORT', '8765'))
+        self.SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', '0'))
+        self.SERVER_MAX_JOBS = int(os.getenv('SERVER_MAX_JOBS', '1000'))
+        self.SERVER_MAX_BODY_BYTES = int(os.getenv('SERVER_MAX_BODY_BYTES', str(10 * 1024 * 1024)))
+        
+        # Log de auditoría
+        self.AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', '1.0'))
+        self.AUDIT_MAX_BYTES = int(os.getenv('AUDIT_MAX_BYTES', str(10 * 1024 * 1024)))
+        self.AUDIT_ROTATE_DAILY = os.getenv('AUDIT_ROTATE_DAILY', 'true').lower() == 'true'
+        self.AUDIT_COMPRESS = os.getenv('AUDIT_COMPRESS', 'false').lower() == 'true'
+        self.AUDIT_INDEX = os.getenv('AUDIT_INDEX', 'true').lower() == 'true'
+        
         # Logging
         self.LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
         self.LOG_FORMAT = os.getenv(
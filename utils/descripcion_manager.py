@@ -3,11 +3,12 @@ Gestor de descripciones de pólizas.
 
 Permite guardar y recuperar descripciones frecuentemente usadas.
 """
-import json
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from threading import Lock
 
+from .catalog_store import ListStore, create_list_store
+
 
 class DescripcionManager:
     """
@@ -17,33 +18,52 @@ class DescripcionManager:
     y selección rápida.
     """
     
-    def __init__(self, storage_file: Path = None):
+    def __init__(self, storage_file: Path = None, store: Optional[ListStore] = None):
         """
         Inicializa el gestor de descripciones.
         
         Args:
             storage_file: Archivo donde se guardan las descripciones
+            store: Almacenamiento a usar (None = según CATALOG_BACKEND)
         """
         self.storage_file = storage_file or Path('logs/descripciones.json')
-        self.storage_file.parent.mkdir(parents=True, exist_ok=True)
+        self._store = store
         self._lock = Lock()
-        self._load_descripciones()
+        self._init_lock = Lock()
+        # Se cargan al primer uso (ver initialize)
+        self._descripciones: Optional[List[str]] = None
+    
+    @property
+    def descripciones(self) -> List[str]:
+        """Descripciones guardadas (se cargan del almacenamiento al primer acceso)."""
+        if self._descripciones is None:
+            self.initialize()
+        return self._descripciones
+    
+    @descripciones.setter
+    def descripciones(self, value: List[str]):
+        self._descripciones = value
+    
+    def initialize(self) -> 'DescripcionManager':
+        """
+        Abre el almacenamiento y carga las descripciones si aún no se ha hecho.
+        
+        No es obligatorio: el primer uso las carga.
+        """
+        with self._init_lock:
+            if self._descripciones is None:
+                self._load_descripciones()
+        return self
     
     def _load_descripciones(self):
-        """Carga las descripciones desde el archivo."""
-        if self.storage_file.exists():
-            try:
-                with open(self.storage_file, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        data = json.loads(content)
-                        self.descripciones = data.get('descripciones', [])
-                    else:
-                        self._create_default_descripciones()
-            except (json.JSONDecodeError, KeyError):
-                self._create_default_descripciones()
-        else:
+        """Carga las descripciones desde el almacenamiento."""
+        if self._store is None:
+            self._store = create_list_store(self.storage_file, 'descripciones')
+        descripciones = self._store.load()
+        if descripciones is None:
             self._create_default_descripciones()
+        else:
+            self.descripciones = descripciones
     
     def _create_default_descripciones(self):
         """Crea descripciones predeterminadas."""
@@ -57,10 +77,9 @@ class DescripcionManager:
         self._save()
     
     def _save(self):
-        """Guarda las descripciones en el archivo."""
+        """Guarda todas las descripciones."""
         with self._lock:
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump({'descripciones': self.descripciones}, f, ensure_ascii=False, indent=2)
+            self._store.save_all(self.descripciones)
     
     def add_descripcion(self, descripcion: str):
         """
@@ -71,10 +90,11 @@ class DescripcionManager:
         """
         descripcion = descripcion.strip()
         if descripcion and descripcion not in self.descripciones:
-            self.descripciones.append(descripcion)
-            # Ordenar alfabéticamente
-            self.descripciones.sort()
-            self._save()
+            with self._lock:
+                self.descripciones.append(descripcion)
+                # Ordenar alfabéticamente
+                self.descripciones.sort()
+                self._store.add(descripcion, self.descripciones)
     
     def get_all(self) -> List[str]:
         """
@@ -93,8 +113,9 @@ class DescripcionManager:
             descripcion: Descripción a eliminar
         """
         if descripcion in self.descripciones:
-            self.descripciones.remove(descripcion)
-            self._save()
+            with self._lock:
+                self.descripciones.remove(descripcion)
+                self._store.remove(descripcion, self.descripciones)
 
 
 # Instancia global
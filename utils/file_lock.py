@@ -0,0 +1,92 @@
+"""
+Bloqueo de archivos entre procesos.
+
+Usa ``fcntl.flock`` en Linux/macOS y ``msvcrt.locking`` en Windows.
+"""
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """
+    Bloqueo exclusivo entre procesos basado en un archivo ``.lock``.
+
+    Example:
+        >>> with FileLock(Path('logs/consecutivos.lock')):
+        ...     # sección crítica entre procesos
+        ...     pass
+    """
+
+    def __init__(self, lock_file: Path, timeout: float = 30.0, poll_interval: float = 0.05):
+        """
+        Args:
+            lock_file: Archivo usado como candado (se crea si no existe)
+            timeout: Segundos máximos de espera por el candado
+            poll_interval: Segundos entre reintentos
+        """
+        self.lock_file = Path(lock_file)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._handle: Optional[int] = None
+
+    def acquire(self):
+        """
+        Adquiere el candado, esperando si otro proceso lo tiene.
+
+        Raises:
+            TimeoutError: Si no se obtiene el candado dentro de ``timeout``
+        """
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        handle = os.open(str(self.lock_file), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            try:
+                self._lock(handle)
+                self._handle = handle
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(handle)
+                    raise TimeoutError(f"No se pudo bloquear {self.lock_file} en {self.timeout}s")
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        """Libera el candado."""
+        if self._handle is None:
+            return
+        try:
+            self._unlock(self._handle)
+        finally:
+            os.close(self._handle)
+            self._handle = None
+
+    @staticmethod
+    def _lock(handle: int):
+        if os.name == 'nt':
+            os.lseek(handle, 0, os.SEEK_SET)
+            msvcrt.locking(handle, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    @staticmethod
+    def _unlock(handle: int):
+        if os.name == 'nt':
+            os.lseek(handle, 0, os.SEEK_SET)
+            msvcrt.locking(handle, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,362 @@
+"""
+Cola persistente de trabajos de generación de cartas.
+
+Cada lote (``cli.py --batch``) es una ejecución con un identificador
+(``RUN_ID``). Sus cartas se guardan en una base SQLite (``logs/job_queue.db``)
+con los datos ya validados y un estado: ``pending``, ``running``, ``done`` o
+``failed``. Si el proceso muere a mitad del lote, ``cli.py --resume RUN_ID``
+retoma la misma ejecución y genera solo las cartas que no terminaron.
+
+La clave de cada trabajo es ``numero_carta|NIT``: encolar dos veces la misma
+carta en una ejecución no crea un segundo trabajo.
+
+Cada carta generada guarda además la huella de su contenido junto a la ruta
+del PDF (manifiesto de la ejecución). Un lote posterior puede omitir las
+cartas cuyo PDF ya existe con la misma huella (``last_content_hash``).
+También se guarda la huella del registro de entrada (antes de asignar número
+de carta) con el número asignado: un registro sin ``numero_carta`` que no
+cambió conserva su número en el lote siguiente (``previous_numeros``).
+"""
+import hashlib
+import json
+import sqlite3
+import uuid
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# (clave, datos del PDF, nombre del archivo de salida)
+QueuedJob = Tuple[str, Dict[str, Any], str]
+
+# (registro, datos del PDF, nombre del archivo de salida, huella del registro)
+NewJob = Tuple[int, Dict[str, Any], str, str]
+
+
+def job_key(numero_carta: str, nit: str) -> str:
+    """Clave idempotente de una carta dentro de una ejecución."""
+    return f"{numero_carta.strip()}|{nit.strip()}"
+
+
+def record_hash(record: Dict[str, Any]) -> str:
+    """Huella de un registro de entrada del lote (tal como se leyó)."""
+    canonical = json.dumps(record, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class JobQueue:
+    """
+    Cola SQLite (modo WAL) de ejecuciones de lote y sus cartas.
+
+    Una instancia por archivo de base de datos y proceso; usar ``open()``.
+    """
+
+    _instances: Dict[str, 'JobQueue'] = {}
+    _instances_lock = Lock()
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id   TEXT PRIMARY KEY,
+            source   TEXT NOT NULL,
+            created  TEXT NOT NULL,
+            enqueued INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS jobs (
+            run_id          TEXT NOT NULL,
+            job_key         TEXT NOT NULL,
+            record          INTEGER NOT NULL,
+            state           TEXT NOT NULL,
+            payload         TEXT,
+            output_filename TEXT NOT NULL DEFAULT '',
+            output_path     TEXT,
+            error           TEXT,
+            attempts        INTEGER NOT NULL DEFAULT 0,
+            updated         TEXT NOT NULL,
+            content_hash    TEXT,
+            skipped         INTEGER NOT NULL DEFAULT 0,
+            record_hash     TEXT,
+            numero_carta    TEXT,
+            PRIMARY KEY (run_id, job_key)
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_record ON jobs (run_id, record);
+        CREATE INDEX IF NOT EXISTS idx_jobs_output ON jobs (output_path, updated);
+        CREATE INDEX IF NOT EXISTS idx_jobs_record_hash ON jobs (record_hash);
+    """
+
+    # Columnas agregadas después de la primera versión de la base
+    MIGRATIONS = (
+        ('content_hash', "ALTER TABLE jobs ADD COLUMN content_hash TEXT"),
+        ('skipped', "ALTER TABLE jobs ADD COLUMN skipped INTEGER NOT NULL DEFAULT 0"),
+        ('record_hash', "ALTER TABLE jobs ADD COLUMN record_hash TEXT"),
+        ('numero_carta', "ALTER TABLE jobs ADD COLUMN numero_carta TEXT"),
+    )
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = Lock()
+        self.conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'jobs'").fetchone():
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+            for column, sql in self.MIGRATIONS:
+                if column not in columns:
+                    self.conn.execute(sql)
+        self.conn.executescript(self.SCHEMA)
+
+    @classmethod
+    def open(cls, db_path: Path) -> 'JobQueue':
+        """Retorna la cola compartida para ``db_path``."""
+        key = str(Path(db_path).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(db_path)
+            return cls._instances[key]
+
+    def _transaction(self, statements):
+        """Ejecuta sentencias (sql, params) en una sola transacción."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params in statements:
+                    self.conn.execute(sql, params)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # Ejecuciones
+
+    def create_run(self, source: Path) -> str:
+        """
+        Registra una ejecución nueva.
+
+        Args:
+            source: Archivo del lote
+
+        Returns:
+            str: Identificador de la ejecución (``RUN_ID``)
+        """
+        run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self._query(
+            "INSERT INTO runs (run_id, source, created) VALUES (?, ?, ?)",
+            (run_id, str(Path(source).resolve()), datetime.now().isoformat())
+        )
+        return run_id
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Datos de la ejecución, o None si no existe."""
+        rows = self._query("SELECT source, created, enqueued FROM runs WHERE run_id = ?", (run_id,))
+        if not rows:
+            return None
+        source, created, enqueued = rows[0]
+        return {'run_id': run_id, 'source': source, 'created': created, 'enqueued': bool(enqueued)}
+
+    def runs(self) -> List[Dict[str, Any]]:
+        """Ejecuciones registradas, la más reciente primero."""
+        return [
+            {'run_id': run_id, 'source': source, 'created': created, 'enqueued': bool(enqueued)}
+            for run_id, source, created, enqueued in self._query(
+                "SELECT run_id, source, created, enqueued FROM runs ORDER BY created DESC"
+            )
+        ]
+
+    def mark_enqueued(self, run_id: str):
+        """Marca que todos los registros del lote ya están en la cola."""
+        self._query("UPDATE runs SET enqueued = 1 WHERE run_id = ?", (run_id,))
+
+    def last_record(self, run_id: str) -> int:
+        """Último número de registro encolado (0 si ninguno)."""
+        return self._query("SELECT COALESCE(MAX(record), 0) FROM jobs WHERE run_id = ?", (run_id,))[0][0]
+
+    # Trabajos
+
+    def add_block(
+        self,
+        run_id: str,
+        jobs: List[NewJob],
+        failures: List[Tuple[int, str]]
+    ) -> int:
+        """
+        Encola un bloque de registros en una sola transacción.
+
+        Args:
+            run_id: Ejecución
+            jobs: (registro, datos del PDF, nombre de archivo, huella del
+                registro) de los registros válidos
+            failures: (registro, error) de los registros inválidos
+
+        Returns:
+            int: Cartas repetidas en la ejecución (registradas como fallidas)
+        """
+        now = datetime.now().isoformat()
+        duplicates = 0
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for record, data, output_filename, input_hash in jobs:
+                    cursor = self.conn.execute(
+                        "INSERT OR IGNORE INTO jobs "
+                        "(run_id, job_key, record, state, payload, output_filename, updated, "
+                        "record_hash, numero_carta) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (run_id, job_key(data['numero_carta'], data['cliente_nit']), record, PENDING,
+                         json.dumps(data, ensure_ascii=False, default=str), output_filename, now,
+                         input_hash, data['numero_carta'])
+                    )
+                    if cursor.rowcount == 0:
+                        duplicates += 1
+                        failures = failures + [(record, f"Carta repetida en el lote: {data['numero_carta']}")]
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO jobs (run_id, job_key, record, state, error, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(run_id, f"registro:{record}", record, FAILED, error, now) for record, error in failures]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return duplicates
+
+    def iter_unfinished(self, run_id: str, block_size: int = 100) -> Iterator[QueuedJob]:
+        """
+        Entrega las cartas por generar y las marca ``running`` por bloques.
+
+        Incluye las pendientes, las que quedaron ``running`` (la ejecución se
+        interrumpió) y las que fallaron al generarse. Los registros inválidos
+        (sin datos) no se reintentan.
+
+        Yields:
+            (clave, datos del PDF, nombre de archivo), en el orden del lote
+        """
+        last = 0
+        while True:
+            rows = self._query(
+                "SELECT job_key, record, payload, output_filename FROM jobs "
+                "WHERE run_id = ? AND record > ? AND payload IS NOT NULL AND state != ? "
+                "ORDER BY record LIMIT ?",
+                (run_id, last, DONE, block_size)
+            )
+            if not rows:
+                return
+            now = datetime.now().isoformat()
+            self._transaction([
+                ("UPDATE jobs SET state = ?, attempts = attempts + 1, updated = ? "
+                 "WHERE run_id = ? AND job_key = ?", (RUNNING, now, run_id, key))
+                for key, _, _, _ in rows
+            ])
+            for key, record, payload, output_filename in rows:
+                yield key, json.loads(payload), output_filename
+            last = rows[-1][1]
+
+    def finish(self, run_id: str, results: List[Tuple[str, Optional[str], Optional[str], Optional[str]]]):
+        """
+        Registra el resultado de varias cartas en una sola transacción.
+
+        Args:
+            results: (clave, ruta del PDF, error, huella del contenido);
+                error None = generada
+        """
+        now = datetime.now().isoformat()
+        self._transaction([
+            ("UPDATE jobs SET state = ?, output_path = ?, error = ?, content_hash = ?, skipped = 0, "
+             "updated = ? WHERE run_id = ? AND job_key = ?",
+             (DONE if error is None else FAILED, output_path, error, content_hash, now, run_id, key))
+            for key, output_path, error, content_hash in results
+        ])
+
+    def skip(self, run_id: str, skipped: List[Tuple[str, str, str]]):
+        """
+        Marca como terminadas, sin generarlas, cartas cuyo PDF ya está al día.
+
+        Args:
+            skipped: (clave, ruta del PDF existente, huella del contenido)
+        """
+        now = datetime.now().isoformat()
+        self._transaction([
+            ("UPDATE jobs SET state = ?, output_path = ?, error = NULL, content_hash = ?, skipped = 1, "
+             "updated = ? WHERE run_id = ? AND job_key = ?",
+             (DONE, output_path, content_hash, now, run_id, key))
+            for key, output_path, content_hash in skipped
+        ])
+
+    def last_content_hash(self, output_path: str) -> Optional[str]:
+        """
+        Huella del contenido con que se generó por última vez ``output_path``.
+
+        Returns:
+            str, o None si ninguna ejecución registró ese PDF
+        """
+        rows = self._query(
+            "SELECT content_hash FROM jobs WHERE output_path = ? AND state = ? "
+            "AND content_hash IS NOT NULL ORDER BY updated DESC LIMIT 1",
+            (output_path, DONE)
+        )
+        return rows[0][0] if rows else None
+
+    def previous_numeros(self, run_id: str, input_hash: str) -> List[str]:
+        """
+        Números de carta asignados antes a un registro idéntico.
+
+        Excluye los ya usados en ``run_id``, de modo que dos registros
+        idénticos del mismo lote no reciben el mismo número.
+
+        Args:
+            run_id: Ejecución en curso
+            input_hash: Huella del registro (``record_hash``)
+
+        Returns:
+            List[str]: Números, del más antiguo al más reciente
+        """
+        return [numero for numero, in self._query(
+            "SELECT numero_carta FROM jobs WHERE record_hash = ? AND run_id != ? "
+            "AND numero_carta IS NOT NULL AND numero_carta NOT IN ("
+            "SELECT numero_carta FROM jobs WHERE run_id = ? AND numero_carta IS NOT NULL) "
+            "GROUP BY numero_carta ORDER BY MIN(rowid)",
+            (input_hash, run_id, run_id)
+        )]
+
+    def summary(self, run_id: str) -> Dict[str, Any]:
+        """
+        Resumen de la ejecución completa (incluye corridas anteriores).
+
+        Returns:
+            dict: 'total', 'generados', 'omitidos' (sin cambios), 'pendientes',
+            'fallidos' [(registro, error)]
+            y 'reintentables' (fallidas al generarse, se reintentan al retomar)
+        """
+        counts = dict(self._query(
+            "SELECT state, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY state", (run_id,)
+        ))
+        skipped = self._query(
+            "SELECT COUNT(*) FROM jobs WHERE run_id = ? AND skipped = 1", (run_id,)
+        )[0][0]
+        failed = self._query(
+            "SELECT record, COALESCE(error, ''), payload IS NOT NULL FROM jobs "
+            "WHERE run_id = ? AND state = ? ORDER BY record",
+            (run_id, FAILED)
+        )
+        return {
+            'total': sum(counts.values()),
+            'generados': counts.get(DONE, 0) - skipped,
+            'omitidos': skipped,
+            'pendientes': counts.get(PENDING, 0) + counts.get(RUNNING, 0),
+            'reintentables': sum(retryable for _, _, retryable in failed),
+            'fallidos': [(record, error) for record, error, _ in failed]
+        }
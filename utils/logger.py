@@ -8,6 +8,14 @@ from datetime import datetime
 from typing import Optional
 
 
+class _DelayedFileHandler(logging.FileHandler):
+    """FileHandler que crea la carpeta y el archivo solo al escribir el primer mensaje."""
+    
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
 class Logger:
     """
     Sistema de logging centralizado para el proyecto.
@@ -31,9 +39,8 @@ class Logger:
     def _setup_base_logger(self):
         """Configura el logger base."""
         log_dir = Path('logs')
-        log_dir.mkdir(parents=True, exist_ok=True)
         
-        # Archivo de log con fecha
+        # Archivo de log con fecha (se crea con el primer mensaje)
         log_file = log_dir / f"app_{datetime.now().strftime('%Y%m%d')}.log"
         
         # Formato
@@ -43,7 +50,7 @@ class Logger:
         )
         
         # Handler para archivo
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler = _DelayedFileHandler(log_file, encoding='utf-8', delay=True)
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
         
@@ -2,12 +2,16 @@
 Gestor de aseguradoras beneficiarias (payees).
 
 Permite guardar y recuperar nombres de aseguradoras frecuentemente usadas.
+
+Las búsquedas usan índices en memoria (por nombre normalizado y por NIT) y
+la lista ordenada por uso se recalcula solo cuando cambia.
 """
-import json
 from pathlib import Path
 from typing import List, Optional, Dict
 from threading import Lock
 
+from .catalog_store import PayeeStore, create_payee_store, normalize_name
+
 
 class PayeeManager:
     """
@@ -17,36 +21,94 @@ class PayeeManager:
     y selección rápida.
     """
     
-    def __init__(self, storage_file: Optional[Path] = None):
+    def __init__(self, storage_file: Optional[Path] = None, store: Optional[PayeeStore] = None):
         """
         Inicializa el gestor de aseguradoras.
         
         Args:
             storage_file: Archivo donde se guardan las aseguradoras
+            store: Almacenamiento a usar (None = según CATALOG_BACKEND)
         """
         self.storage_file = storage_file or Path('logs/payees.json')
-        self.storage_file.parent.mkdir(parents=True, exist_ok=True)
+        self._store = store
         self._lock = Lock()
-        self._load_payees()
+        self._init_lock = Lock()
+        # Se cargan al primer uso (ver initialize)
+        self._payees: Optional[List[Dict]] = None
+        # Índices sobre self._payees (ver _reindex)
+        self._by_name: Dict[str, Dict] = {}
+        self._by_nit: Dict[str, List[Dict]] = {}
+        # Vista ordenada por uso (None = recalcular en la próxima consulta)
+        self._by_usage: Optional[List[Dict]] = None
     
-    def _load_payees(self):
-        """Carga las aseguradoras desde el archivo."""
-        if self.storage_file.exists():
-            try:
-                with open(self.storage_file, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        data = json.loads(content)
-                        self.payees = data.get('payees', [])
-                    else:
-                        # Archivo vacío, crear default
-                        self._create_default_payees()
-            except (json.JSONDecodeError, KeyError):
-                # Archivo corrupto, recrear
-                self._create_default_payees()
+    @property
+    def payees(self) -> List[Dict]:
+        """Aseguradoras (se cargan del almacenamiento al primer acceso)."""
+        if self._payees is None:
+            self.initialize()
+        return self._payees
+    
+    @payees.setter
+    def payees(self, value: List[Dict]):
+        self._payees = value
+        self._reindex()
+    
+    def _reindex(self):
+        """Reconstruye los índices a partir de la lista de aseguradoras."""
+        self._by_name = {}
+        self._by_nit = {}
+        for payee in self._payees or []:
+            self._index(payee)
+        self._by_usage = None
+    
+    def _index(self, payee: Dict):
+        """Agrega una aseguradora a los índices por nombre y NIT."""
+        # Con nombres repetidos gana la primera, como en la lista
+        self._by_name.setdefault(normalize_name(payee['name']), payee)
+        self._by_nit.setdefault(payee['nit'].strip(), []).append(payee)
+    
+    def _unindex_nit(self, payee: Dict):
+        """Quita una aseguradora del índice por NIT."""
+        nit = payee['nit'].strip()
+        same_nit = [item for item in self._by_nit.get(nit, []) if item is not payee]
+        if same_nit:
+            self._by_nit[nit] = same_nit
         else:
-            # Archivo no existe
+            self._by_nit.pop(nit, None)
+    
+    def _find(self, name: str) -> Optional[Dict]:
+        """Aseguradora con ese nombre (sin distinguir mayúsculas ni espacios)."""
+        if self._payees is None:
+            self.initialize()
+        return self._by_name.get(normalize_name(name))
+    
+    def initialize(self) -> 'PayeeManager':
+        """
+        Abre el almacenamiento y carga las aseguradoras si aún no se ha hecho.
+        
+        No es obligatorio: el primer uso las carga. Sirve para hacer la
+        lectura en un momento controlado (por ejemplo al abrir la GUI).
+        """
+        with self._init_lock:
+            if self._payees is None:
+                self._load_payees()
+        return self
+    
+    def _load_payees(self):
+        """Carga las aseguradoras desde el almacenamiento."""
+        if self._store is None:
+            self._store = create_payee_store(self.storage_file)
+        payees = self._store.load()
+        if payees is None:
+            # Almacenamiento vacío o corrupto, crear default
             self._create_default_payees()
+        else:
+            self.payees = payees
+    
+    def reload(self):
+        """Recarga las aseguradoras (cambios hechos por otros procesos)."""
+        with self._lock, self._init_lock:
+            self._load_payees()
     
     def _create_default_payees(self):
         """Crea las aseguradoras por defecto."""
@@ -229,12 +291,8 @@ class PayeeManager:
         self._save_payees()
     
     def _save_payees(self):
-        """Guarda las aseguradoras en el archivo."""
-        with open(self.storage_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'payees': self.payees,
-                'last_updated': str(Path(__file__).parent)
-            }, f, indent=2, ensure_ascii=False)
+        """Guarda todas las aseguradoras."""
+        self._store.save_all(self.payees)
     
     def add_payee(self, name: str, nit: str, link_pago: str = "") -> Dict:
         """
@@ -250,13 +308,16 @@ class PayeeManager:
         """
         with self._lock:
             # Buscar si ya existe
-            for payee in self.payees:
-                if payee['name'].upper() == name.upper():
-                    payee['nit'] = nit
-                    payee['link_pago'] = link_pago.strip()
-                    payee['usage_count'] += 1
-                    self._save_payees()
-                    return payee
+            payee = self._find(name)
+            if payee is not None:
+                self._unindex_nit(payee)
+                payee['nit'] = nit
+                payee['link_pago'] = link_pago.strip()
+                self._by_nit.setdefault(nit.strip(), []).append(payee)
+                self._by_usage = None
+                # El uso se incrementa en el almacenamiento (compartido entre procesos)
+                self._store.upsert_and_increment_usage(payee, self.payees)
+                return payee
             
             # Agregar nueva
             new_payee = {
@@ -266,7 +327,9 @@ class PayeeManager:
                 "usage_count": 1
             }
             self.payees.append(new_payee)
-            self._save_payees()
+            self._index(new_payee)
+            self._by_usage = None
+            self._store.upsert(new_payee, self.payees)
             return new_payee
     
     def get_all_payees(self) -> List[Dict]:
@@ -276,7 +339,11 @@ class PayeeManager:
         Returns:
             List[Dict]: Lista de aseguradoras
         """
-        return sorted(self.payees, key=lambda x: x['usage_count'], reverse=True)
+        by_usage = self._by_usage
+        if by_usage is None:
+            by_usage = sorted(self.payees, key=lambda x: x['usage_count'], reverse=True)
+            self._by_usage = by_usage
+        return list(by_usage)
     
     def get_payee_by_name(self, name: str) -> Optional[Dict]:
         """
@@ -288,11 +355,21 @@ class PayeeManager:
         Returns:
             Optional[Dict]: Aseguradora encontrada o None
         """
-        name_upper = name.upper().strip()
-        for payee in self.payees:
-            if payee['name'].upper() == name_upper:
-                return payee
-        return None
+        return self._find(name)
+    
+    def get_payees_by_nit(self, nit: str) -> List[Dict]:
+        """
+        Busca las aseguradoras con un NIT (varias pueden compartirlo).
+        
+        Args:
+            nit: NIT de la aseguradora
+        
+        Returns:
+            List[Dict]: Aseguradoras encontradas (vacía si no hay)
+        """
+        if self._payees is None:
+            self.initialize()
+        return list(self._by_nit.get(nit.strip(), []))
     
     def increment_usage(self, name: str):
         """
@@ -302,11 +379,10 @@ class PayeeManager:
             name: Nombre de la aseguradora
         """
         with self._lock:
-            for payee in self.payees:
-                if payee['name'].upper() == name.upper():
-                    payee['usage_count'] += 1
-                    self._save_payees()
-                    break
+            payee = self._find(name)
+            if payee is not None:
+                self._store.increment_usage(payee, self.payees)
+                self._by_usage = None
     
     def get_payee_names(self) -> List[str]:
         """
@@ -328,13 +404,14 @@ class PayeeManager:
             bool: True si se eliminó, False si no se encontró
         """
         with self._lock:
-            name_upper = name.upper().strip()
-            for idx, payee in enumerate(self.payees):
-                if payee['name'].upper() == name_upper:
-                    self.payees.pop(idx)
-                    self._save_payees()
-                    return True
-            return False
+            payee = self._find(name)
+            if payee is None:
+                return False
+            self.payees.remove(payee)
+            # Reindexar: puede quedar otra aseguradora con el mismo nombre
+            self._reindex()
+            self._store.delete(normalize_name(name), self.payees)
+            return True
     
     def update_payee(self, old_name: str, new_name: str, new_nit: str, new_link_pago: str = "") -> Optional[Dict]:
         """
@@ -348,17 +425,24 @@ class PayeeManager:
         
         Returns:
             Optional[Dict]: Aseguradora actualizada o None si no se encontró
+        
+        Raises:
+            ValueError: Si ya existe otra aseguradora con el nuevo nombre
         """
         with self._lock:
-            old_name_upper = old_name.upper().strip()
-            for payee in self.payees:
-                if payee['name'].upper() == old_name_upper:
-                    payee['name'] = new_name.upper().strip()
-                    payee['nit'] = new_nit.strip()
-                    payee['link_pago'] = new_link_pago.strip()
-                    self._save_payees()
-                    return payee
-            return None
+            old_name_upper = normalize_name(old_name)
+            payee = self._find(old_name)
+            if payee is None:
+                return None
+            other = self._find(new_name)
+            if other is not None and other is not payee:
+                raise ValueError(f"Ya existe una aseguradora con el nombre {normalize_name(new_name)}")
+            payee['name'] = new_name.upper().strip()
+            payee['nit'] = new_nit.strip()
+            payee['link_pago'] = new_link_pago.strip()
+            self._reindex()
+            self._store.rename(old_name_upper, payee, self.payees)
+            return payee
 
 
 # Instancia global
@@ -0,0 +1,230 @@
+"""
+Medición opcional del tiempo de cada etapa de la generación de cartas.
+
+Uso en el código instrumentado::
+
+    with profiler.letter(numero_carta):
+        with profiler.stage('story'):
+            ...
+
+Desactivado (por defecto) cada ``with`` cuesta solo una comparación: se
+retorna un contexto nulo compartido. Activado, cada carta produce un
+registro ``{'documento', 'timestamp', 'etapas': {etapa: segundos}}`` y se
+acumulan totales por etapa, exportables como JSON lines o como archivo de
+texto de Prometheus (node_exporter textfile collector).
+"""
+import json
+import threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Deque, Dict, Iterable, List
+
+from .atomic_file import write_text_atomic
+from .config import config
+
+
+# Contexto compartido cuando la medición está desactivada
+_NULL_CONTEXT = nullcontext()
+
+
+class StageProfiler:
+    """
+    Acumulador de tiempos por etapa.
+
+    Es seguro entre hilos: cada hilo mide su propia carta.
+    """
+
+    def __init__(self, enabled: bool = False, max_records: int = 100_000):
+        """
+        Args:
+            enabled: Activar la medición
+            max_records: Registros por carta que se conservan para exportar
+        """
+        self.enabled = enabled
+        self.records: Deque[Dict[str, Any]] = deque(maxlen=max_records)
+        self._totals: Dict[str, List[float]] = {}  # etapa -> [conteo, total, máximo]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def letter(self, documento: str):
+        """
+        Contexto de una carta: las etapas medidas dentro forman su registro.
+
+        Args:
+            documento: Número de carta
+        """
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._letter(documento)
+
+    def stage(self, name: str):
+        """
+        Contexto de una etapa. Fuera de una carta se acumula sola.
+
+        Args:
+            name: Nombre de la etapa (por ejemplo 'story', 'pdf', 'auditoria')
+        """
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._stage(name)
+
+    @contextmanager
+    def _letter(self, documento: str):
+        stages: Dict[str, float] = {}
+        previous = getattr(self._local, 'stages', None)
+        self._local.stages = stages
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            stages['total'] = perf_counter() - start
+            self._local.stages = previous
+            self.merge([{
+                'documento': documento,
+                'timestamp': datetime.now().isoformat(),
+                'etapas': stages
+            }])
+
+    @contextmanager
+    def _stage(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            stages = getattr(self._local, 'stages', None)
+            if stages is not None:
+                stages[name] = stages.get(name, 0.0) + elapsed
+            else:
+                with self._lock:
+                    self._accumulate(name, elapsed)
+
+    def _accumulate(self, name: str, seconds: float):
+        totals = self._totals.setdefault(name, [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] = max(totals[2], seconds)
+
+    def merge(self, records: Iterable[Dict[str, Any]]):
+        """
+        Agrega registros de cartas (propios o devueltos por procesos trabajadores).
+
+        Args:
+            records: Registros con la forma de ``self.records``
+        """
+        with self._lock:
+            for record in records:
+                self.records.append(record)
+                for name, seconds in record['etapas'].items():
+                    self._accumulate(name, seconds)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Retorna y descarta los registros pendientes (procesos trabajadores)."""
+        with self._lock:
+            records = list(self.records)
+            self.records.clear()
+        return records
+
+    def reset(self):
+        """Descarta registros y totales."""
+        with self._lock:
+            self.records.clear()
+            self._totals.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Totales por etapa.
+
+        Returns:
+            Dict: {etapa: {'count', 'total_s', 'mean_ms', 'max_ms'}}
+        """
+        with self._lock:
+            return {
+                name: {
+                    'count': count,
+                    'total_s': total,
+                    'mean_ms': total / count * 1000 if count else 0.0,
+                    'max_ms': maximum * 1000
+                }
+                for name, (count, total, maximum) in self._totals.items()
+            }
+
+    def format_summary(self) -> str:
+        """Tabla de texto con el desglose por etapa (para la consola)."""
+        summary = self.summary()
+        if not summary:
+            return "Sin mediciones"
+
+        # Porcentaje sobre la suma de las etapas medidas
+        stages_total = sum(stats['total_s'] for name, stats in summary.items() if name != 'total')
+        lines = [f"{'Etapa':<14}{'Veces':>8}{'Total s':>11}{'Media ms':>11}{'Máx ms':>11}{'%':>7}"]
+        for name, stats in sorted(summary.items(), key=lambda item: -item[1]['total_s']):
+            if name == 'total':
+                continue
+            share = stats['total_s'] / stages_total * 100 if stages_total else 0.0
+            lines.append(
+                f"{name:<14}{stats['count']:>8}{stats['total_s']:>11.3f}"
+                f"{stats['mean_ms']:>11.2f}{stats['max_ms']:>11.2f}{share:>6.1f}%"
+            )
+        if 'total' in summary:
+            stats = summary['total']
+            lines.append(
+                f"{'cartas':<14}{stats['count']:>8}{stats['total_s']:>11.3f}"
+                f"{stats['mean_ms']:>11.2f}{stats['max_ms']:>11.2f}"
+            )
+        return "\n".join(lines)
+
+    def export_jsonl(self, path: Path):
+        """
+        Escribe un registro por carta en formato JSON lines.
+
+        Args:
+            path: Archivo de salida
+        """
+        with self._lock:
+            records = list(self.records)
+        write_text_atomic(path, "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        ))
+
+    def export_prometheus(self, path: Path, prefix: str = 'carta_cobro'):
+        """
+        Escribe los totales por etapa en el formato de texto de Prometheus.
+
+        Args:
+            path: Archivo de salida (por ejemplo para el textfile collector)
+            prefix: Prefijo de las métricas
+        """
+        summary = self.summary()
+        metrics = [
+            ('stage_seconds_total', 'counter', 'Tiempo acumulado por etapa de generación',
+             lambda stats: stats['total_s']),
+            ('stage_count_total', 'counter', 'Ejecuciones de cada etapa',
+             lambda stats: stats['count']),
+            ('stage_max_seconds', 'gauge', 'Duración máxima de una ejecución de la etapa',
+             lambda stats: stats['max_ms'] / 1000),
+        ]
+
+        lines = []
+        for suffix, metric_type, help_text, value in metrics:
+            name = f"{prefix}_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for stage, stats in sorted(summary.items()):
+                lines.append(f'{name}{{stage="{stage}"}} {value(stats)}')
+        write_text_atomic(path, "\n".join(lines) + "\n")
+
+    def export(self, path: Path):
+        """Exporta según la extensión: ``.prom`` Prometheus, otra JSON lines."""
+        path = Path(path)
+        if path.suffix == '.prom':
+            self.export_prometheus(path)
+        else:
+            self.export_jsonl(path)
+
+
+# Instancia global
+profiler = StageProfiler(enabled=config.PROFILE)
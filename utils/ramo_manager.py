@@ -3,11 +3,12 @@ Gestor de ramos de pólizas.
 
 Permite guardar y recuperar ramos frecuentemente usados.
 """
-import json
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from threading import Lock
 
+from .catalog_store import ListStore, create_list_store
+
 
 class RamoManager:
     """
@@ -17,33 +18,52 @@ class RamoManager:
     y selección rápida.
     """
     
-    def __init__(self, storage_file: Path = None):
+    def __init__(self, storage_file: Path = None, store: Optional[ListStore] = None):
         """
         Inicializa el gestor de ramos.
         
         Args:
             storage_file: Archivo donde se guardan los ramos
+            store: Almacenamiento a usar (None = según CATALOG_BACKEND)
         """
         self.storage_file = storage_file or Path('logs/ramos.json')
-        self.storage_file.parent.mkdir(parents=True, exist_ok=True)
+        self._store = store
         self._lock = Lock()
-        self._load_ramos()
+        self._init_lock = Lock()
+        # Se cargan al primer uso (ver initialize)
+        self._ramos: Optional[List[str]] = None
+    
+    @property
+    def ramos(self) -> List[str]:
+        """Ramos guardados (se cargan del almacenamiento al primer acceso)."""
+        if self._ramos is None:
+            self.initialize()
+        return self._ramos
+    
+    @ramos.setter
+    def ramos(self, value: List[str]):
+        self._ramos = value
+    
+    def initialize(self) -> 'RamoManager':
+        """
+        Abre el almacenamiento y carga los ramos si aún no se ha hecho.
+        
+        No es obligatorio: el primer uso los carga.
+        """
+        with self._init_lock:
+            if self._ramos is None:
+                self._load_ramos()
+        return self
     
     def _load_ramos(self):
-        """Carga los ramos desde el archivo."""
-        if self.storage_file.exists():
-            try:
-                with open(self.storage_file, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        data = json.loads(content)
-                        self.ramos = data.get('ramos', [])
-                    else:
-                        self._create_default_ramos()
-            except (json.JSONDecodeError, KeyError):
-                self._create_default_ramos()
-        else:
+        """Carga los ramos desde el almacenamiento."""
+        if self._store is None:
+            self._store = create_list_store(self.storage_file, 'ramos')
+        ramos = self._store.load()
+        if ramos is None:
             self._create_default_ramos()
+        else:
+            self.ramos = ramos
     
     def _create_default_ramos(self):
         """Crea ramos predeterminados."""
@@ -90,10 +110,9 @@ class RamoManager:
         self._save()
     
     def _save(self):
-        """Guarda los ramos en el archivo."""
+        """Guarda todos los ramos."""
         with self._lock:
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump({'ramos': self.ramos}, f, ensure_ascii=False, indent=2)
+            self._store.save_all(self.ramos)
     
     def add_ramo(self, ramo: str):
         """
@@ -104,10 +123,11 @@ class RamoManager:
         """
         ramo = ramo.strip().upper()
         if ramo and ramo not in self.ramos:
-            self.ramos.append(ramo)
-            # Ordenar alfabéticamente
-            self.ramos.sort()
-            self._save()
+            with self._lock:
+                self.ramos.append(ramo)
+                # Ordenar alfabéticamente
+                self.ramos.sort()
+                self._store.add(ramo, self.ramos)
     
     def get_all(self) -> List[str]:
         """
@@ -126,8 +146,9 @@ class RamoManager:
             ramo: Ramo a eliminar
         """
         if ramo in self.ramos:
-            self.ramos.remove(ramo)
-            self._save()
+            with self._lock:
+                self.ramos.remove(ramo)
+                self._store.remove(ramo, self.ramos)
 
 
 # Instancia global
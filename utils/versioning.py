@@ -7,12 +7,102 @@ from datetime import datetime
 from typing import Optional, Dict
 from threading import Lock
 
+from .atomic_file import atomic_open
+from .file_lock import FileLock
+
+
+class ConsecutivoBlock:
+    """
+    Bloque de consecutivos reservado de una sola vez.
+    
+    Entrega números desde memoria, sin tocar el archivo, hasta agotarse.
+    """
+    
+    def __init__(self, manager: 'VersionManager', year: int, first: int, last: int):
+        self._manager = manager
+        self.year = year
+        self.first = first
+        self.last = last
+        self._next = first
+        self._lock = Lock()
+    
+    @property
+    def remaining(self) -> int:
+        """Números del bloque aún sin entregar."""
+        return self.last - self._next + 1
+    
+    def next_numero_carta(self) -> Optional[str]:
+        """
+        Entrega el siguiente número del bloque.
+        
+        Returns:
+            Optional[str]: Número de carta ("15434 - 2025"), o None si el bloque se agotó
+        """
+        with self._lock:
+            if self._next > self.last:
+                return None
+            consecutivo = self._next
+            self._next += 1
+        return f"{consecutivo} - {self.year}"
+    
+    def release(self) -> int:
+        """
+        Devuelve los números no usados, si nadie reservó después de este bloque.
+        
+        Returns:
+            int: Cantidad de números devueltos (0 si ya no era posible)
+        """
+        with self._lock:
+            unused = self.remaining
+            if unused <= 0:
+                return 0
+            if self._manager._release_block(self.year, self.last, self._next - 1):
+                self.last = self._next - 1
+                return unused
+            return 0
+
+
+class NumeroCartaAllocator:
+    """
+    Asignador de números de carta para lotes.
+    
+    Reserva bloques de ``block_size`` números y los entrega desde memoria;
+    al agotarse un bloque reserva el siguiente.
+    """
+    
+    def __init__(self, manager: 'VersionManager', block_size: int = 100):
+        self._manager = manager
+        self.block_size = max(1, block_size)
+        self._blocks: Dict[int, ConsecutivoBlock] = {}
+        self._lock = Lock()
+    
+    def next_numero_carta(self, year: Optional[int] = None) -> str:
+        """Entrega el siguiente número de carta del año (None = año actual)."""
+        year = year or datetime.now().year
+        with self._lock:
+            block = self._blocks.get(year)
+            numero = block.next_numero_carta() if block else None
+            if numero is None:
+                block = self._manager.reserve_block(self.block_size, year)
+                self._blocks[year] = block
+                numero = block.next_numero_carta()
+            return numero
+    
+    def close(self):
+        """Devuelve los números reservados que no se usaron."""
+        with self._lock:
+            for block in self._blocks.values():
+                block.release()
+            self._blocks.clear()
+
 
 class VersionManager:
     """
     Gestor de versiones y consecutivos de documentos.
     
     Mantiene un registro de consecutivos por año para números de carta.
+    Las asignaciones se hacen bajo un bloqueo de archivo, de modo que varios
+    procesos (CLI, GUI, lotes) nunca entregan el mismo número.
     """
     
     def __init__(self, storage_file: Optional[Path] = None):
@@ -23,9 +113,33 @@ class VersionManager:
             storage_file: Archivo donde se guardan los consecutivos
         """
         self.storage_file = storage_file or Path('logs/consecutivos.json')
-        self.storage_file.parent.mkdir(parents=True, exist_ok=True)
         self._lock = Lock()
-        self._load_consecutivos()
+        self._file_lock = FileLock(self.storage_file.with_suffix('.lock'))
+        # Se carga al primer uso (ver initialize)
+        self._consecutivos: Optional[Dict] = None
+    
+    @property
+    def consecutivos(self) -> Dict:
+        """Consecutivos por año (se cargan del archivo al primer acceso)."""
+        if self._consecutivos is None:
+            self._load_consecutivos()
+        return self._consecutivos
+    
+    @consecutivos.setter
+    def consecutivos(self, value: Dict):
+        self._consecutivos = value
+    
+    def initialize(self) -> 'VersionManager':
+        """
+        Carga los consecutivos si aún no se han cargado.
+        
+        No es obligatorio: el primer uso los carga. Sirve para hacer la
+        lectura en un momento controlado (por ejemplo al abrir la GUI).
+        """
+        with self._lock:
+            if self._consecutivos is None:
+                self._load_consecutivos()
+        return self
     
     def _load_consecutivos(self):
         """Carga los consecutivos desde el archivo."""
@@ -36,39 +150,86 @@ class VersionManager:
             self.consecutivos = {}
     
     def _save_consecutivos(self):
-        """Guarda los consecutivos en el archivo."""
-        with open(self.storage_file, 'w', encoding='utf-8') as f:
+        """Guarda los consecutivos en el archivo (escritura atómica)."""
+        with atomic_open(self.storage_file, 'w', encoding='utf-8') as f:
             json.dump(self.consecutivos, f, indent=2, ensure_ascii=False)
     
-    def get_next_numero_carta(self, year: Optional[int] = None) -> str:
+    def _allocate(self, count: int, year: int) -> int:
         """
-        Genera el siguiente número de carta para el año especificado.
+        Reserva ``count`` consecutivos del año en un solo paso atómico.
         
-        Args:
-            year: Año para el consecutivo (None = año actual)
+        Relee el archivo bajo el bloqueo entre procesos para no repetir
+        números asignados por otro proceso.
         
         Returns:
-            str: Número de carta en formato "15434 - 2025"
+            int: Primer consecutivo reservado
         """
-        with self._lock:
-            year = year or datetime.now().year
+        with self._lock, self._file_lock:
+            self._load_consecutivos()
             year_key = str(year)
             
-            # Obtener consecutivo actual del año
             if year_key not in self.consecutivos:
                 self.consecutivos[year_key] = {
                     'last_consecutivo': 0,
                     'year': year
                 }
             
-            # Incrementar consecutivo
-            self.consecutivos[year_key]['last_consecutivo'] += 1
-            consecutivo = self.consecutivos[year_key]['last_consecutivo']
-            
-            # Guardar
+            first = self.consecutivos[year_key]['last_consecutivo'] + 1
+            self.consecutivos[year_key]['last_consecutivo'] += count
             self._save_consecutivos()
             
-            return f"{consecutivo} - {year}"
+            return first
+    
+    def _release_block(self, year: int, block_last: int, new_last: int) -> bool:
+        """Devuelve el final de un bloque si sigue siendo la última reserva del año."""
+        with self._lock, self._file_lock:
+            self._load_consecutivos()
+            data = self.consecutivos.get(str(year))
+            if not data or data['last_consecutivo'] != block_last:
+                return False
+            data['last_consecutivo'] = new_last
+            self._save_consecutivos()
+            return True
+    
+    def get_next_numero_carta(self, year: Optional[int] = None) -> str:
+        """
+        Genera el siguiente número de carta para el año especificado.
+        
+        Args:
+            year: Año para el consecutivo (None = año actual)
+        
+        Returns:
+            str: Número de carta en formato "15434 - 2025"
+        """
+        year = year or datetime.now().year
+        consecutivo = self._allocate(1, year)
+        return f"{consecutivo} - {year}"
+    
+    def reserve_block(self, count: int, year: Optional[int] = None) -> ConsecutivoBlock:
+        """
+        Reserva un bloque de ``count`` números de carta en un solo paso.
+        
+        Args:
+            count: Cantidad de números a reservar
+            year: Año del consecutivo (None = año actual)
+        
+        Returns:
+            ConsecutivoBlock: Bloque que entrega los números desde memoria
+        """
+        if count < 1:
+            raise ValueError("El bloque debe tener al menos un número")
+        year = year or datetime.now().year
+        first = self._allocate(count, year)
+        return ConsecutivoBlock(self, year, first, first + count - 1)
+    
+    def block_allocator(self, block_size: int = 100) -> NumeroCartaAllocator:
+        """
+        Crea un asignador por bloques para lotes.
+        
+        Args:
+            block_size: Números reservados por cada acceso al archivo
+        """
+        return NumeroCartaAllocator(self, block_size)
     
     def get_current_consecutivo(self, year: Optional[int] = None) -> int:
         """
@@ -83,6 +244,7 @@ class VersionManager:
         year = year or datetime.now().year
         year_key = str(year)
         
+        self._load_consecutivos()
         if year_key not in self.consecutivos:
             return 0
         
@@ -96,10 +258,11 @@ class VersionManager:
             consecutivo: Número de consecutivo
             year: Año (None = año actual)
         """
-        with self._lock:
+        with self._lock, self._file_lock:
             year = year or datetime.now().year
             year_key = str(year)
             
+            self._load_consecutivos()
             self.consecutivos[year_key] = {
                 'last_consecutivo': consecutivo,
                 'year': year
@@ -114,6 +277,7 @@ class VersionManager:
         Returns:
             Dict: Estadísticas por año
         """
+        self._load_consecutivos()
         return {
             year_key: {
                 'year': data['year'],